@@ -1,14 +1,22 @@
 """Agent modules for LearnPlay.ai."""
 
-from .sudoku import sudoku_agent, SudokuAgentState
-from .chess import chess_agent, ChessAgentState
-from .router_agent import router_agent, RouterState
-
-__all__ = [
-    "sudoku_agent",
-    "chess_agent",
-    "router_agent",
-    "SudokuAgentState",
-    "ChessAgentState",
-    "RouterState"
-]
+from importlib import import_module
+
+# Each graph is built on first access; loading one graph (or a helper
+# module such as agents.sudoku.tools) never builds the others.
+_EXPORTS = {
+    "sudoku_agent": ".sudoku",
+    "chess_agent": ".chess",
+    "router_agent": ".router_agent",
+    "SudokuAgentState": ".sudoku",
+    "ChessAgentState": ".chess",
+    "RouterState": ".router_agent",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
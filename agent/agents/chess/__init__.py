@@ -1,6 +1,18 @@
 """Chess agent module."""
 
-from .agent import chess_agent, graph
-from .state import ChessAgentState
+from importlib import import_module
 
-__all__ = ["chess_agent", "graph", "ChessAgentState"]
+# Resolved lazily so importing the state or tools does not build the graph
+_EXPORTS = {
+    "chess_agent": ".agent",
+    "graph": ".agent",
+    "ChessAgentState": ".state",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
@@ -9,31 +9,60 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from langchain.agents import create_agent
 from copilotkit import CopilotKitMiddleware
 from llm_provider import get_llm_provider
+from shared.history_compaction import HistoryCompactionMiddleware
+from shared.lessons import LessonMiddleware
+from shared.metrics import instrument_graph
+from shared.prompt_cache import PromptCacheMiddleware
+from shared.response_cache import ResponseCacheMiddleware
+from shared.tts_pipeline import StreamedSpeechMiddleware
 from agents.chess.prompts import CHESS_SYSTEM_PROMPT
+from agents.chess.lessons import CHESS_LESSONS
 from agents.chess.state import ChessAgentState
 from agents.chess.tools import (
     analyze_chess_position,
     suggest_chess_move,
+    analyze_and_suggest_move,
     validate_chess_move,
     explain_chess_position,
-    get_attacked_squares
+    get_attacked_squares,
+    review_chess_game,
+    get_chess_puzzle,
+    check_chess_puzzle_move,
+    record_chess_result
 )
 
 # Create Chess agent with focused tools and prompt
 # Note: speak_message is now a frontend tool, not a backend tool
 chess_agent = create_agent(
-    model=get_llm_provider(),
+    model=get_llm_provider("chess"),
     tools=[
         analyze_chess_position,
         suggest_chess_move,
+        analyze_and_suggest_move,
         validate_chess_move,
         explain_chess_position,
-        get_attacked_squares
+        get_attacked_squares,
+        review_chess_game,
+        get_chess_puzzle,
+        check_chess_puzzle_move,
+        record_chess_result
+    ],
+    middleware=[
+        CopilotKitMiddleware(),
+        LessonMiddleware(CHESS_LESSONS),
+        StreamedSpeechMiddleware(),
+        ResponseCacheMiddleware(
+            "chess",
+            state_keys=["teaching_topic", "teaching_current_step", "player_level", "chess_game_mode", "chess_rating"],
+            board_keys=["chess_fen"],
+            board_readables=["Current chess position and game state"],
+        ),
+        HistoryCompactionMiddleware(),
+        PromptCacheMiddleware("chess"),
     ],
-    middleware=[CopilotKitMiddleware()],
     state_schema=ChessAgentState,
     system_prompt=CHESS_SYSTEM_PROMPT
 )
 
 # Export as graph for LangGraph
-graph = chess_agent
+graph = instrument_graph(chess_agent, "chess_agent")
@@ -0,0 +1,89 @@
+"""Scripted chess lessons served by the lesson fast path."""
+
+from shared.lessons import Lesson
+
+
+def _squares(origin: str, targets: list, origin_color: str = "green") -> list:
+    """Highlight a piece's square and the squares it can reach."""
+    squares = [{"square": origin, "color": origin_color}] if origin else []
+    return squares + [{"square": square, "color": "blue"} for square in targets]
+
+
+CHESS_BASICS_LESSON = Lesson(
+    lesson_id="chess_basics",
+    topic="Chess Basics",
+    triggers=[
+        "Learn chess basics",
+        "Learn Chess Basics",
+        "Teach me chess",
+        "Teach me the basics of chess",
+    ],
+    highlight_tool="highlightSquares",
+    highlight_arg="squares",
+    steps=[
+        {
+            "description": "The Chessboard",
+            "highlight": _squares("", ["e4", "e5", "d4", "d5"]),
+            "highlight_message": "Demonstrating center squares",
+            "speak": "Chess is played on an 8x8 board. Rows are ranks, columns are files.",
+            "say": "Click Next Step to learn about pawns.",
+        },
+        {
+            "description": "The Pawn",
+            "highlight": _squares("e2", ["e3", "e4"]),
+            "highlight_message": "Pawn moves",
+            "speak": "Pawns move forward one square, or two from their starting square, and capture diagonally.",
+            "say": "Click Next Step to learn about knights.",
+        },
+        {
+            "description": "The Knight",
+            "highlight": _squares("g1", ["e2", "f3", "h3"]),
+            "highlight_message": "Knight moves",
+            "speak": "Knights move in an L-shape, two squares then one sideways, and can jump over pieces.",
+            "say": "Click Next Step to learn about bishops.",
+        },
+        {
+            "description": "The Bishop",
+            "highlight": _squares("c1", ["d2", "e3", "f4", "g5", "h6", "b2", "a3"]),
+            "highlight_message": "Bishop moves",
+            "speak": "Bishops move diagonally any number of squares and always stay on one color.",
+            "say": "Click Next Step to learn about rooks.",
+        },
+        {
+            "description": "The Rook",
+            "highlight": _squares("a1", ["a2", "a3", "a4", "a5", "a6", "a7", "b1", "c1", "d1"]),
+            "highlight_message": "Rook moves",
+            "speak": "Rooks move in straight lines along ranks and files, any number of squares.",
+            "say": "Click Next Step to learn about the queen.",
+        },
+        {
+            "description": "The Queen",
+            "highlight": _squares("d1", ["d2", "d3", "d4", "d5", "d6", "e2", "f3", "g4", "h5", "c2", "b3", "a4"]),
+            "highlight_message": "Queen moves",
+            "speak": "The queen moves like a rook and a bishop combined. She is the most powerful piece.",
+            "say": "Click Next Step to learn about the king.",
+        },
+        {
+            "description": "The King",
+            "highlight": _squares("e1", ["d1", "d2", "e2", "f2", "f1"]),
+            "highlight_message": "King moves",
+            "speak": "The king moves one square in any direction. Keeping him safe is your top priority.",
+            "say": "Click Next Step to learn about check and checkmate.",
+        },
+        {
+            "description": "Check and Checkmate",
+            "highlight": [
+                {"square": "g8", "color": "red"},
+                {"square": "e8", "color": "blue"},
+                {"square": "f7", "color": "yellow"},
+                {"square": "g7", "color": "yellow"},
+                {"square": "h7", "color": "yellow"},
+            ],
+            "highlight_message": "Back-rank checkmate pattern",
+            "speak": "Check means the king is attacked. Checkmate means it is attacked and cannot escape, ending the game.",
+            "say": "You now know chess basics! Try playing or ask for move suggestions.",
+        },
+    ],
+)
+
+CHESS_LESSONS = [CHESS_BASICS_LESSON]
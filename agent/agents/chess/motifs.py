@@ -0,0 +1,389 @@
+"""
+Tactical motif detection on python-chess bitboards.
+
+find_motifs() lists the tactics on the board for both sides: hanging
+pieces, pins, skewers, forks (standing ones and fork moves for the side to
+move), discovered attacks and back-rank weaknesses. Material is judged by
+static exchange evaluation (see()), so a piece attacked once and defended
+once by something cheaper isn't called hanging.
+
+Everything works from attack masks and precomputed rays rather than by
+playing moves, so a position takes a few hundred microseconds and the
+motifs can go into every analysis call. Each motif carries
+highlight_squares in the {square, color} shape highlightSquares takes:
+green for the piece making the tactic, yellow for a piece caught in the
+middle (pinned, skewered or moving away), red for what is won.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import chess
+
+from agents.chess.search import PIECE_VALUES
+
+# A king is worth more than anything it shields
+_VALUES = {**PIECE_VALUES, chess.KING: 20_000}
+
+# Every square a rook or bishop on the square sees on an empty board
+_STRAIGHT = [chess.BB_RANK_ATTACKS[sq][0] | chess.BB_FILE_ATTACKS[sq][0] for sq in chess.SQUARES]
+_DIAGONAL = [chess.BB_DIAG_ATTACKS[sq][0] for sq in chess.SQUARES]
+
+_ORDER = {"fork": 0, "hanging": 1, "discovered_attack": 2, "pin": 3, "skewer": 4, "back_rank": 5}
+
+
+def see(board: chess.Board, square: chess.Square, color: chess.Color) -> int:
+    """
+    Static exchange evaluation: material `color` wins by capturing on square
+    with its least valuable attacker, the opponent recapturing likewise, and
+    either side stopping when going on would lose. 0 when `color` can't win
+    anything there (no capture, or every capture loses).
+    """
+    target = board.piece_type_at(square)
+    if target is None:
+        return 0
+    occupied = board.occupied
+    gains: List[int] = []
+    value = _VALUES[target]
+    side = color
+    while True:
+        # Recomputed with captured pieces removed, so x-ray attackers join in
+        attackers = board.attackers_mask(side, square, occupied) & occupied
+        if not attackers:
+            break
+        from_square, piece_type = _least_valuable(board, attackers)
+        if piece_type == chess.KING and board.attackers_mask(not side, square, occupied ^ chess.BB_SQUARES[from_square]):
+            # The king can't capture onto a defended square
+            break
+        gains.append(value)
+        value = _VALUES[piece_type]
+        occupied ^= chess.BB_SQUARES[from_square]
+        side = not side
+    score = 0
+    for gain in reversed(gains):
+        score = max(0, gain - score)
+    return score
+
+
+def _least_valuable(board: chess.Board, attackers: chess.Bitboard):
+    for piece_type, bitboard in (
+        (chess.PAWN, board.pawns), (chess.KNIGHT, board.knights), (chess.BISHOP, board.bishops),
+        (chess.ROOK, board.rooks), (chess.QUEEN, board.queens), (chess.KING, board.kings),
+    ):
+        if attackers & bitboard:
+            return chess.lsb(attackers & bitboard), piece_type
+    raise ValueError("no attacker")
+
+
+def find_motifs(board: chess.Board) -> List[Dict[str, Any]]:
+    """
+    Tactical motifs in the position, the side to move's chances first.
+
+    Returns:
+        Dicts with type ("fork", "hanging", "discovered_attack", "pin",
+        "skewer" or "back_rank"), side (the color that can use it),
+        description, highlight_squares, and the squares involved
+    """
+    motifs: List[Dict[str, Any]] = []
+    # Each piece's attacks, and every square each color attacks
+    attacks = {}
+    attacked = [0, 0]
+    for color in chess.COLORS:
+        for square in chess.scan_forward(board.occupied_co[color]):
+            attacks[square] = board.attacks_mask(square)
+            attacked[color] |= attacks[square]
+    for side in chess.COLORS:
+        _hanging(board, side, attacked[side], motifs)
+        _lines(board, side, motifs)
+        _standing_forks(board, side, attacks, motifs)
+        _back_rank(board, side, motifs)
+    _fork_moves(board, motifs)
+    turn = _color_name(board.turn)
+    motifs.sort(key=lambda motif: (motif["side"] != turn, _ORDER[motif["type"]]))
+    return motifs
+
+
+def _color_name(color: chess.Color) -> str:
+    return "white" if color == chess.WHITE else "black"
+
+
+def _describe(board: chess.Board, square: chess.Square) -> str:
+    """e.g. "knight on c6"."""
+    return f"{chess.piece_name(board.piece_type_at(square))} on {chess.square_name(square)}"
+
+
+def _highlights(green=(), yellow=(), red=()) -> List[Dict[str, str]]:
+    return (
+        [{"square": chess.square_name(s), "color": "green"} for s in green]
+        + [{"square": chess.square_name(s), "color": "yellow"} for s in yellow]
+        + [{"square": chess.square_name(s), "color": "red"} for s in red]
+    )
+
+
+def _defended(board: chess.Board, square: chess.Square, color: chess.Color,
+              occupied: Optional[chess.Bitboard] = None) -> bool:
+    occupied = board.occupied if occupied is None else occupied
+    return bool(board.attackers_mask(color, square, occupied) & occupied)
+
+
+def _worth_attacking(board: chess.Board, target: chess.Square, attacker_value: int, defender: chess.Color,
+                     occupied: Optional[chess.Bitboard] = None) -> bool:
+    """A target wins material if it is the king, worth more than the attacker, or undefended."""
+    piece_type = board.piece_type_at(target)
+    if piece_type == chess.KING or _VALUES[piece_type] > attacker_value:
+        return True
+    return not _defended(board, target, defender, occupied)
+
+
+def _hanging(board: chess.Board, side: chess.Color, attacked: chess.Bitboard, motifs: List[Dict[str, Any]]) -> None:
+    """Enemy pieces `side` can win outright by capturing."""
+    enemy = not side
+    for square in chess.scan_forward(board.occupied_co[enemy] & ~board.kings & attacked):
+        attackers = board.attackers_mask(side, square)
+        gain = see(board, square, side)
+        if gain <= 0:
+            continue
+        motifs.append({
+            "type": "hanging",
+            "side": _color_name(side),
+            "square": chess.square_name(square),
+            "attackers": [chess.square_name(s) for s in chess.scan_forward(attackers)],
+            "gain": gain,
+            "description": (f"The {_color_name(enemy)} {_describe(board, square)} is hanging: "
+                            f"{_color_name(side).capitalize()} can win it"),
+            "highlight_squares": _highlights(green=chess.scan_forward(attackers), red=[square]),
+        })
+
+
+def _lines(board: chess.Board, side: chess.Color, motifs: List[Dict[str, Any]]) -> None:
+    """
+    Pins, skewers and discovered attacks by `side`'s bishops, rooks and queens:
+    an enemy target on the slider's line with exactly one piece in between.
+    """
+    enemy = not side
+    occupied = board.occupied
+    own = board.occupied_co[side]
+    straight = board.rooks | board.queens
+    diagonal = board.bishops | board.queens
+    for slider in chess.scan_forward((straight | diagonal) & own):
+        lines = 0
+        if chess.BB_SQUARES[slider] & straight:
+            lines |= _STRAIGHT[slider]
+        if chess.BB_SQUARES[slider] & diagonal:
+            lines |= _DIAGONAL[slider]
+        slider_value = _VALUES[board.piece_type_at(slider)]
+        # Winning a pawn through a line piece is too small a motif to teach
+        for target in chess.scan_forward(lines & board.occupied_co[enemy] & ~board.pawns):
+            blockers = chess.between(slider, target) & occupied
+            if not blockers or blockers & (blockers - 1):
+                continue
+            middle = chess.lsb(blockers)
+            without_middle = occupied ^ blockers
+            if blockers & own:
+                # Moving our own piece out of the way uncovers the attack
+                if not _worth_attacking(board, target, slider_value, enemy, without_middle):
+                    continue
+                if board.piece_type_at(middle) == chess.PAWN and not _pawn_can_move(board, middle, side):
+                    continue
+                check = board.piece_type_at(target) == chess.KING
+                motifs.append({
+                    "type": "discovered_attack",
+                    "side": _color_name(side),
+                    "moving_piece": chess.square_name(middle),
+                    "attacker": chess.square_name(slider),
+                    "target": chess.square_name(target),
+                    "check": check,
+                    "description": (f"Moving {_color_name(side).capitalize()}'s {_describe(board, middle)} "
+                                    f"uncovers {'check' if check else 'an attack'} from the "
+                                    f"{_describe(board, slider)} on the {_describe(board, target)}"),
+                    "highlight_squares": _highlights(green=[slider], yellow=[middle], red=[target]),
+                })
+                continue
+
+            middle_value = _VALUES[board.piece_type_at(middle)]
+            target_value = _VALUES[board.piece_type_at(target)]
+            if middle_value < target_value:
+                # The middle piece can't move without exposing the more valuable one
+                if not _worth_attacking(board, target, slider_value, enemy, without_middle):
+                    continue
+                absolute = board.piece_type_at(target) == chess.KING
+                motifs.append({
+                    "type": "pin",
+                    "side": _color_name(side),
+                    "pinner": chess.square_name(slider),
+                    "pinned": chess.square_name(middle),
+                    "target": chess.square_name(target),
+                    "absolute": absolute,
+                    "description": (f"{_color_name(side).capitalize()}'s {_describe(board, slider)} pins the "
+                                    f"{_color_name(enemy)} {_describe(board, middle)} to the "
+                                    f"{_describe(board, target)}"),
+                    "highlight_squares": _highlights(green=[slider], yellow=[middle], red=[target]),
+                })
+            elif middle_value > target_value:
+                # The attacked piece is worth more and must move, exposing the one behind
+                if not _worth_attacking(board, target, slider_value, enemy, without_middle):
+                    continue
+                motifs.append({
+                    "type": "skewer",
+                    "side": _color_name(side),
+                    "attacker": chess.square_name(slider),
+                    "front": chess.square_name(middle),
+                    "target": chess.square_name(target),
+                    "description": (f"{_color_name(side).capitalize()}'s {_describe(board, slider)} skewers the "
+                                    f"{_color_name(enemy)} {_describe(board, middle)} and the "
+                                    f"{_describe(board, target)} behind it"),
+                    "highlight_squares": _highlights(green=[slider], yellow=[middle], red=[target]),
+                })
+
+
+def _pawn_can_move(board: chess.Board, square: chess.Square, color: chess.Color) -> bool:
+    forward = square + (8 if color == chess.WHITE else -8)
+    if 0 <= forward < 64 and not board.occupied & chess.BB_SQUARES[forward]:
+        return True
+    return bool(chess.BB_PAWN_ATTACKS[color][square] & board.occupied_co[not color])
+
+
+def _fork_targets(board: chess.Board, attacks: chess.Bitboard, forker_value: int, side: chess.Color,
+                  occupied: Optional[chess.Bitboard] = None) -> List[chess.Square]:
+    enemy = not side
+    candidates = attacks & board.occupied_co[enemy]
+    if forker_value > PIECE_VALUES[chess.PAWN]:
+        # A piece picking off pawns is no fork worth teaching
+        candidates &= ~board.pawns
+    if chess.popcount(candidates) < 2:
+        return []
+    return [t for t in chess.scan_forward(candidates) if _worth_attacking(board, t, forker_value, enemy, occupied)]
+
+
+def _standing_forks(board: chess.Board, side: chess.Color, attacks: Dict[chess.Square, chess.Bitboard],
+                    motifs: List[Dict[str, Any]]) -> None:
+    """`side`'s pieces already attacking two or more enemy pieces they could win."""
+    enemy_pieces = board.occupied_co[not side]
+    for forker in chess.scan_forward(board.occupied_co[side] & ~board.kings):
+        if chess.popcount(attacks[forker] & enemy_pieces) < 2:
+            continue
+        piece_value = _VALUES[board.piece_type_at(forker)]
+        targets = _fork_targets(board, attacks[forker], piece_value, side)
+        if len(targets) < 2 or see(board, forker, not side) >= piece_value:
+            # Not a fork if the forker itself can just be taken
+            continue
+        motifs.append({
+            "type": "fork",
+            "side": _color_name(side),
+            "forker": chess.square_name(forker),
+            "targets": [chess.square_name(t) for t in targets],
+            "description": (f"{_color_name(side).capitalize()}'s {_describe(board, forker)} forks the "
+                            + " and the ".join(_describe(board, t) for t in targets)),
+            "highlight_squares": _highlights(green=[forker], red=targets),
+        })
+
+
+def _fork_moves(board: chess.Board, motifs: List[Dict[str, Any]]) -> None:
+    """Knight, pawn and queen moves that fork, for the side to move, landing where the forker is safe."""
+    side = board.turn
+    own = board.occupied_co[side]
+    enemy_pieces = board.occupied_co[not side]
+    occupied = board.occupied
+    for forker in chess.scan_forward(own & (board.knights | board.queens | board.pawns)):
+        piece_type = board.piece_type_at(forker)
+        piece_value = _VALUES[piece_type]
+        if piece_type == chess.PAWN:
+            forward = forker + (8 if side == chess.WHITE else -8)
+            destinations = chess.BB_SQUARES[forward] & ~occupied & ~chess.BB_BACKRANKS if 0 <= forward < 64 else 0
+        else:
+            destinations = board.attacks_mask(forker) & ~own
+        for to_square in chess.scan_forward(destinations):
+            after = (occupied ^ chess.BB_SQUARES[forker]) | chess.BB_SQUARES[to_square]
+            if piece_type == chess.KNIGHT:
+                attacks = chess.BB_KNIGHT_ATTACKS[to_square]
+            elif piece_type == chess.PAWN:
+                attacks = chess.BB_PAWN_ATTACKS[side][to_square]
+            else:
+                attacks = (chess.BB_DIAG_ATTACKS[to_square][chess.BB_DIAG_MASKS[to_square] & after]
+                           | chess.BB_RANK_ATTACKS[to_square][chess.BB_RANK_MASKS[to_square] & after]
+                           | chess.BB_FILE_ATTACKS[to_square][chess.BB_FILE_MASKS[to_square] & after])
+            if chess.popcount(attacks & enemy_pieces) < 2:
+                continue
+            targets = [t for t in _fork_targets(board, attacks, piece_value, side, after) if t != to_square]
+            if len(targets) < 2:
+                continue
+            # The forker must not just be taken: unattacked there, or defended and attacked only by dearer pieces
+            attackers = board.attackers_mask(not side, to_square, after) & after
+            if attackers:
+                _, cheapest = _least_valuable(board, attackers)
+                if _VALUES[cheapest] < piece_value or not board.attackers_mask(side, to_square, after) & after:
+                    continue
+            move = chess.Move(forker, to_square)
+            if not board.is_legal(move):
+                continue
+            san = board.san(move)
+            motifs.append({
+                "type": "fork",
+                "side": _color_name(side),
+                "move": move.uci(),
+                "san": san,
+                "forker": chess.square_name(to_square),
+                "targets": [chess.square_name(t) for t in targets],
+                "description": (f"{_color_name(side).capitalize()} can fork the "
+                                + " and the ".join(_describe(board, t) for t in targets) + f" with {san}"),
+                "highlight_squares": _highlights(green=[forker, to_square], red=targets),
+            })
+
+
+def _back_rank(board: chess.Board, side: chess.Color, motifs: List[Dict[str, Any]]) -> None:
+    """
+    The enemy king boxed in on its back rank, with a square on that rank
+    where a `side` rook or queen could check it and nothing but the king
+    guards. Flagged as a threat when such a check can be played right now.
+    """
+    enemy = not side
+    heavy = (board.rooks | board.queens) & board.occupied_co[side]
+    if not heavy:
+        return
+    king = board.king(enemy)
+    back_rank = chess.BB_RANK_1 if enemy == chess.WHITE else chess.BB_RANK_8
+    if king is None or not chess.BB_SQUARES[king] & back_rank:
+        return
+    forward = chess.BB_KING_ATTACKS[king] & ~back_rank
+    blockers = forward & board.occupied_co[enemy]
+    if not blockers:
+        return
+    for square in chess.scan_forward(forward & ~blockers):
+        if not board.is_attacked_by(side, square):
+            return
+
+    occupied = board.occupied
+    # Back-rank squares the king sees: a rook or queen landing there gives check
+    checks = chess.BB_RANK_ATTACKS[king][chess.BB_RANK_MASKS[king] & occupied] & ~board.occupied_co[enemy]
+    open_squares = []
+    threat = None
+    for square in chess.scan_forward(checks):
+        if board.attackers_mask(enemy, square) & ~board.kings:
+            continue
+        if chess.BB_KING_ATTACKS[king] & chess.BB_SQUARES[square]:
+            # Next to the king a check needs support, which can't be judged statically
+            continue
+        open_squares.append(square)
+        movers = board.attackers_mask(side, square) & heavy
+        if threat is None and movers and board.turn == side:
+            move = chess.Move(chess.lsb(movers), square)
+            if board.is_legal(move):
+                threat = move
+    if not open_squares:
+        return
+    motif: Dict[str, Any] = {
+        "type": "back_rank",
+        "side": _color_name(side),
+        "king": chess.square_name(king),
+        "blockers": [chess.square_name(s) for s in chess.scan_forward(blockers)],
+        "open_squares": [chess.square_name(s) for s in open_squares],
+        "description": (f"The {_color_name(enemy)} king on {chess.square_name(king)} can't leave the back rank: "
+                        f"a {_color_name(side)} rook or queen check there could be mate"),
+        "highlight_squares": _highlights(yellow=chess.scan_forward(blockers), red=[king]),
+    }
+    if threat is not None:
+        san = board.san(threat)
+        motif.update({"move": threat.uci(), "san": san})
+        motif["description"] += f", starting with {san}"
+        motif["highlight_squares"] = _highlights(green=[threat.from_square, threat.to_square],
+                                                 yellow=chess.scan_forward(blockers), red=[king])
+    motifs.append(motif)
@@ -0,0 +1,237 @@
+"""
+Pondering: searching the AI's next move while the user thinks.
+
+After the AI opponent moves, start() queues a background job for the
+session that ranks the user's likely replies (the reply the AI's own search
+expected first) and searches the position after each one with the same
+limits the real move will use. The results land in the shared
+transposition table, so when the user plays a reply that was pondered the
+foreground search() answers from the table without searching. A reply that
+was still being pondered leaves its finished depths behind, which makes the
+foreground search mostly table lookups.
+
+Pondering is bounded so it can't starve foreground requests:
+
+    - one job per session, replaced when the session's game moves on
+    - PONDER_WORKERS threads for all sessions; the oldest queued job is
+      dropped past PONDER_QUEUE
+    - each job searches at most PONDER_REPLIES replies
+    - a job uses at most PONDER_CPU of a core, and stands still entirely
+      while a foreground search is running (see foreground())
+
+Set PONDER=false to turn it off.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Hashable, Iterator, List, Optional, Set
+
+import chess
+
+from agents.chess.search import (
+    SearchLimits,
+    TranspositionTable,
+    evaluate,
+    position_key,
+    search,
+    transposition_table,
+)
+from shared.metrics import PREFETCH
+
+_METRIC_NAME = "chess_ponder"
+
+# Foreground searches running in this process; pondering waits while any are
+_foreground = 0
+_foreground_lock = threading.Lock()
+
+
+def is_ponder_enabled() -> bool:
+    """Pondering runs unless PONDER=false."""
+    return os.getenv("PONDER", "true").lower() not in ("0", "false", "no")
+
+
+@contextmanager
+def foreground() -> Iterator[None]:
+    """Mark a search a user is waiting for; background pondering pauses until it ends."""
+    global _foreground
+    with _foreground_lock:
+        _foreground += 1
+    try:
+        yield
+    finally:
+        with _foreground_lock:
+            _foreground -= 1
+
+
+class _Job:
+    def __init__(self, session: Hashable, board: chess.Board, limits: SearchLimits, expected: Optional[chess.Move]):
+        self.session = session
+        self.board = board
+        self.limits = limits
+        self.expected = expected
+        self.stop = threading.Event()
+        self.started = False
+        # Positions (after a reply) fully pondered, and the one being pondered now
+        self.done: Set[int] = set()
+        self.current: Optional[int] = None
+        self.future: Optional[Future] = None
+
+
+class Ponderer:
+    """
+    Background searches of the positions a session's user is likely to reach.
+
+    Args:
+        table: Transposition table the searches fill (default: the shared one)
+        workers: Background threads for all sessions (PONDER_WORKERS)
+        replies: Replies pondered per AI move (PONDER_REPLIES)
+        cpu: Share of a core each job may use, 0-1 (PONDER_CPU)
+        max_pending: Jobs queued but not started (PONDER_QUEUE)
+        max_sessions: Sessions whose job is remembered until their user replies
+    """
+
+    def __init__(
+        self,
+        table: Optional[TranspositionTable] = None,
+        workers: Optional[int] = None,
+        replies: Optional[int] = None,
+        cpu: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        max_sessions: int = 1024,
+    ):
+        self.table = table if table is not None else transposition_table
+        self.workers = workers or int(os.getenv("PONDER_WORKERS", "1"))
+        self.replies = replies or int(os.getenv("PONDER_REPLIES", "3"))
+        self.cpu = min(max(cpu or float(os.getenv("PONDER_CPU", "0.5")), 0.05), 1.0)
+        self.max_pending = max_pending or int(os.getenv("PONDER_QUEUE", "16"))
+        self.max_sessions = max_sessions
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # session -> its job, oldest first
+        self._jobs: "OrderedDict[Hashable, _Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, session: Hashable, board: chess.Board, limits: SearchLimits,
+              expected: Optional[chess.Move] = None) -> bool:
+        """
+        Ponder the user's replies in a position the AI just moved into.
+
+        Args:
+            session: Game or conversation the position belongs to
+            board: Position after the AI's move, user to move (copied)
+            limits: Limits the AI's next search will use
+            expected: Reply the AI's search predicted, pondered first
+
+        Returns:
+            True if a job was queued
+        """
+        if not is_ponder_enabled() or board.is_game_over():
+            return False
+        job = _Job(session, board.copy(stack=False), limits, expected)
+        with self._lock:
+            self._cancel(session, "cancelled")
+            queued = [old for old in self._jobs.values() if not old.started]
+            if len(queued) >= self.max_pending:
+                # Newer games are likelier to get a reply soon than ones left waiting
+                self._cancel(queued[0].session, "dropped")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="chess-ponder")
+            self._jobs[session] = job
+            job.future = self._executor.submit(self._run, job)
+            # Finished jobs wait for settle() to count their hits; forget abandoned games
+            while len(self._jobs) > self.max_sessions:
+                self._cancel(next(iter(self._jobs)), "dropped")
+        PREFETCH.inc(name=_METRIC_NAME, outcome="submitted")
+        return True
+
+    def settle(self, session: Hashable, board: chess.Board) -> Optional[str]:
+        """
+        The user's reply has arrived: stop the session's job and record
+        whether the position was pondered.
+
+        Returns:
+            "hit" (fully pondered), "partial" (being pondered), "miss", or None without a job
+        """
+        with self._lock:
+            job = self._jobs.pop(session, None)
+        if job is None:
+            return None
+        job.stop.set()
+        key = position_key(board)
+        outcome = "hit" if key in job.done else "partial" if key == job.current else "miss"
+        PREFETCH.inc(name=_METRIC_NAME, outcome=outcome)
+        return outcome
+
+    def _cancel(self, session: Hashable, outcome: str) -> None:
+        job = self._jobs.pop(session, None)
+        if job is not None:
+            job.stop.set()
+            if job.future is not None and job.future.cancel():
+                PREFETCH.inc(name=_METRIC_NAME, outcome=outcome)
+
+    def _run(self, job: _Job) -> None:
+        job.started = True
+        pause = self._throttle(job)
+        board = job.board
+        try:
+            for reply in self._likely_replies(board, job.expected):
+                if job.stop.is_set():
+                    return
+                board.push(reply)
+                try:
+                    job.current = position_key(board)
+                    result = search(board, job.limits, self.table, job.stop, pause)
+                    if job.stop.is_set():
+                        return
+                    if result.depth >= job.limits.depth or result.cached:
+                        job.done.add(job.current)
+                    job.current = None
+                finally:
+                    board.pop()
+        except Exception as e:
+            print(f"[WARNING] Chess pondering failed: {e}")
+
+    def _likely_replies(self, board: chess.Board, expected: Optional[chess.Move]) -> List[chess.Move]:
+        """The expected reply, then the others by a one-ply look, best for the user first."""
+        scored = []
+        for move in board.legal_moves:
+            if move == expected:
+                continue
+            board.push(move)
+            scored.append((evaluate(board), move))
+            board.pop()
+        scored.sort(key=lambda item: item[0])
+        replies = [expected] if expected is not None and expected in board.legal_moves else []
+        replies += [move for _, move in scored]
+        return replies[:self.replies]
+
+    def _throttle(self, job: _Job):
+        """
+        Pause callback for the job's searches: stand still while a foreground
+        search runs, then sleep long enough to hold the job to its CPU share.
+        The search checks the job's stop event itself right before calling this.
+        """
+        cpu = self.cpu
+        state = {"since": time.perf_counter()}
+
+        def pause() -> None:
+            busy = time.perf_counter() - state["since"]
+            while _foreground and not job.stop.is_set():
+                time.sleep(0.005)
+            if cpu < 1.0 and not job.stop.is_set():
+                time.sleep(busy * (1 - cpu) / cpu)
+            state["since"] = time.perf_counter()
+
+        return pause
+
+    def clear(self) -> None:
+        with self._lock:
+            for session in list(self._jobs):
+                self._cancel(session, "cancelled")
+
+
+ponderer = Ponderer()
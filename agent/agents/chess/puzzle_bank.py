@@ -0,0 +1,313 @@
+"""
+Indexed on-disk bank of chess tactics puzzles.
+
+Puzzles follow the Lichess layout: the FEN is the position before the
+opponent's move that sets the puzzle up, and the solution line starts with
+that move, the user's moves being every second one after it. Nothing is
+loaded at startup; every lookup reads a few pages of SQLite:
+
+    by id               primary key
+    by rating           puzzles_rating_rnd index on (rating, rnd)
+    by theme + rating   puzzle_themes, a WITHOUT ROWID table keyed on
+                        (theme, rating, rnd, id), so the index is the table
+
+rnd is a random key drawn when a puzzle is added. A random puzzle in a
+rating band is found by seeking the rating nearest a random one in the
+band, then the first (rating, rnd) at or above a random rnd at that rating,
+so every puzzle sharing a rating can come up and no query sorts or counts
+the bank. Each takes well under a millisecond however many
+millions of puzzles are stored.
+"""
+
+import os
+import random
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import chess
+
+DEFAULT_PATH = os.path.join("data", "chess_puzzles.sqlite")
+
+# Puzzle rating bands per player level
+LEVEL_RATINGS = {
+    "beginner": (600, 1200),
+    "intermediate": (1200, 1700),
+    "advanced": (1700, 2200),
+    "expert": (2200, 3000),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS puzzles (
+    id TEXT PRIMARY KEY,
+    fen TEXT NOT NULL,
+    moves TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    themes TEXT NOT NULL,
+    rnd INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS puzzles_rating_rnd ON puzzles (rating, rnd);
+CREATE TABLE IF NOT EXISTS themes (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS puzzle_themes (
+    theme INTEGER NOT NULL,
+    rating INTEGER NOT NULL,
+    rnd INTEGER NOT NULL,
+    puzzle TEXT NOT NULL,
+    PRIMARY KEY (theme, rating, rnd, puzzle)
+) WITHOUT ROWID;
+"""
+
+# Banks created before the rnd column: add it and rebuild the theme index
+_MIGRATE_RND = """
+DROP INDEX IF EXISTS puzzles_rating;
+ALTER TABLE puzzles ADD COLUMN rnd INTEGER NOT NULL DEFAULT 0;
+UPDATE puzzles SET rnd = random() & 9223372036854775807;
+CREATE TABLE puzzle_themes_rnd (
+    theme INTEGER NOT NULL,
+    rating INTEGER NOT NULL,
+    rnd INTEGER NOT NULL,
+    puzzle TEXT NOT NULL,
+    PRIMARY KEY (theme, rating, rnd, puzzle)
+) WITHOUT ROWID;
+INSERT INTO puzzle_themes_rnd
+    SELECT t.theme, t.rating, p.rnd, t.puzzle FROM puzzle_themes t JOIN puzzles p ON p.id = t.puzzle;
+DROP TABLE puzzle_themes;
+ALTER TABLE puzzle_themes_rnd RENAME TO puzzle_themes;
+"""
+
+_COLUMNS = "id, fen, moves, rating, themes"
+
+
+class Puzzle(NamedTuple):
+    id: str
+    fen: str
+    # UCI moves, the opponent's setup move first
+    moves: List[str]
+    rating: int
+    themes: List[str]
+
+
+class PuzzleBank:
+    """
+    Tactics puzzles in SQLite, indexed by rating and theme.
+
+    Args:
+        path: Database file; created with its directory if missing
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(puzzles)")}
+        if columns and "rnd" not in columns:
+            self._conn.executescript(f"BEGIN; {_MIGRATE_RND} COMMIT;")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._themes: Dict[str, int] = dict(self._conn.execute("SELECT name, id FROM themes"))
+
+    def add(self, puzzles: Iterable[Puzzle]) -> int:
+        """Insert puzzles in one transaction; returns how many were new."""
+        with self._lock, self._conn:
+            added = 0
+            for puzzle in puzzles:
+                rnd = random.getrandbits(63)
+                cursor = self._conn.execute(
+                    f"INSERT OR IGNORE INTO puzzles ({_COLUMNS}, rnd) VALUES (?, ?, ?, ?, ?, ?)",
+                    (puzzle.id, puzzle.fen, " ".join(puzzle.moves), puzzle.rating, " ".join(puzzle.themes), rnd),
+                )
+                if not cursor.rowcount:
+                    continue
+                added += 1
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO puzzle_themes VALUES (?, ?, ?, ?)",
+                    [(self._theme_id(theme), puzzle.rating, rnd, puzzle.id) for theme in puzzle.themes],
+                )
+            return added
+
+    def get(self, puzzle_id: str) -> Optional[Puzzle]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM puzzles WHERE id = ?", (puzzle_id,)).fetchone()
+        return _puzzle(row) if row else None
+
+    def pick(self, low: int, high: int, theme: Optional[str] = None,
+             rng: Optional[random.Random] = None) -> Optional[Puzzle]:
+        """
+        A random puzzle rated low-high, optionally with a theme.
+
+        Raises:
+            ValueError: If the theme isn't in the bank
+        """
+        rng = rng or random
+        with self._lock:
+            if theme is None:
+                row = self._seek("puzzles", _COLUMNS, "", (), low, high, rng)
+                return _puzzle(row) if row else None
+
+            theme_id = self._themes.get(theme)
+            if theme_id is None:
+                raise ValueError(f"Unknown theme '{theme}'")
+            found = self._seek("puzzle_themes", "puzzle", "theme = ? AND ", (theme_id,), low, high, rng)
+            if found is None:
+                return None
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM puzzles WHERE id = ?", found).fetchone()
+        return _puzzle(row)
+
+    def _seek(self, table: str, columns: str, where: str, args: Tuple[Any, ...], low: int, high: int,
+              rng: Any) -> Optional[Tuple[Any, ...]]:
+        # Caller holds self._lock. The rating nearest a random one in the band,
+        # then the puzzle at or after a random rnd at that rating (wrapping
+        # around), so every puzzle at a rating has the same chance.
+        target = rng.randint(low, high)
+        found = self._conn.execute(
+            f"SELECT rating FROM {table} WHERE {where}rating BETWEEN ? AND ? ORDER BY rating LIMIT 1",
+            (*args, target, high),
+        ).fetchone() or self._conn.execute(
+            f"SELECT rating FROM {table} WHERE {where}rating BETWEEN ? AND ? ORDER BY rating DESC LIMIT 1",
+            (*args, low, target),
+        ).fetchone()
+        if found is None:
+            return None
+        key = (*args, found[0], rng.getrandbits(63))
+        return self._conn.execute(
+            f"SELECT {columns} FROM {table} WHERE {where}rating = ? AND rnd >= ? ORDER BY rnd LIMIT 1",
+            key,
+        ).fetchone() or self._conn.execute(
+            f"SELECT {columns} FROM {table} WHERE {where}rating = ? AND rnd < ? ORDER BY rnd DESC LIMIT 1",
+            key,
+        ).fetchone()
+
+    def themes(self) -> List[str]:
+        return sorted(self._themes)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM puzzles").fetchone()[0]
+
+    def _theme_id(self, name: str) -> int:
+        theme_id = self._themes.get(name)
+        if theme_id is None:
+            theme_id = self._conn.execute("INSERT INTO themes (name) VALUES (?)", (name,)).lastrowid
+            self._themes[name] = theme_id
+        return theme_id
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "PuzzleBank":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _puzzle(row: Tuple[str, str, str, int, str]) -> Puzzle:
+    puzzle_id, fen, moves, rating, themes = row
+    return Puzzle(puzzle_id, fen, moves.split(), rating, themes.split())
+
+
+def describe(puzzle: Puzzle) -> Dict[str, Any]:
+    """A puzzle as served to the user: the position to solve, without the solution."""
+    board = chess.Board(puzzle.fen)
+    setup = chess.Move.from_uci(puzzle.moves[0])
+    setup_san = board.san(setup)
+    board.push(setup)
+    return {
+        "puzzle_id": puzzle.id,
+        "fen": board.fen(),
+        "side": "white" if board.turn == chess.WHITE else "black",
+        "last_move": puzzle.moves[0],
+        "last_move_san": setup_san,
+        "highlight_squares": [
+            {"square": chess.square_name(setup.from_square), "color": "yellow"},
+            {"square": chess.square_name(setup.to_square), "color": "yellow"},
+        ],
+        "moves_to_find": len(puzzle.moves) // 2,
+        "rating": puzzle.rating,
+        "themes": puzzle.themes,
+    }
+
+
+def check_line(puzzle: Puzzle, played: List[str]) -> Dict[str, Any]:
+    """
+    Check the user's moves so far against the solution.
+
+    The opponent's replies are the solution's, so only the user's own moves
+    are passed. Any move that mates is accepted, as on Lichess, even if the
+    solution mates differently.
+
+    Args:
+        puzzle: The puzzle being solved
+        played: The user's moves in UCI, oldest first
+
+    Returns:
+        Dict with correct, solved, and after a correct move that doesn't finish
+        the puzzle the opponent's reply (UCI and SAN) and the position after it.
+        A wrong move also gets hint_square, the square the right move starts from.
+
+    Raises:
+        ValueError: If a move isn't legal in the position it was played in
+    """
+    board = chess.Board(puzzle.fen)
+    board.push_uci(puzzle.moves[0])
+    solution = puzzle.moves[1:]
+    for index, uci in enumerate(played):
+        expected = solution[2 * index] if 2 * index < len(solution) else None
+        try:
+            move = chess.Move.from_uci(uci)
+        except ValueError:
+            raise ValueError(f"'{uci}' is not a UCI move") from None
+        if move not in board.legal_moves:
+            raise ValueError(f"{uci} is not legal in {board.fen()}")
+        if expected is None:
+            raise ValueError("the puzzle was already solved before this move")
+        if uci != expected:
+            board.push(move)
+            if board.is_checkmate():
+                return {"correct": True, "solved": True, "fen": board.fen()}
+            board.pop()
+            return {
+                "correct": False,
+                "solved": False,
+                "fen": board.fen(),
+                "hint_square": expected[:2],
+            }
+        board.push(move)
+        reply = solution[2 * index + 1] if 2 * index + 1 < len(solution) else None
+        if reply is None:
+            return {"correct": True, "solved": True, "fen": board.fen()}
+        if index == len(played) - 1:
+            reply_move = chess.Move.from_uci(reply)
+            san = board.san(reply_move)
+            board.push(reply_move)
+            return {
+                "correct": True,
+                "solved": False,
+                "reply": reply,
+                "reply_san": san,
+                "fen": board.fen(),
+                "moves_left": (len(solution) - 2 * index - 1) // 2,
+            }
+        board.push_uci(reply)
+    return {"correct": True, "solved": False, "fen": board.fen(), "moves_left": (len(solution) + 1) // 2}
+
+
+_bank: Optional[PuzzleBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_puzzle_bank() -> PuzzleBank:
+    """The process-wide bank at CHESS_PUZZLE_DB, opened on first use."""
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            _bank = PuzzleBank(os.getenv("CHESS_PUZZLE_DB", DEFAULT_PATH))
+        return _bank
@@ -0,0 +1,193 @@
+"""
+Streaming import of a tactics-puzzle CSV into the puzzle bank.
+
+Reads the CSV (plain, .gz, .bz2 or .xz) lazily in chunks, checks every
+puzzle's FEN and solution line on a process pool, and writes each checked
+chunk to the PuzzleBank as it comes back, so memory stays flat for the
+millions of rows of the Lichess puzzle database.
+
+Columns are found by a header row naming at least FEN and Moves (with
+PuzzleId, Rating and Themes when present). A file without a header is read
+in the Lichess column order: PuzzleId, FEN, Moves, Rating, RatingDeviation,
+Popularity, NbPlays, Themes, ...
+
+Usage:
+    cd agent
+    uv run python -m agents.chess.puzzle_importer lichess_db_puzzle.csv.gz [--db data/chess_puzzles.sqlite]
+"""
+
+import argparse
+import csv
+import hashlib
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import chess
+
+from agents.chess.puzzle_bank import DEFAULT_PATH, Puzzle, PuzzleBank
+from agents.sudoku.importer import read_lines
+
+# Column of each field in the Lichess export
+LICHESS_COLUMNS = {"id": 0, "fen": 1, "moves": 2, "rating": 3, "themes": 7}
+
+_HEADER_NAMES = {
+    "id": ("puzzleid", "id"),
+    "fen": ("fen",),
+    "moves": ("moves", "solution"),
+    "rating": ("rating",),
+    "themes": ("themes", "theme"),
+}
+
+
+def header_columns(row: List[str]) -> Optional[Dict[str, int]]:
+    """Field -> column for a header row, or None if the row isn't a header."""
+    names = [name.strip().lower() for name in row]
+    columns = {}
+    for field, aliases in _HEADER_NAMES.items():
+        column = next((names.index(alias) for alias in aliases if alias in names), None)
+        if column is not None:
+            columns[field] = column
+    return columns if "fen" in columns and "moves" in columns else None
+
+
+def parse_chunk(lines: List[str], columns: Dict[str, int]) -> Tuple[List[Puzzle], Dict[str, int]]:
+    """Parse and check CSV lines; returns the valid puzzles and a count of rejects by reason."""
+    puzzles = []
+    rejected: Dict[str, int] = {}
+    for row in csv.reader(lines):
+        if not row:
+            continue
+        try:
+            puzzles.append(_parse_row(row, columns))
+        except ValueError as e:
+            reason = str(e)
+            rejected[reason] = rejected.get(reason, 0) + 1
+    return puzzles, rejected
+
+
+def _parse_row(row: List[str], columns: Dict[str, int]) -> Puzzle:
+    def field(name: str) -> str:
+        column = columns.get(name)
+        return row[column].strip() if column is not None and column < len(row) else ""
+
+    fen, moves = field("fen"), field("moves").split()
+    if not fen or len(moves) < 2:
+        raise ValueError("format")
+    try:
+        rating = int(field("rating") or 1500)
+        board = chess.Board(fen)
+    except ValueError:
+        raise ValueError("format") from None
+    # The opponent's setup move and at least one move for the user, all legal
+    for uci in moves:
+        try:
+            move = chess.Move.from_uci(uci)
+        except ValueError:
+            raise ValueError("format") from None
+        if not board.is_legal(move):
+            raise ValueError("illegal_move")
+        board.push(move)
+    puzzle_id = field("id") or hashlib.blake2b(f"{fen} {' '.join(moves)}".encode(), digest_size=6).hexdigest()
+    return Puzzle(puzzle_id, fen, moves, rating, field("themes").split())
+
+
+def import_puzzles(
+    path: str,
+    bank: PuzzleBank,
+    workers: Optional[int] = None,
+    chunk_size: int = 5000,
+    limit: Optional[int] = None,
+    progress_every: int = 200_000,
+) -> Dict[str, int]:
+    """
+    Check every puzzle in a CSV file and add the new ones to the bank.
+
+    Args:
+        path: Puzzle CSV (see module docstring for the columns)
+        bank: Destination bank
+        workers: Worker processes (IMPORT_WORKERS, default: CPU count); 1 checks inline
+        chunk_size: Lines per task sent to a worker
+        limit: Stop after this many lines
+        progress_every: Lines between progress lines
+
+    Returns:
+        Counts of lines read, puzzles added, duplicates and rejects by reason
+    """
+    workers = workers or int(os.getenv("IMPORT_WORKERS", "0")) or os.cpu_count() or 1
+    lines: Iterator[str] = islice(read_lines(path), limit)
+    first = next(lines, None)
+    if first is None:
+        return {"lines": 0, "added": 0, "duplicates": 0}
+    columns = header_columns(next(csv.reader([first])))
+    if columns is None:
+        columns = LICHESS_COLUMNS
+        lines = _prepend(first, lines)
+
+    chunks = iter(lambda: list(islice(lines, chunk_size)), [])
+    stats: Dict[str, int] = {"lines": 0, "added": 0, "duplicates": 0}
+    started = time.perf_counter()
+    next_report = progress_every
+
+    def record(lines_in_chunk: int, result: Tuple[List[Puzzle], Dict[str, int]]) -> None:
+        nonlocal next_report
+        puzzles, rejected = result
+        added = bank.add(puzzles)
+        stats["lines"] += lines_in_chunk
+        stats["added"] += added
+        stats["duplicates"] += len(puzzles) - added
+        for reason, count in rejected.items():
+            stats[f"rejected_{reason}"] = stats.get(f"rejected_{reason}", 0) + count
+        if stats["lines"] >= next_report:
+            next_report += progress_every
+            rate = stats["lines"] / max(time.perf_counter() - started, 1e-9)
+            print(f"[OK] {stats['lines']:,} lines, {stats['added']:,} new puzzles ({rate:,.0f} lines/s)")
+
+    if workers <= 1:
+        for chunk in chunks:
+            record(len(chunk), parse_chunk(chunk, columns))
+        return stats
+
+    # Oldest first, so chunks are stored in file order
+    in_flight: Deque[Tuple[int, Future]] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks:
+            if len(in_flight) >= workers * 2:
+                size, future = in_flight.popleft()
+                record(size, future.result())
+            in_flight.append((len(chunk), pool.submit(parse_chunk, chunk, columns)))
+        while in_flight:
+            size, future = in_flight.popleft()
+            record(size, future.result())
+    return stats
+
+
+def _prepend(first: str, lines: Iterator[str]) -> Iterator[str]:
+    yield first
+    yield from lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a chess tactics-puzzle CSV")
+    parser.add_argument("path", help="Puzzle CSV; .gz, .bz2 and .xz are read compressed")
+    parser.add_argument("--db", default=os.getenv("CHESS_PUZZLE_DB", DEFAULT_PATH), help="Puzzle bank")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Lines per worker task")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many lines")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with PuzzleBank(args.db) as bank:
+        stats = import_puzzles(args.path, bank, args.workers, args.chunk_size, args.limit)
+        total = bank.count()
+    elapsed = time.perf_counter() - started
+    print(f"[OK] Imported {args.path} into {args.db} in {elapsed:.1f}s ({total:,} puzzles in the bank)")
+    for name, value in stats.items():
+        print(f"    {name}: {value:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Whole-game review from a PGN.
+
+review_game() replays the game, searches every position it reached and
+streams one finding per move as soon as the positions before and after it
+are scored: the evaluation curve, how much the move lost against the
+engine's best, a classification, and the tactics the mover had on the
+board but didn't play.
+
+Positions are searched on a process pool (REVIEW_WORKERS, default: CPU
+count; 1 searches inline) in game order, at most 2 per worker in flight,
+so the first moves are reported after a couple of searches while the rest
+of a long game runs in parallel. Workers of one review share a
+SharedTranspositionTable, so lines one worker searched are table hits for
+the workers searching the positions next to it.
+
+    loss >= 300 centipawns  blunder
+    loss >= 100             mistake
+    loss >= 50              inaccuracy
+
+Evaluations are clipped to +-1000 centipawns, so a move that lets the
+opponent force mate, from a position where the mover wasn't already being
+mated, is a blunder whatever its loss.
+"""
+
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import chess
+import chess.pgn
+
+from agents.chess.motifs import find_motifs
+from agents.chess.search import (
+    MATE,
+    AnyTable,
+    SearchLimits,
+    SharedTranspositionTable,
+    TranspositionTable,
+    search,
+)
+
+CLASSIFICATIONS = (("blunder", 300), ("mistake", 100), ("inaccuracy", 50))
+
+# Motifs that win something when the mover plays them, and so can be missed
+_MISSABLE = ("fork", "hanging", "back_rank")
+
+# Evaluations are clipped here so a missed mate counts as a big loss, not a huge one
+_EVAL_CAP = 1000
+
+_MATE_BOUND = MATE - 1000
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Worker side: shared tables attached by name, newest last
+_attached: "OrderedDict[str, SharedTranspositionTable]" = OrderedDict()
+_MAX_ATTACHED = 4
+
+
+class InvalidGame(ValueError):
+    """A PGN that doesn't hold a playable game."""
+
+
+class _GameBuilder(chess.pgn.GameBuilder):
+    # Parse errors in a user's PGN are reported back to them, not logged
+    def handle_error(self, error: Exception) -> None:
+        self.game.errors.append(error)
+
+
+def review_limits() -> SearchLimits:
+    """Search limits per position (REVIEW_DEPTH, REVIEW_NODES)."""
+    return SearchLimits(int(os.getenv("REVIEW_DEPTH", "3")), int(os.getenv("REVIEW_NODES", "6000")))
+
+
+def parse_game(pgn: str, max_plies: int = 600) -> Tuple[Dict[str, str], chess.Board, List[chess.Move]]:
+    """
+    First game of a PGN text.
+
+    Returns:
+        The game's headers, its starting position and its mainline moves
+
+    Raises:
+        InvalidGame: If there is no game, an illegal move, or more than max_plies moves
+    """
+    game = chess.pgn.read_game(io.StringIO(pgn), Visitor=_GameBuilder)
+    if game is None:
+        raise InvalidGame("no game found in the PGN")
+    if game.errors:
+        raise InvalidGame(f"the PGN doesn't parse: {game.errors[0]}")
+    moves = list(game.mainline_moves())
+    if not moves:
+        raise InvalidGame("the game has no moves")
+    if len(moves) > max_plies:
+        raise InvalidGame(f"the game has {len(moves)} plies; at most {max_plies} can be reviewed")
+    headers = {key: value for key, value in game.headers.items() if value.strip("?.")}
+    return headers, game.board(), moves
+
+
+def analyze_position(fen: str, limits: SearchLimits, table: Optional[AnyTable] = None,
+                     table_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Score and best move of one position, with the tactics its side to move has.
+
+    Runs in review workers; table_name attaches the review's shared table.
+
+    Returns:
+        Dict with score (centipawns for the side to move), shallow (score one
+        ply shallower), best (UCI), best_san, pv (SAN) and motifs
+    """
+    board = chess.Board(fen)
+    if board.is_checkmate():
+        return {"score": -MATE, "shallow": -MATE, "best": None, "best_san": None, "pv": [], "motifs": []}
+    if board.is_game_over(claim_draw=False):
+        return {"score": 0, "shallow": 0, "best": None, "best_san": None, "pv": [], "motifs": []}
+    if table_name is not None:
+        table = _attach(table_name)
+    # One ply shallower first: the score the move into this position is judged
+    # by, at the same horizon as the search of the position before it
+    shallow = search(board, limits._replace(depth=max(limits.depth - 1, 1)), table)
+    result = search(board, limits, table)
+    side = "white" if board.turn == chess.WHITE else "black"
+    return {
+        "score": result.score,
+        "shallow": shallow.score,
+        "best": result.move.uci() if result.move else None,
+        "best_san": board.san(result.move) if result.move else None,
+        "pv": board.variation_san(result.pv).split()[:8] if result.pv else [],
+        "motifs": [m for m in find_motifs(board) if m["side"] == side and m["type"] in _MISSABLE],
+    }
+
+
+def _attach(name: str) -> SharedTranspositionTable:
+    table = _attached.get(name)
+    if table is None:
+        table = _attached[name] = SharedTranspositionTable(name=name)
+        while len(_attached) > _MAX_ATTACHED:
+            _attached.popitem(last=False)[1].close()
+    else:
+        _attached.move_to_end(name)
+    return table
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned, not forked: the server process runs threads
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def review_game(pgn: str, workers: Optional[int] = None, limits: Optional[SearchLimits] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Review a game move by move, yielding findings as they're ready.
+
+    Args:
+        pgn: PGN text; the first game's mainline is reviewed
+        workers: Worker processes (REVIEW_WORKERS, default: CPU count); 1 searches inline
+        limits: Search limits per position (default: review_limits())
+
+    Yields:
+        {"type": "game"} with the headers and ply count first, then one
+        {"type": "move"} per ply in order, then {"type": "summary"}
+
+    Raises:
+        InvalidGame: Before anything is yielded, if the PGN can't be reviewed
+    """
+    headers, board, moves = parse_game(pgn)
+    workers = workers or int(os.getenv("REVIEW_WORKERS", "0")) or os.cpu_count() or 1
+    limits = limits or review_limits()
+
+    fens = [board.fen()]
+    for move in moves:
+        board.push(move)
+        fens.append(board.fen())
+    board = chess.Board(fens[0])
+    return _review(headers, board, moves, fens, workers, limits)
+
+
+def _review(headers: Dict[str, str], board: chess.Board, moves: List[chess.Move], fens: List[str],
+            workers: int, limits: SearchLimits) -> Iterator[Dict[str, Any]]:
+    yield {"type": "game", "headers": headers, "plies": len(moves)}
+    findings: List[Dict[str, Any]] = []
+    previous: Optional[Dict[str, Any]] = None
+    for ply, analysis in enumerate(_analyses(fens, workers, limits)):
+        if previous is not None:
+            move = moves[ply - 1]
+            finding = _finding(board, move, ply, previous, analysis)
+            board.push(move)
+            findings.append(finding)
+            yield finding
+        previous = analysis
+    yield _summary(findings)
+
+
+def _analyses(fens: List[str], workers: int, limits: SearchLimits) -> Iterator[Dict[str, Any]]:
+    """analyze_position() of every position, in order."""
+    if workers <= 1:
+        # A table of its own so reviews don't evict the live games' entries
+        table = TranspositionTable()
+        for fen in fens:
+            yield analyze_position(fen, limits, table)
+        return
+
+    pool = _get_pool(workers)
+    table = SharedTranspositionTable(int(os.getenv("REVIEW_TT_MB", "16")) * (1 << 20) // 16)
+    # Oldest first, so positions come back in game order
+    in_flight: Deque[Future] = deque()
+    try:
+        for fen in fens:
+            in_flight.append(pool.submit(analyze_position, fen, limits, None, table.name))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+    finally:
+        # Also reached when the reader stops early, e.g. a closed stream
+        for future in in_flight:
+            future.cancel()
+        table.close()
+        table.unlink()
+
+
+def _finding(board: chess.Board, move: chess.Move, ply: int, before: Dict[str, Any],
+             after: Dict[str, Any]) -> Dict[str, Any]:
+    """What one move did, from the analyses of the positions before and after it."""
+    mover = board.turn
+    side = "white" if mover == chess.WHITE else "black"
+    san = board.san(move)
+    # Both from the mover's side: the best they had, and what their move left them
+    best = _clip(before["score"])
+    played = -_clip(after["shallow"])
+    loss = 0 if move.uci() == before["best"] else max(0, best - played)
+    classification = next((name for name, threshold in CLASSIFICATIONS if loss >= threshold), None)
+    if loss and after["score"] >= _MATE_BOUND and before["score"] > -_MATE_BOUND:
+        classification = "blunder"
+
+    missed = []
+    if loss >= 100:
+        for motif in before["motifs"]:
+            if motif.get("move", "") == move.uci():
+                continue
+            if motif["type"] == "hanging" and chess.square_name(move.to_square) == motif["square"]:
+                continue
+            missed.append(motif)
+
+    white_eval = -after["score"] if mover == chess.WHITE else after["score"]
+    return {
+        "type": "move",
+        "ply": ply,
+        "move_number": board.fullmove_number,
+        "side": side,
+        "san": san,
+        "uci": move.uci(),
+        "eval": _clip(white_eval),
+        "mate_in": _mate_in(white_eval),
+        "best_move": before["best_san"],
+        "best_line": before["pv"],
+        "loss": loss,
+        "classification": classification,
+        "missed_tactics": [
+            {"type": m["type"], "description": m["description"], "highlight_squares": m["highlight_squares"]}
+            for m in missed
+        ],
+    }
+
+
+def _summary(findings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    sides: Dict[str, Dict[str, Any]] = {}
+    for side in ("white", "black"):
+        own = [f for f in findings if f["side"] == side]
+        counts = {name: sum(1 for f in own if f["classification"] == name) for name, _ in CLASSIFICATIONS}
+        sides[side] = {
+            "moves": len(own),
+            "average_loss": round(sum(f["loss"] for f in own) / len(own)) if own else 0,
+            **counts,
+            "missed_tactics": sum(len(f["missed_tactics"]) for f in own),
+        }
+    worst = sorted((f for f in findings if f["classification"] in ("blunder", "mistake")),
+                   key=lambda f: (f["classification"] != "blunder", -f["loss"]))[:3]
+    return {
+        "type": "summary",
+        "eval_curve": [f["eval"] for f in findings],
+        "sides": sides,
+        "key_moments": [
+            {"ply": f["ply"], "move_number": f["move_number"], "side": f["side"], "san": f["san"],
+             "classification": f["classification"], "loss": f["loss"], "best_move": f["best_move"]}
+            for f in sorted(worst, key=lambda f: f["ply"])
+        ],
+    }
+
+
+def _clip(score: int) -> int:
+    return max(-_EVAL_CAP, min(_EVAL_CAP, score))
+
+
+def _mate_in(score: int) -> Optional[int]:
+    """Moves to mate for a mate score (negative when White gets mated), else None."""
+    moves = (MATE - abs(score) + 1) // 2
+    if abs(score) < _MATE_BOUND or not moves:
+        return None
+    return moves if score > 0 else -moves
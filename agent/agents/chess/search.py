@@ -0,0 +1,496 @@
+"""
+Alpha-beta move search with a shared transposition table.
+
+search() runs an iterative-deepening negamax with quiescence on captures,
+bounded by a depth limit and a node budget, so the cost of a move is known
+up front. Every search, whether for a foreground request or for pondering
+(see ponder.py), reads and writes one process-wide TranspositionTable. A
+position some earlier search finished to the requested depth, for this user
+or another, is answered from the table without searching.
+
+Scores are centipawns from the side to move: material plus piece-square
+tables.
+
+Weaker play (see strength.py) comes from smaller limits and from noise: a
+random offset per root move, so the search sometimes prefers a move that
+scores a little worse. Only the root is perturbed and it isn't stored, so
+the table stays exact for every other search.
+"""
+
+import os
+import random
+import struct
+import threading
+from itertools import islice
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import chess
+
+MATE = 100_000
+# Scores beyond this are mates, stored relative to the position rather than the root
+_MATE_BOUND = MATE - 1000
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+PIECE_VALUES = {
+    chess.PAWN: 100,
+    chess.KNIGHT: 320,
+    chess.BISHOP: 330,
+    chess.ROOK: 500,
+    chess.QUEEN: 900,
+    chess.KING: 0,
+}
+
+# Piece-square tables from White's side, a8 first (Michniewski's simplified evaluation)
+_TABLES = {
+    chess.PAWN: (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ),
+    chess.KNIGHT: (
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ),
+    chess.BISHOP: (
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ),
+    chess.ROOK: (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ),
+    chess.QUEEN: (
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ),
+    chess.KING: (
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ),
+}
+
+# Value plus table bonus per (piece type, color), indexed by square (a1 = 0)
+_SQUARE_SCORES: Dict[Tuple[int, bool], Tuple[int, ...]] = {
+    (piece_type, color): tuple(
+        PIECE_VALUES[piece_type] + table[square ^ 56 if color == chess.WHITE else square]
+        for square in chess.SQUARES
+    )
+    for piece_type, table in _TABLES.items()
+    for color in chess.COLORS
+}
+
+# How often (in nodes) a search checks its stop event and pause callback
+_CHECK_EVERY = 256
+
+
+def position_key(board: chess.Board) -> int:
+    """
+    Transposition-table key of a position: pieces, side to move, castling and
+    en passant. A hash of ints only, so it is the same in every process.
+    """
+    return hash((
+        board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings,
+        board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK], board.turn,
+        board.clean_castling_rights(), board.ep_square if board.has_legal_en_passant() else -1,
+    ))
+
+
+def evaluate(board: chess.Board) -> int:
+    """Static score of the position for the side to move, in centipawns."""
+    score = 0
+    occupied_co = board.occupied_co
+    for piece_type, bitboard in (
+        (chess.PAWN, board.pawns), (chess.KNIGHT, board.knights), (chess.BISHOP, board.bishops),
+        (chess.ROOK, board.rooks), (chess.QUEEN, board.queens), (chess.KING, board.kings),
+    ):
+        white = _SQUARE_SCORES[piece_type, chess.WHITE]
+        black = _SQUARE_SCORES[piece_type, chess.BLACK]
+        for square in chess.scan_forward(bitboard & occupied_co[chess.WHITE]):
+            score += white[square]
+        for square in chess.scan_forward(bitboard & occupied_co[chess.BLACK]):
+            score -= black[square]
+    return score if board.turn == chess.WHITE else -score
+
+
+class TranspositionTable:
+    """
+    Bounded map of position key -> (depth, score, bound, best move).
+
+    Shared by every search in the process. Reads take no lock; writes do,
+    so the oldest entries can be dropped safely when the table is full.
+
+    Args:
+        max_entries: Positions kept (CHESS_TT_ENTRIES); the oldest eighth is dropped when full
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv("CHESS_TT_ENTRIES", "200000"))
+        self._entries: Dict[int, Tuple[int, int, int, Optional[chess.Move]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: int) -> Optional[Tuple[int, int, int, Optional[chess.Move]]]:
+        return self._entries.get(key)
+
+    def put(self, key: int, depth: int, score: int, bound: int, move: Optional[chess.Move]) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            # A shallower result never replaces a deeper one
+            if entry is not None and entry[0] > depth:
+                return
+            self._entries[key] = (depth, score, bound, move)
+            if len(self._entries) > self.max_entries:
+                for old in list(islice(self._entries, self.max_entries // 8 or 1)):
+                    del self._entries[old]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+transposition_table = TranspositionTable()
+
+
+class SharedTranspositionTable:
+    """
+    TranspositionTable over a fixed-size block of shared memory, so searches
+    in several processes fill and read one table.
+
+    Each slot is 16 bytes: the entry packed into 64 bits, and the position
+    key XORed with it. Writers don't lock; a slot torn by two processes
+    writing at once fails the key check and reads as empty.
+
+    Args:
+        entries: Slots (ignored when attaching)
+        name: Attach to an existing table by name instead of creating one
+    """
+
+    _SLOT = struct.Struct("<QQ")
+    _MASK = (1 << 64) - 1
+
+    def __init__(self, entries: int = 1 << 20, name: Optional[str] = None):
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=entries * self._SLOT.size)
+            self._shm.buf[:] = bytes(len(self._shm.buf))
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        self.entries = len(self._shm.buf) // self._SLOT.size
+        self._buf = self._shm.buf
+
+    def get(self, key: int) -> Optional[Tuple[int, int, int, Optional[chess.Move]]]:
+        check, data = self._SLOT.unpack_from(self._buf, (key % self.entries) * self._SLOT.size)
+        if not data or check ^ data != key & self._MASK:
+            return None
+        move_bits = data >> 32 & 0xFFFF
+        move = None
+        if move_bits:
+            move = chess.Move(move_bits & 63, move_bits >> 6 & 63, (move_bits >> 12 & 7) or None)
+        return data >> 50, (data & 0xFFFFFFFF) - (1 << 31), data >> 48 & 3, move
+
+    def put(self, key: int, depth: int, score: int, bound: int, move: Optional[chess.Move]) -> None:
+        offset = (key % self.entries) * self._SLOT.size
+        check, data = self._SLOT.unpack_from(self._buf, offset)
+        # Keep a deeper result for the same position; any other position is overwritten
+        if data and check ^ data == key & self._MASK and data >> 50 > depth:
+            return
+        move_bits = 0
+        if move is not None:
+            move_bits = 1 << 15 | (move.promotion or 0) << 12 | move.to_square << 6 | move.from_square
+        data = min(depth, 255) << 50 | bound << 48 | move_bits << 32 | (score + (1 << 31)) & 0xFFFFFFFF
+        self._SLOT.pack_into(self._buf, offset, (key & self._MASK) ^ data, data)
+
+    def close(self) -> None:
+        self._buf.release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Free the memory once every process has closed it."""
+        self._shm.unlink()
+
+
+AnyTable = Union[TranspositionTable, SharedTranspositionTable]
+
+
+class SearchLimits(NamedTuple):
+    """How far a search may go: plies of full-width search and nodes visited."""
+    depth: int
+    nodes: int
+
+
+class SearchResult(NamedTuple):
+    move: Optional[chess.Move]
+    score: int
+    # Deepest fully searched depth; 0 if the answer came from the budget running out early
+    depth: int
+    nodes: int
+    pv: List[chess.Move]
+    # Answered from the transposition table without searching
+    cached: bool = False
+
+
+class _Stopped(Exception):
+    pass
+
+
+def search(
+    board: chess.Board,
+    limits: SearchLimits,
+    table: Optional[AnyTable] = None,
+    stop: Optional[threading.Event] = None,
+    pause: Optional[Callable[[], None]] = None,
+    noise: int = 0,
+    rng: Optional[random.Random] = None,
+) -> SearchResult:
+    """
+    Best move for the side to move, within limits.
+
+    Args:
+        board: Position to search; restored before returning
+        limits: Depth and node budget
+        table: Transposition table (default: the process-wide one)
+        stop: Set from another thread to end the search early
+        pause: Called every few hundred nodes, e.g. to throttle background work
+        noise: Standard deviation, in centipawns, of the offset added to each root move's score
+        rng: Random source for the noise (default: the random module)
+
+    Returns:
+        The result of the deepest completed iteration. A search stopped
+        before finishing depth 1 still returns a legal move when there is one.
+    """
+    table = table if table is not None else transposition_table
+    if not noise:
+        entry = table.get(position_key(board))
+        if entry is not None and entry[0] >= limits.depth and entry[2] == EXACT and entry[3] in board.legal_moves:
+            return SearchResult(entry[3], entry[1], entry[0], 0, principal_variation(board, table, entry[0]), True)
+
+    searcher = _Searcher(board, table, limits.nodes, stop, pause, noise, rng)
+    result = SearchResult(None, 0, 0, 0, [])
+    for depth in range(1, limits.depth + 1):
+        try:
+            score = searcher.negamax(depth, -MATE - 1, MATE + 1, 0)
+        except _Stopped:
+            break
+        if noise:
+            # The noisy root isn't in the table; the line after it is
+            move = searcher.root_best
+            pv = []
+            if move is not None:
+                board.push(move)
+                pv = [move] + principal_variation(board, table, depth - 1)
+                board.pop()
+        else:
+            entry = table.get(position_key(board))
+            move = entry[3] if entry is not None else None
+            pv = principal_variation(board, table, depth)
+        result = SearchResult(move, score, depth, searcher.nodes, pv)
+        if abs(score) >= _MATE_BOUND:
+            break
+    if result.move is None:
+        move = searcher.root_best or next(iter(searcher.ordered_moves(None)), None)
+        result = SearchResult(move, 0, 0, searcher.nodes, [move] if move else [])
+    return result._replace(nodes=searcher.nodes)
+
+
+def principal_variation(board: chess.Board, table: AnyTable, max_length: int) -> List[chess.Move]:
+    """Best line from a position, following the table's best moves."""
+    line: List[chess.Move] = []
+    seen = set()
+    for _ in range(max_length):
+        key = position_key(board)
+        entry = table.get(key)
+        if entry is None or entry[3] is None or key in seen or entry[3] not in board.legal_moves:
+            break
+        seen.add(key)
+        line.append(entry[3])
+        board.push(entry[3])
+    for _ in line:
+        board.pop()
+    return line
+
+
+class _Searcher:
+    def __init__(self, board: chess.Board, table: AnyTable, max_nodes: int,
+                 stop: Optional[threading.Event], pause: Optional[Callable[[], None]],
+                 noise: int = 0, rng: Optional[random.Random] = None):
+        self.board = board
+        self.table = table
+        self.max_nodes = max_nodes
+        self.stop = stop
+        self.pause = pause
+        self.noise = noise
+        self.rng = rng or random
+        # Root move -> its noise offset, drawn once so every iteration agrees
+        self.offsets: Dict[chess.Move, int] = {}
+        self.nodes = 0
+        # Best root move of the current iteration so far, for a search stopped mid-way
+        self.root_best: Optional[chess.Move] = None
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if self.nodes >= self.max_nodes:
+            raise _Stopped
+        if not self.nodes % _CHECK_EVERY:
+            if self.stop is not None and self.stop.is_set():
+                raise _Stopped
+            if self.pause is not None:
+                self.pause()
+
+    def ordered_moves(self, first: Optional[chess.Move]) -> List[chess.Move]:
+        """Legal moves: the table's best move, then captures by most valuable victim, then the rest."""
+        board = self.board
+        scored = []
+        for move in board.legal_moves:
+            if move == first:
+                order = 1_000_000
+            elif board.is_capture(move):
+                victim = board.piece_type_at(move.to_square) or chess.PAWN
+                order = 10_000 + PIECE_VALUES[victim] * 10 - PIECE_VALUES[board.piece_type_at(move.from_square)] // 10
+            elif move.promotion:
+                order = 9_000 + PIECE_VALUES[move.promotion]
+            else:
+                order = 0
+            scored.append((order, move))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored]
+
+    def negamax(self, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self._tick()
+        board = self.board
+        key = position_key(board)
+        entry = self.table.get(key)
+        first = None
+        if entry is not None:
+            entry_depth, score, bound, first = entry
+            if ply and entry_depth >= depth:
+                score = _from_table(score, ply)
+                if bound == EXACT or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+                    return score
+
+        if ply and (board.halfmove_clock >= 100 or board.is_insufficient_material()):
+            return 0
+        if depth <= 0:
+            return self.quiesce(alpha, beta, ply)
+
+        moves = self.ordered_moves(first)
+        if not moves:
+            return -MATE + ply if board.is_check() else 0
+
+        original_alpha = alpha
+        best_score = -MATE - 1
+        best_move = None
+        for move in moves:
+            offset = self._offset(move) if self.noise and not ply else 0
+            board.push(move)
+            try:
+                # The window is shifted so the offset score is compared against alpha and beta
+                score = -self.negamax(depth - 1, -(beta - offset), -(alpha - offset), ply + 1) + offset
+            finally:
+                board.pop()
+            if score > best_score:
+                best_score, best_move = score, move
+                if not ply:
+                    self.root_best = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if self.noise and not ply:
+            return best_score
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.put(key, depth, _to_table(best_score, ply), bound, best_move)
+        return best_score
+
+    def _offset(self, move: chess.Move) -> int:
+        offset = self.offsets.get(move)
+        if offset is None:
+            offset = self.offsets[move] = round(self.rng.gauss(0, self.noise))
+        return offset
+
+    def quiesce(self, alpha: int, beta: int, ply: int) -> int:
+        """Captures only, until the position is quiet, so the static score isn't mid-exchange."""
+        self._tick()
+        board = self.board
+        stand_pat = evaluate(board)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+        captures = []
+        for move in board.generate_legal_captures():
+            victim = board.piece_type_at(move.to_square) or chess.PAWN
+            captures.append((PIECE_VALUES[victim] * 10 - PIECE_VALUES[board.piece_type_at(move.from_square)] // 10, move))
+        captures.sort(key=lambda item: item[0], reverse=True)
+        for _, move in captures:
+            board.push(move)
+            try:
+                score = -self.quiesce(-beta, -alpha, ply + 1)
+            finally:
+                board.pop()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+
+def _to_table(score: int, ply: int) -> int:
+    """Mate scores are stored as distance from the position, not from the root."""
+    if score >= _MATE_BOUND:
+        return score + ply
+    if score <= -_MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _from_table(score: int, ply: int) -> int:
+    if score >= _MATE_BOUND:
+        return score - ply
+    if score <= -_MATE_BOUND:
+        return score + ply
+    return score
@@ -1,6 +1,6 @@
 """Chess agent state schema."""
 
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from shared.base_state import BaseTeachingState
 
 
@@ -10,3 +10,8 @@ class ChessAgentState(BaseTeachingState):
     # Chess-specific state
     chess_fen: Optional[str] = None
     chess_game_mode: str = "practice"  # practice, vs_ai, learn
+
+    # The user's rating from their results against the AI; the "adaptive" level plays at it
+    chess_rating: int = 1200
+    # Recent results against the AI, newest last (see strength.record_result)
+    chess_results: List[Dict[str, Any]] = []
@@ -0,0 +1,122 @@
+"""
+Playing strength of the AI opponent for a target rating.
+
+A rating maps to a search depth, a node budget and root noise (see
+search.py). The node budget is what bounds the CPU a move costs, so
+capacity can be planned per level at a few tens of microseconds of CPU
+per node.
+
+    rating  depth  nodes   noise (cp)
+     400      1      100     300
+     800      1      400     180
+    1200      2    1,000      90
+    1500      2    2,000      35
+    1800      2    4,000       0    "advanced"
+    2200      3   15,000       0    "expert"
+    2600      4   50,000       0
+
+Between anchors the node budget is interpolated geometrically and the
+noise linearly; the depth is the lower anchor's. The anchors are rough:
+they are meant to be tuned from the results users get against them.
+
+The "adaptive" level plays at the user's own rating, estimated from their
+results against the AI with the Elo formula, so they win about half their
+games as they improve.
+"""
+
+import math
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from agents.chess.search import SearchLimits
+
+# (rating, depth, nodes, noise)
+_ANCHORS = (
+    (400, 1, 100, 300),
+    (800, 1, 400, 180),
+    (1200, 2, 1_000, 90),
+    (1500, 2, 2_000, 35),
+    (1800, 2, 4_000, 0),
+    (2200, 3, 15_000, 0),
+    (2600, 4, 50_000, 0),
+)
+
+MIN_RATING = _ANCHORS[0][0]
+MAX_RATING = _ANCHORS[-1][0]
+
+# Fixed skill levels as ratings
+SKILL_RATINGS = {
+    "beginner": 600,
+    "intermediate": 1200,
+    "advanced": 1800,
+    "expert": 2200,
+}
+
+# Rating a user starts from before their first result
+DEFAULT_RATING = 1200
+
+# Results kept in ChessAgentState.chess_results
+MAX_RESULTS = 20
+
+RESULT_SCORES = {"win": 1.0, "draw": 0.5, "loss": 0.0}
+
+
+class Strength(NamedTuple):
+    rating: int
+    limits: SearchLimits
+    # Standard deviation of the root noise, in centipawns
+    noise: int
+
+
+def strength_for(rating: int) -> Strength:
+    """Search limits and noise for a rating, clamped to the supported range."""
+    rating = min(max(int(rating), MIN_RATING), MAX_RATING)
+    for low, high in zip(_ANCHORS, _ANCHORS[1:]):
+        if rating <= high[0]:
+            break
+    fraction = (rating - low[0]) / (high[0] - low[0])
+    if fraction >= 1:
+        low = high
+        fraction = 0.0
+    nodes = round(low[2] * (high[2] / low[2]) ** fraction)
+    noise = round(low[3] + (high[3] - low[3]) * fraction)
+    return Strength(rating, SearchLimits(low[1], nodes), noise)
+
+
+def strength_for_level(skill_level: str, rating: Optional[int] = None) -> Strength:
+    """Strength for a skill level; "adaptive" plays at the given rating, unknown levels at DEFAULT_RATING."""
+    if skill_level == "adaptive":
+        return strength_for(rating or DEFAULT_RATING)
+    return strength_for(SKILL_RATINGS.get(skill_level, DEFAULT_RATING))
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    """Elo expected score of a player against an opponent, 0-1."""
+    return 1 / (1 + math.pow(10, (opponent - rating) / 400))
+
+
+def record_result(rating: int, results: List[Dict[str, Any]], result: str,
+                  opponent: Optional[int] = None) -> Dict[str, Any]:
+    """
+    The user's rating and result history after a game against the AI.
+
+    Args:
+        rating: The user's rating before the game
+        results: Earlier results, newest last (not modified)
+        result: "win", "draw" or "loss", from the user's side
+        opponent: Rating the AI played at (default: the user's rating, as adaptive play does)
+
+    Returns:
+        Dict with chess_rating and chess_results, ready to merge into the state
+
+    Raises:
+        ValueError: For an unknown result
+    """
+    if result not in RESULT_SCORES:
+        raise ValueError(f"Unknown result '{result}': use win, draw or loss")
+    opponent = rating if opponent is None else opponent
+    # Moves fast while there is little to go on, then settles
+    k = 40 if len(results) < 10 else 20
+    change = round(k * (RESULT_SCORES[result] - expected_score(rating, opponent)))
+    new_rating = min(max(rating + change, MIN_RATING), MAX_RATING)
+    entry = {"result": result, "opponent_rating": opponent, "rating": new_rating}
+    return {"chess_rating": new_rating, "chess_results": (list(results) + [entry])[-MAX_RESULTS:]}
@@ -1,15 +1,34 @@
 """Chess tools for position analysis and move suggestions."""
 import chess
-import random
-from typing import Optional, Dict, List, Any
-from langchain.tools import tool
+import json
+import threading
+from typing import Hashable, Optional, Dict, List, Any
+from langchain.tools import tool, ToolRuntime
+from langchain_core.messages import ToolMessage
+from langgraph.types import Command
+from agents.chess.motifs import find_motifs
+from agents.chess.ponder import foreground, ponderer
+from agents.chess.puzzle_bank import LEVEL_RATINGS, check_line, describe, get_puzzle_bank
+from agents.chess.review import InvalidGame, review_game
+from agents.chess.search import search
+from agents.chess.strength import DEFAULT_RATING, Strength, record_result, strength_for, strength_for_level
+from shared.base_state import readable
 
 
 class ChessAnalyzer:
     """Analyzes chess positions and suggests moves."""
     
     def __init__(self):
-        self.board = chess.Board()
+        # Tool calls run concurrently on a thread pool; each thread gets its
+        # own board so one call's load_fen never clobbers another's position
+        self._local = threading.local()
+
+    @property
+    def board(self) -> chess.Board:
+        board = getattr(self._local, "board", None)
+        if board is None:
+            board = self._local.board = chess.Board()
+        return board
     
     def load_fen(self, fen: str) -> bool:
         """Load a position from FEN notation."""
@@ -52,7 +71,10 @@ class ChessAnalyzer:
         """Analyze a chess position."""
         if not self.load_fen(fen):
             return {"error": "Invalid FEN"}
-        
+        return self._analysis(fen)
+    
+    def _analysis(self, fen: str) -> Dict[str, Any]:
+        """Analysis of the loaded board."""
         material = self.get_material_count()
         
         analysis = {
@@ -69,46 +91,90 @@ class ChessAnalyzer:
                 "white_queenside": self.board.has_queenside_castling_rights(chess.WHITE),
                 "black_kingside": self.board.has_kingside_castling_rights(chess.BLACK),
                 "black_queenside": self.board.has_queenside_castling_rights(chess.BLACK),
-            }
+            },
+            "tactics": find_motifs(self.board),
         }
         
         return analysis
     
-    def suggest_move(self, fen: str, skill_level: str = "intermediate") -> Optional[str]:
-        """Suggest a move based on skill level."""
+    def suggest_move(self, fen: str, skill_level: str = "intermediate",
+                     session: Optional[Hashable] = None, rating: Optional[int] = None) -> Optional[str]:
+        """
+        Suggest a move based on skill level.
+        
+        "adaptive" plays at the given rating (the user's, see strength.py).
+        Pass the session when the move is the AI opponent's, so the user's
+        likely replies are pondered while they think.
+        """
         if not self.load_fen(fen):
             return None
-        
-        legal_moves = list(self.board.legal_moves)
-        if not legal_moves:
+        return self._pick_move(strength_for_level(skill_level, rating), session)
+    
+    def _pick_move(self, strength: Strength, session: Optional[Hashable] = None) -> Optional[str]:
+        """Searched move for the loaded board, in UCI; with a session, ponders the replies to it."""
+        board = self.board
+        if session is not None:
+            # The user's reply is in: a pondered position is answered from the table
+            ponderer.settle(session, board)
+        with foreground():
+            result = search(board, strength.limits, noise=strength.noise)
+        if result.move is None:
             return None
+        if session is not None:
+            board.push(result.move)
+            try:
+                ponderer.start(session, board, strength.limits, result.pv[1] if len(result.pv) > 1 else None)
+            finally:
+                board.pop()
+        return result.move.uci()
+    
+    def analyze_and_suggest(self, fen: str, skill_level: str = "advanced",
+                            session: Optional[Hashable] = None, rating: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Analyze a position and pick a move from one board load.
+        
+        Returns the analyze_position fields plus the suggested move, its SAN,
+        what it does, and from/to squares ready for highlightSquares.
+        """
+        if not self.load_fen(fen):
+            return {"error": "Invalid FEN"}
+        
+        result = self._analysis(fen)
+        move_uci = self._pick_move(strength_for_level(skill_level, rating), session)
+        if not move_uci:
+            result["has_move"] = False
+            return result
+        
+        board = self.board
+        move = chess.Move.from_uci(move_uci)
+        piece = board.piece_at(move.from_square)
+        captured = board.piece_at(move.to_square)
+        if captured is None and board.is_en_passant(move):
+            captured = chess.Piece(chess.PAWN, not board.turn)
+        piece_name = chess.piece_name(piece.piece_type) if piece else "piece"
+        from_square, to_square = move_uci[:2], move_uci[2:4]
+        gives_check = board.gives_check(move)
         
-        if skill_level == "beginner":
-            # Random move with occasional blunders
-            return random.choice(legal_moves).uci()
-        
-        elif skill_level == "intermediate":
-            # Basic evaluation: prefer captures and avoid hanging pieces
-            captures = [m for m in legal_moves if self.board.is_capture(m)]
-            if captures and random.random() > 0.3:
-                return random.choice(captures).uci()
-            return random.choice(legal_moves).uci()
-        
-        elif skill_level in ["advanced", "expert"]:
-            # Prefer captures and central control
-            captures = [m for m in legal_moves if self.board.is_capture(m)]
-            if captures:
-                return random.choice(captures).uci()
-            
-            # Prefer center squares
-            center_squares = [chess.E4, chess.E5, chess.D4, chess.D5]
-            center_moves = [m for m in legal_moves if m.to_square in center_squares]
-            if center_moves:
-                return random.choice(center_moves).uci()
-            
-            return random.choice(legal_moves).uci()
-        
-        return random.choice(legal_moves).uci()
+        description = f"{piece_name.capitalize()} from {from_square} to {to_square}"
+        if captured:
+            description += f", capturing the {chess.piece_name(captured.piece_type)}"
+        if gives_check:
+            description += ", giving check"
+        
+        result.update({
+            "has_move": True,
+            "move": move_uci,
+            "san": board.san(move),
+            "piece": piece_name,
+            "captures": chess.piece_name(captured.piece_type) if captured else None,
+            "gives_check": gives_check,
+            "description": description,
+            "highlight_squares": [
+                {"square": from_square, "color": "green"},
+                {"square": to_square, "color": "blue"},
+            ],
+        })
+        return result
     
     def validate_move(self, fen: str, move_uci: str) -> Dict[str, Any]:
         """Validate if a move is legal."""
@@ -166,6 +232,10 @@ class ChessAnalyzer:
         else:
             explanation.append("Material is equal.")
         
+        # Tactics, the side to move's chances first
+        for motif in analysis["tactics"][:3]:
+            explanation.append(motif["description"] + ".")
+        
         return " ".join(explanation)
 
 
@@ -173,27 +243,69 @@ class ChessAnalyzer:
 analyzer = ChessAnalyzer()
 
 
+def _ponder_session(runtime: ToolRuntime, fen: str) -> Optional[Hashable]:
+    """
+    The conversation's thread id when this move is the AI opponent's, so the
+    user's replies to it can be pondered; None for hints and other modes.
+    """
+    state = runtime.state or {}
+    game = readable(state, "Current chess position and game state") or {}
+    if not isinstance(game, dict):
+        game = {}
+    if state.get("chess_game_mode") != "vs_ai" and game.get("gameMode") != "ai":
+        return None
+    # The user plays the side the board is oriented to; the AI moves for the other
+    user_color = "b" if game.get("orientation") == "black" else "w"
+    fields = fen.split()
+    if len(fields) < 2 or fields[1] == user_color:
+        return None
+    return ((runtime.config or {}).get("configurable") or {}).get("thread_id")
+
+
 # Tool wrappers
 @tool
 def analyze_chess_position(fen: str) -> Dict[str, Any]:
     """
     Analyze a chess position from FEN notation.
-    Returns position evaluation, material count, game status, and castling rights.
+    Returns position evaluation, material count, game status, castling rights,
+    and tactics: hanging pieces, pins, skewers, forks, discovered attacks and
+    back-rank weaknesses, each with a description and highlight_squares ready
+    for highlightSquares (green = attacker, yellow = piece in the middle, red = target).
     """
     return analyzer.analyze_position(fen)
 
 
+def _user_rating(runtime: ToolRuntime) -> int:
+    """The user's rating from their results against the AI (ChessAgentState.chess_rating)."""
+    return (runtime.state or {}).get("chess_rating") or DEFAULT_RATING
+
+
 @tool
-def suggest_chess_move(fen: str, skill_level: str = "intermediate") -> str:
+def suggest_chess_move(runtime: ToolRuntime, fen: str, skill_level: str = "intermediate") -> str:
     """
     Suggest a chess move for the current position.
-    skill_level can be: beginner, intermediate, advanced, expert
+    skill_level can be: beginner, intermediate, advanced, expert, or adaptive
+    (plays at the user's own rating)
     Returns move in UCI format (e.g., 'e2e4')
     """
-    move = analyzer.suggest_move(fen, skill_level)
+    move = analyzer.suggest_move(fen, skill_level, _ponder_session(runtime, fen), _user_rating(runtime))
     return move if move else "No legal moves available"
 
 
+@tool
+def analyze_and_suggest_move(runtime: ToolRuntime, fen: str, skill_level: str = "advanced") -> Dict[str, Any]:
+    """
+    Analyze a chess position AND pick a move in one call.
+    Use this for hints and AI-opponent turns instead of calling
+    analyze_chess_position and then suggest_chess_move.
+    skill_level can be: beginner, intermediate, advanced, expert, or adaptive
+    (plays at the user's own rating; use it for AI-opponent turns)
+    Returns the position analysis plus move (UCI), san, description and
+    highlight_squares (from square green, to square blue) ready for highlightSquares.
+    """
+    return analyzer.analyze_and_suggest(fen, skill_level, _ponder_session(runtime, fen), _user_rating(runtime))
+
+
 @tool
 def validate_chess_move(fen: str, move_uci: str) -> Dict[str, Any]:
     """
@@ -207,7 +319,7 @@ def validate_chess_move(fen: str, move_uci: str) -> Dict[str, Any]:
 def explain_chess_position(fen: str) -> str:
     """
     Generate a natural language explanation of the current chess position.
-    Describes turn, check status, material balance, and strategic considerations.
+    Describes turn, check status, material balance, and the main tactics on the board.
     """
     return analyzer.explain_position(fen)
 
@@ -219,3 +331,107 @@ def get_attacked_squares(fen: str, color: str) -> List[str]:
     Returns list of square names (e.g., ['e4', 'd5', 'f3'])
     """
     return analyzer.get_attacked_squares(fen, color)
+
+
+@tool
+def review_chess_game(runtime: ToolRuntime, pgn: str) -> Dict[str, Any]:
+    """
+    Review a whole game given as PGN, move by move.
+    Each move's finding (eval, best_move, loss, classification of
+    inaccuracy/mistake/blunder, missed_tactics with highlight_squares) is
+    streamed as soon as it's ready.
+    Returns the summary: eval_curve (centipawns, White's view, one per ply),
+    per-side counts and average loss, key_moments, and the mistakes and
+    blunders with their missed tactics.
+    """
+    try:
+        events = review_game(pgn)
+    except InvalidGame as e:
+        return {"error": str(e)}
+    writer = runtime.stream_writer
+    mistakes = []
+    summary: Dict[str, Any] = {}
+    for event in events:
+        if writer is not None:
+            writer({"chess_review": event})
+        if event["type"] == "move" and event["classification"] in ("mistake", "blunder"):
+            mistakes.append(event)
+        elif event["type"] == "summary":
+            summary = event
+    return {**summary, "mistakes": mistakes}
+
+
+@tool
+def get_chess_puzzle(runtime: ToolRuntime, theme: Optional[str] = None, rating: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Serve a tactics puzzle matched to the player's level.
+    theme narrows it to one motif (e.g. fork, pin, skewer, mateIn2, hangingPiece).
+    rating asks for puzzles near a rating instead of the player's level.
+    Returns puzzle_id, fen (the user to move), side, the opponent's last_move with
+    highlight_squares, moves_to_find, rating and themes. The solution is never
+    returned: check each of the user's moves with check_chess_puzzle_move.
+    """
+    if rating is not None:
+        low, high = rating - 100, rating + 100
+    else:
+        level = (runtime.state or {}).get("player_level") or "beginner"
+        low, high = LEVEL_RATINGS.get(level, LEVEL_RATINGS["beginner"])
+    bank = get_puzzle_bank()
+    try:
+        puzzle = bank.pick(low, high, theme)
+    except ValueError as e:
+        return {"error": str(e), "themes": bank.themes()}
+    if puzzle is None:
+        return {"error": f"No puzzle rated {low}-{high}" + (f" with theme '{theme}'" if theme else "")
+                + " in the puzzle bank; import one with agents.chess.puzzle_importer"}
+    return describe(puzzle)
+
+
+@tool
+def check_chess_puzzle_move(puzzle_id: str, moves: List[str]) -> Dict[str, Any]:
+    """
+    Check the user's moves in a puzzle from get_chess_puzzle.
+    moves is every move the user has played in this puzzle so far, in UCI,
+    oldest first (not the opponent's replies).
+    Returns correct and solved. After a correct move the opponent's reply
+    (reply, reply_san) is already played in the returned fen, ready for
+    makeAIMove; after a wrong one, hint_square is where the right move starts.
+    """
+    puzzle = get_puzzle_bank().get(puzzle_id)
+    if puzzle is None:
+        return {"error": f"Unknown puzzle '{puzzle_id}'"}
+    try:
+        return check_line(puzzle, moves)
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+@tool
+def record_chess_result(runtime: ToolRuntime, result: str, skill_level: str = "adaptive") -> Command:
+    """
+    Record how a game against the AI opponent ended, from the user's side.
+    result can be: win, draw, loss
+    skill_level is the level the AI played at in that game.
+    Updates the user's rating, which the adaptive level plays at, and returns
+    the old and new rating.
+    """
+    rating = _user_rating(runtime)
+    state = runtime.state or {}
+    try:
+        update = record_result(rating, state.get("chess_results") or [], result,
+                               strength_for_level(skill_level, rating).rating)
+    except ValueError as e:
+        content: Dict[str, Any] = {"error": str(e)}
+        return Command(update={"messages": [ToolMessage(json.dumps(content), tool_call_id=runtime.tool_call_id)]})
+    strength = strength_for(update["chess_rating"])
+    content = {
+        "result": result,
+        "rating_before": rating,
+        "rating": update["chess_rating"],
+        "ai_depth": strength.limits.depth,
+        "ai_nodes": strength.limits.nodes,
+    }
+    return Command(update={
+        **update,
+        "messages": [ToolMessage(json.dumps(content), tool_call_id=runtime.tool_call_id)],
+    })
@@ -5,6 +5,12 @@ from langchain.agents import create_agent
 from langchain.tools import tool
 from copilotkit import CopilotKitMiddleware, CopilotKitState
 from llm_provider import get_llm_provider
+from agents.router_intents import create_router_classifier
+from shared.history_compaction import HistoryCompactionMiddleware
+from shared.intent_router import IntentRouterMiddleware
+from shared.metrics import instrument_graph
+from shared.prompt_cache import PromptCacheMiddleware
+from shared.response_cache import ResponseCacheMiddleware
 
 
 class RouterState(CopilotKitState):
@@ -63,12 +69,18 @@ You: "Hi! Welcome to LearnPlay.ai! I can help you learn Sudoku or Chess through
 
 # Create router agent
 router_agent = create_agent(
-    model=get_llm_provider(),
+    model=get_llm_provider("router"),
     tools=[get_weather],
-    middleware=[CopilotKitMiddleware()],
+    middleware=[
+        CopilotKitMiddleware(),
+        IntentRouterMiddleware(create_router_classifier()),
+        ResponseCacheMiddleware("router", state_keys=["current_game"]),
+        HistoryCompactionMiddleware(),
+        PromptCacheMiddleware("router"),
+    ],
     state_schema=RouterState,
     system_prompt=ROUTER_SYSTEM_PROMPT
 )
 
 # Export as graph
-graph = router_agent
+graph = instrument_graph(router_agent, "router_agent")
@@ -0,0 +1,130 @@
+"""
+Canned intents answered by the router without an LLM call.
+
+Rules match the whole normalized message, so a question that only starts
+like a canned one ("what does this error mean?") or asks something more
+("which is better, and why?") still goes to the model.
+"""
+
+from shared.intent_router import Intent, IntentClassifier
+
+_SUDOKU_STRATEGIES = {
+    "naked single": "naked_single",
+    "hidden single": "hidden_single",
+    "naked pair": "naked_pair",
+    "pointing pair": "pointing_pair",
+}
+
+
+# Leading phrasings of a request to learn or play a game
+_ASK = r"((how (do|can|should) (i|you)|i (want|would like|d like) to|let s|can you|can i|please) )?"
+_LEARN = r"(learn|play|start|try|solve|teach me|(learn|teach me) (how )?to play|get started with)"
+
+
+def _game_patterns(game: str, topics: str) -> list:
+    """Whole-message requests to learn a game or hear its rules."""
+    return [
+        rf"^{_ASK}{_LEARN}( a)? {game}( please)?$",
+        rf"^((what are|tell me|explain) )?(the )?({topics}) (of|for|in) {game}$",
+        rf"^{game} ({topics})$",
+        rf"^how does {game} work$",
+        rf"^{game}$",
+    ]
+
+
+def _explain_sudoku_strategy(found) -> str:
+    # Served by the Sudoku agent's own tool; imported lazily to keep the
+    # router's startup light
+    from agents.sudoku.tools import explain_strategy
+
+    key = _SUDOKU_STRATEGIES[found.group(1)]
+    return (
+        f"{explain_strategy.func(key)}\n\n"
+        "Open the Sudoku page (/sudoku) and I'll show you one on a live board!"
+    )
+
+
+ROUTER_INTENTS = [
+    Intent(
+        name="greeting",
+        patterns=[r"^(hi|hello|hey|hiya|howdy|greetings|good (morning|afternoon|evening))( there)?( learnplay( ai)?)?$"],
+        reply=(
+            "Hi! Welcome to LearnPlay.ai! I can help you learn Sudoku or Chess through "
+            "interactive AI tutoring. Which game would you like to explore?"
+        ),
+        examples=["hello", "hi there", "hey", "good morning"],
+    ),
+    Intent(
+        name="thanks",
+        patterns=[r"^(thanks|thank you|thx|cheers)( so much| a lot)?$"],
+        reply="You're welcome! Pick Sudoku or Chess whenever you're ready to play.",
+        examples=["thanks", "thank you so much"],
+    ),
+    Intent(
+        name="list_games",
+        patterns=[
+            r"^what (games|can i (learn|play))( can i (learn|play))?( here| on learnplay( ai)?)?$",
+            r"^which games (are (there|available)|can i (learn|play)|do you (have|teach))( here)?$",
+            r"^what games (are (there|available)|do you (have|teach|offer))( here)?$",
+            r"^what do you (teach|offer)( here)?$",
+            r"^what (is|does) (this|learnplay( ai)?)( site| app| website| platform)?( do| about)?$",
+        ],
+        reply=(
+            "LearnPlay.ai teaches two strategy games: Sudoku (logic puzzles) and Chess "
+            "(strategic warfare). Both develop critical thinking! Which interests you more?"
+        ),
+        examples=["what games can i learn here", "what can i play", "what is this site"],
+    ),
+    Intent(
+        name="compare_games",
+        patterns=[
+            r"^which (game |one )?(is )?(easier|harder|simpler|better for beginners)( to learn)?$",
+            r"^which (game |one )?should i (learn|start|play|start with|try)( first)?$",
+            r"^(is )?(sudoku|chess) (easier|harder|simpler) than (chess|sudoku)$",
+            r"^((should i (learn|play|start with|try)|which is easier) )?(sudoku or chess|chess or sudoku)$",
+        ],
+        reply=(
+            "Sudoku is generally easier to start - the rules take 2 minutes to learn. "
+            "Chess has more complex rules but incredible depth. Want to try Sudoku first?"
+        ),
+        examples=["which game is easier", "which game should i learn first", "is chess harder than sudoku"],
+    ),
+    Intent(
+        name="sudoku_strategy",
+        patterns=[
+            rf"^((what is|what s|whats|what are|explain|tell me about|how does|how do i use|teach me) )?"
+            rf"(an? |the )?({'|'.join(_SUDOKU_STRATEGIES)})s?( work| strategy| technique)?$",
+        ],
+        reply=_explain_sudoku_strategy,
+        game="sudoku",
+        excludes=[r"\bchess\b"],
+    ),
+    Intent(
+        name="sudoku_handoff",
+        patterns=_game_patterns("sudoku", "rules|basics|tips|strategy|strategies"),
+        reply=(
+            "Navigate to the Sudoku page (/sudoku) and I'll teach you interactively with "
+            "visual highlighting and voice guidance. Click 'Learn Sudoku Basics' to start!"
+        ),
+        game="sudoku",
+        examples=["how do i play sudoku", "teach me sudoku", "i want to learn sudoku"],
+        excludes=[r"\bchess\b"],
+    ),
+    Intent(
+        name="chess_handoff",
+        patterns=_game_patterns("chess", "rules|basics|tips|strategy|strategies|openings?|pieces|moves")
+        + [r"^how do (the )?(chess )?pieces move( in chess)?$"],
+        reply=(
+            "Navigate to the Chess page (/chess) and I'll teach you interactively with "
+            "highlighted squares and voice guidance. Click 'Learn Chess Basics' to start!"
+        ),
+        game="chess",
+        examples=["how do i play chess", "teach me chess", "i want to learn chess"],
+        excludes=[r"\bsudoku\b"],
+    ),
+]
+
+
+def create_router_classifier() -> IntentClassifier:
+    """Build the classifier used by the router agent."""
+    return IntentClassifier(ROUTER_INTENTS)
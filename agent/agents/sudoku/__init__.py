@@ -1,6 +1,18 @@
 """Sudoku agent module."""
 
-from .agent import sudoku_agent, graph
-from .state import SudokuAgentState
+from importlib import import_module
 
-__all__ = ["sudoku_agent", "graph", "SudokuAgentState"]
+# Resolved lazily so importing the state or tools does not build the graph
+_EXPORTS = {
+    "sudoku_agent": ".agent",
+    "graph": ".agent",
+    "SudokuAgentState": ".state",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
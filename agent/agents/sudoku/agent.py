@@ -9,12 +9,20 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from langchain.agents import create_agent
 from copilotkit import CopilotKitMiddleware
 from llm_provider import get_llm_provider
+from shared.history_compaction import HistoryCompactionMiddleware
+from shared.lessons import LessonMiddleware
+from shared.metrics import instrument_graph
+from shared.prompt_cache import PromptCacheMiddleware
+from shared.response_cache import ResponseCacheMiddleware
+from shared.tts_pipeline import StreamedSpeechMiddleware
 from agents.sudoku.prompts import SUDOKU_SYSTEM_PROMPT
+from agents.sudoku.lessons import SUDOKU_LESSONS
 from agents.sudoku.state import SudokuAgentState
 from agents.sudoku.tools import (
     analyze_sudoku_grid,
     validate_move,
     suggest_next_move,
+    get_next_solving_move,
     explain_strategy,
     explain_sudoku_basics
 )
@@ -22,18 +30,31 @@ from agents.sudoku.tools import (
 # Create Sudoku agent with focused tools and prompt
 # Note: speak_message is now a frontend tool, not a backend tool
 sudoku_agent = create_agent(
-    model=get_llm_provider(),
+    model=get_llm_provider("sudoku"),
     tools=[
         analyze_sudoku_grid,
         validate_move,
         suggest_next_move,
+        get_next_solving_move,
         explain_strategy,
         explain_sudoku_basics
     ],
-    middleware=[CopilotKitMiddleware()],
+    middleware=[
+        CopilotKitMiddleware(),
+        LessonMiddleware(SUDOKU_LESSONS),
+        StreamedSpeechMiddleware(),
+        ResponseCacheMiddleware(
+            "sudoku",
+            state_keys=["teaching_topic", "teaching_current_step", "player_level"],
+            board_keys=["sudoku_grid", "sudoku_size"],
+            board_readables=["Current state of the Sudoku grid"],
+        ),
+        HistoryCompactionMiddleware(),
+        PromptCacheMiddleware("sudoku"),
+    ],
     state_schema=SudokuAgentState,
     system_prompt=SUDOKU_SYSTEM_PROMPT
 )
 
 # Export as graph for LangGraph
-graph = sudoku_agent
+graph = instrument_graph(sudoku_agent, "sudoku_agent")
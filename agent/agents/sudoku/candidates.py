@@ -0,0 +1,305 @@
+"""
+Shared candidate state for the Sudoku tools.
+
+CandidateState computes every empty cell's candidates once from row, column
+and box bitmasks. Grid analysis, move suggestions, highlight payloads and
+conflict checks all read from it instead of rescanning the grid per cell.
+
+Any n x n grid whose boxes are rectangles works (4x4 with 2x2 boxes, 6x6
+with 2x3, 9x9 with 3x3, 16x16 with 4x4): the cells of every row, column and
+box and each cell's peers are worked out once per size in a Geometry, and
+candidate masks use bits 1..n.
+"""
+
+from functools import lru_cache
+from math import isqrt
+from typing import Any, Dict, List, Optional, Tuple
+
+Grid = List[List[Optional[int]]]
+
+Cell = Tuple[int, int]
+
+UNITS = ("row", "column", "box")
+
+# One character per cell value, so grid keys stay one character per cell for larger boards
+SYMBOLS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+MAX_SIZE = len(SYMBOLS) - 1
+
+
+class Geometry:
+    """Boxes, units and peers of an n x n grid."""
+
+    def __init__(self, size: int):
+        # Boxes as square as the size allows, wider than tall: 6 -> 2x3, 12 -> 3x4
+        self.size = size
+        self.box_rows = max(d for d in range(1, isqrt(size) + 1) if size % d == 0)
+        self.box_cols = size // self.box_rows
+        self.box_label = f"{self.box_rows}x{self.box_cols}"
+        # Bits 1..size set: every digit is still possible
+        self.all_digits = ((1 << size) - 1) << 1
+
+        cells = [(row, col) for row in range(size) for col in range(size)]
+        self.box_of: Dict[Cell, int] = {
+            (row, col): (row // self.box_rows) * self.box_rows + col // self.box_cols for row, col in cells
+        }
+        self.units: Dict[str, List[List[Cell]]] = {
+            "row": [[(row, col) for col in range(size)] for row in range(size)],
+            "column": [[(row, col) for row in range(size)] for col in range(size)],
+            "box": [[] for _ in range(size)],
+        }
+        for cell in cells:
+            self.units["box"][self.box_of[cell]].append(cell)
+
+        # Row first, then column, then box, as the highlight payloads expect
+        self.peers: Dict[Cell, List[Cell]] = {}
+        for row, col in cells:
+            seen = {(row, col)}
+            result = []
+            for unit in UNITS:
+                for cell in self.unit_cells(unit, self.unit_of(unit, row, col)):
+                    if cell not in seen:
+                        seen.add(cell)
+                        result.append(cell)
+            self.peers[(row, col)] = result
+
+    def unit_cells(self, unit: str, index: int) -> List[Cell]:
+        """Cells of row/column/box `index`, in reading order."""
+        return self.units[unit][index]
+
+    def unit_of(self, unit: str, row: int, col: int) -> int:
+        return row if unit == "row" else col if unit == "column" else self.box_of[(row, col)]
+
+
+@lru_cache(maxsize=None)
+def geometry(size: int) -> Geometry:
+    """
+    Geometry for an n x n grid, built once per size.
+
+    Raises:
+        ValueError: If the size has no rectangular boxes (a prime) or is out of range
+    """
+    if not 4 <= size <= MAX_SIZE or all(size % d for d in range(2, isqrt(size) + 1)):
+        raise ValueError(f"Unsupported Sudoku size {size}: use a size like 4, 6, 9 or 16")
+    return Geometry(size)
+
+
+def grid_key(grid: Grid) -> str:
+    """Grid as a string, one character per cell in reading order, '0' for empty."""
+    return "".join(SYMBOLS[value or 0] for row in grid for value in row)
+
+
+def is_grid_key(key: str, size: int) -> bool:
+    """True if key is a well-formed grid key for a size x size grid."""
+    return len(key) == size * size and all(symbol in SYMBOLS[:size + 1] for symbol in key)
+
+
+def grid_from_key(key: str) -> Grid:
+    """Inverse of grid_key."""
+    size = isqrt(len(key))
+    values = [SYMBOLS.index(symbol) or None for symbol in key]
+    return [values[row * size:(row + 1) * size] for row in range(size)]
+
+
+def digits(mask: int) -> List[int]:
+    """Digits set in a candidate bitmask, ascending."""
+    return [value for value in range(1, mask.bit_length()) if mask >> value & 1]
+
+
+class CandidateState:
+    """Candidate bitmasks for one grid; 0 and None both mean an empty cell."""
+
+    def __init__(self, grid: Grid):
+        self.grid: Grid = [[value or None for value in row] for row in grid]
+        self.geometry = geometry(len(self.grid))
+        size = self.size = self.geometry.size
+        box_of = self.geometry.box_of
+        self.rows = [0] * size
+        self.cols = [0] * size
+        self.boxes = [0] * size
+        for row in range(size):
+            for col in range(size):
+                value = self.grid[row][col]
+                if value:
+                    bit = 1 << value
+                    self.rows[row] |= bit
+                    self.cols[col] |= bit
+                    self.boxes[box_of[(row, col)]] |= bit
+
+        all_digits = self.geometry.all_digits
+        self.candidates: Dict[Cell, int] = {
+            (row, col): all_digits & ~(self.rows[row] | self.cols[col] | self.boxes[box_of[(row, col)]])
+            for row in range(size)
+            for col in range(size)
+            if self.grid[row][col] is None
+        }
+
+    def copy(self) -> "CandidateState":
+        """Independent copy, for trying a value without touching this state."""
+        clone = CandidateState.__new__(CandidateState)
+        clone.grid = [list(row) for row in self.grid]
+        clone.geometry = self.geometry
+        clone.size = self.size
+        clone.rows = list(self.rows)
+        clone.cols = list(self.cols)
+        clone.boxes = list(self.boxes)
+        clone.candidates = dict(self.candidates)
+        return clone
+
+    def possible_values(self, row: int, col: int) -> List[int]:
+        return digits(self.candidates.get((row, col), 0))
+
+    def place(self, row: int, col: int, value: int) -> List[Cell]:
+        """Fill a cell and update the masks; returns the empty peers that lost `value` as a candidate."""
+        bit = 1 << value
+        self.grid[row][col] = value
+        self.rows[row] |= bit
+        self.cols[col] |= bit
+        self.boxes[self.geometry.box_of[(row, col)]] |= bit
+        self.candidates.pop((row, col), None)
+        eliminated = []
+        for cell in self.geometry.peers[(row, col)]:
+            mask = self.candidates.get(cell)
+            if mask is not None and mask & bit:
+                self.candidates[cell] = mask & ~bit
+                eliminated.append(cell)
+        return eliminated
+
+    def naked_singles(self) -> List[Dict[str, Any]]:
+        """Empty cells with exactly one candidate, in reading order."""
+        singles = []
+        for (row, col), mask in self.candidates.items():
+            if mask and mask & (mask - 1) == 0:
+                value = mask.bit_length() - 1
+                singles.append({
+                    "type": "naked_single",
+                    "row": row,
+                    "col": col,
+                    "value": value,
+                    "description": _naked_single_description(row, col, value),
+                })
+        return singles
+
+    def hidden_singles(self, unit: str) -> List[Dict[str, Any]]:
+        """Digits with exactly one possible cell in a row, column or box."""
+        singles = []
+        candidates = self.candidates
+        for index, unit_cells in enumerate(self.geometry.units[unit]):
+            cells = [cell for cell in unit_cells if cell in candidates]
+            # Digits seen in at least one and in at least two of the unit's empty cells
+            once = twice = 0
+            for cell in cells:
+                mask = candidates[cell]
+                twice |= once & mask
+                once |= mask
+            single = once & ~twice
+            for value in digits(single):
+                bit = 1 << value
+                row, col = next(cell for cell in cells if candidates[cell] & bit)
+                singles.append({
+                    "type": f"hidden_single_{unit}",
+                    "row": row,
+                    "col": col,
+                    "value": value,
+                    "description": _hidden_single_description(unit, index, row, col, value, self.geometry),
+                })
+        return singles
+
+    def next_move(self) -> Optional[Dict[str, Any]]:
+        """Easiest move available: a naked single, else a hidden single by row, column, then box."""
+        naked = self.naked_singles()
+        if naked:
+            return naked[0]
+        for unit in UNITS:
+            hidden = self.hidden_singles(unit)
+            if hidden:
+                return hidden[0]
+        return None
+
+    def conflicts(self, row: int, col: int, value: int) -> List[Dict[str, Any]]:
+        """Cells in the same row, column or box that already hold `value`, each listed once."""
+        found = []
+        seen = {(row, col)}
+        for unit in UNITS:
+            for r, c in self.geometry.unit_cells(unit, self.geometry.unit_of(unit, row, col)):
+                if (r, c) not in seen and self.grid[r][c] == value:
+                    seen.add((r, c))
+                    found.append({
+                        "type": unit,
+                        "row": r,
+                        "col": c,
+                        "message": _conflict_message(unit, value, r, c, self.geometry),
+                    })
+        return found
+
+    def move_highlights(self, move: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Cells for highlightCells that show why a move works.
+
+        The target is green. For a naked single, one blue peer per other digit
+        shows why that digit is ruled out. For a hidden single, every other
+        empty cell in the unit is crossed out in red next to the blue cell
+        that blocks the digit there.
+        """
+        row, col, value = move["row"], move["col"], move["value"]
+        cells = [{"row": row, "col": col, "type": "highlight", "color": "green", "label": str(value)}]
+
+        peers = self.geometry.peers
+        if move["type"] == "naked_single":
+            for digit in range(1, self.size + 1):
+                if digit == value:
+                    continue
+                holder = next(((r, c) for r, c in peers[(row, col)] if self.grid[r][c] == digit), None)
+                if holder:
+                    cells.append({"row": holder[0], "col": holder[1], "type": "highlight",
+                                  "color": "blue", "label": str(digit)})
+            return cells
+
+        unit = move["type"].rsplit("_", 1)[-1]
+        blockers = set()
+        for r, c in self.geometry.unit_cells(unit, self.geometry.unit_of(unit, row, col)):
+            if (r, c) == (row, col) or (r, c) not in self.candidates:
+                continue
+            cells.append({"row": r, "col": c, "type": "cross", "color": "red"})
+            holder = next(((pr, pc) for pr, pc in peers[(r, c)] if self.grid[pr][pc] == value), None)
+            if holder and holder not in blockers:
+                blockers.add(holder)
+                cells.append({"row": holder[0], "col": holder[1], "type": "highlight",
+                              "color": "blue", "label": str(value)})
+        return cells
+
+    def conflict_highlights(self, row: int, col: int, value: int,
+                            conflicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The misplaced cell in yellow and the cells it clashes with in red."""
+        cells = [{"row": row, "col": col, "type": "highlight", "color": "yellow", "label": str(value)}]
+        for conflict in conflicts:
+            cells.append({"row": conflict["row"], "col": conflict["col"], "type": "highlight",
+                          "color": "red", "label": str(value)})
+        return cells
+
+
+def describe_move(move: Dict[str, Any], geometry: Geometry) -> str:
+    """The short description naked_singles/hidden_singles give a move."""
+    row, col, value = move["row"], move["col"], move["value"]
+    if move["type"] == "naked_single":
+        return _naked_single_description(row, col, value)
+    unit = move["type"].rsplit("_", 1)[-1]
+    return _hidden_single_description(unit, geometry.unit_of(unit, row, col), row, col, value, geometry)
+
+
+def _naked_single_description(row: int, col: int, value: int) -> str:
+    return f"Cell ({row+1},{col+1}) can only be {value}"
+
+
+def _hidden_single_description(unit: str, index: int, row: int, col: int, value: int,
+                               geometry: Geometry) -> str:
+    where = f"{unit} {index+1}" if unit != "box" else f"this {geometry.box_label} box"
+    return f"In {where}, only cell ({row+1},{col+1}) can be {value}"
+
+
+def _conflict_message(unit: str, value: int, row: int, col: int, geometry: Geometry) -> str:
+    if unit == "row":
+        return f"The {value} you placed conflicts with another {value} in column {col+1} of this row"
+    if unit == "column":
+        return f"The {value} you placed conflicts with another {value} in row {row+1} of this column"
+    return f"The {value} you placed conflicts with another {value} in the same {geometry.box_label} box"
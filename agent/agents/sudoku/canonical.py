@@ -0,0 +1,314 @@
+"""
+Canonical form of a Sudoku puzzle.
+
+Relabelling the digits, reordering rows within a band, reordering bands,
+doing the same for columns and stacks, and transposing (square boxes only)
+turn a puzzle into one that solves the same way. canonical_form() picks one
+representative of each such family: of every grid those transforms can
+produce, the one whose grid key is smallest, with empty cells as '0' and
+digits numbered in order of first appearance. Caches keyed on it are shared
+by every user who loads a relabelled or reshuffled copy of the same puzzle,
+and the returned Transform maps cached results back to the user's grid.
+
+The search builds the canonical grid one row at a time and keeps only the
+partial transforms whose rows so far are the smallest possible, so most of
+the symmetry group (3.3 million arrangements times 9! relabellings on 9x9)
+is never visited. Columns that no row has told apart yet (e.g. the empty
+cells of a box) stay grouped instead of being branched on, and rows that
+are identical within a band are tried once.
+
+Grids with many symmetries tie on thousands of partial transforms: every
+labelling of a full first row reads 1-9, so a solved grid kept 23,328 after
+its first row and took about 400 ms. At most CANONICAL_MAX_BEAMS (64) tied
+transforms are kept at each step, which brings that grid to about 45 ms.
+Puzzles keep fewer (under 50 for the benchmark corpus, 16x16 included), so
+their form is exact; for grids that hit the bound the result is still a
+valid transform of the grid, but an equivalent copy may land on another key.
+"""
+
+import os
+from functools import lru_cache
+from itertools import permutations
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from agents.sudoku.candidates import SYMBOLS, geometry
+
+# Tied partial transforms carried from row to row (see module docstring)
+MAX_BEAMS = int(os.getenv("CANONICAL_MAX_BEAMS", "64"))
+
+# Columns in output order, split into runs that no row has told apart yet
+Layout = Tuple[Tuple[int, ...], ...]
+
+
+class Transform:
+    """
+    Maps a grid to its canonical form and back.
+
+    canonical[i][j] == digits[source[rows[i]][cols[j]]], where source is the
+    user's grid, transposed first if `transpose`.
+    """
+
+    __slots__ = ("size", "transpose", "rows", "cols", "digits", "_row_of", "_col_of", "_digit_of")
+
+    def __init__(self, size: int, transpose: bool, rows: Sequence[int], cols: Sequence[int],
+                 digits: Sequence[int]):
+        self.size = size
+        self.transpose = transpose
+        self.rows = tuple(rows)
+        self.cols = tuple(cols)
+        # digits[d] is the canonical digit for user digit d; digits[0] == 0
+        self.digits = tuple(digits)
+        self._row_of = _inverse(self.rows)
+        self._col_of = _inverse(self.cols)
+        self._digit_of = _inverse(self.digits)
+
+    def cell_to_user(self, row: int, col: int) -> Tuple[int, int]:
+        """User's (row, col) for a canonical cell."""
+        row, col = self.rows[row], self.cols[col]
+        return (col, row) if self.transpose else (row, col)
+
+    def cell_from_user(self, row: int, col: int) -> Tuple[int, int]:
+        """Canonical (row, col) for a user's cell."""
+        if self.transpose:
+            row, col = col, row
+        return self._row_of[row], self._col_of[col]
+
+    def value_to_user(self, value: int) -> int:
+        return self._digit_of[value]
+
+    def value_from_user(self, value: int) -> int:
+        return self.digits[value]
+
+    def unit_to_user(self, unit: str) -> str:
+        """A canonical row is a user column when the grid was transposed, and vice versa."""
+        if self.transpose and unit != "box":
+            return "column" if unit == "row" else "row"
+        return unit
+
+    def key_from_user(self, key: str) -> str:
+        """Grid key of the user's grid in canonical orientation and digits."""
+        return self._map_key(key, self.cell_to_user, self.digits)
+
+    def key_to_user(self, key: str) -> str:
+        """Grid key of a canonical-orientation grid in the user's orientation and digits."""
+        return self._map_key(key, self.cell_from_user, self._digit_of)
+
+    def _map_key(self, key: str, source_cell, digits: Sequence[int]) -> str:
+        size = self.size
+        cells = []
+        for row in range(size):
+            for col in range(size):
+                r, c = source_cell(row, col)
+                cells.append(SYMBOLS[digits[SYMBOLS.index(key[r * size + c])]])
+        return "".join(cells)
+
+    def __repr__(self) -> str:
+        return (f"Transform(size={self.size}, transpose={self.transpose}, rows={self.rows}, "
+                f"cols={self.cols}, digits={self.digits})")
+
+
+class CanonicalForm(NamedTuple):
+    """The canonical grid key and the transform that takes the input there."""
+    key: str
+    transform: Transform
+
+
+@lru_cache(maxsize=int(os.getenv("CANONICAL_CACHE", "4096")))
+def canonical_form(key: str) -> CanonicalForm:
+    """
+    Canonical form of a grid key (see grid_key), cached per key.
+
+    Raises:
+        ValueError: If the key isn't a square grid of a supported size
+    """
+    size = int(len(key) ** 0.5)
+    if size * size != len(key):
+        raise ValueError(f"Grid key of length {len(key)} is not a square grid")
+    shape = geometry(size)
+    values = [SYMBOLS.index(symbol) for symbol in key]
+    grid = tuple(tuple(values[row * size:(row + 1) * size]) for row in range(size))
+    sources = [grid, tuple(zip(*grid))] if shape.box_rows == shape.box_cols else [grid]
+    return _search(sources, shape.box_rows, shape.box_cols, size)
+
+
+# A partial transform: (source index, rows chosen, column layout, digit labels, next label)
+_Candidate = Tuple[int, Tuple[int, ...], Layout, Tuple[int, ...], int]
+
+
+def _search(sources: List[Tuple[Tuple[int, ...], ...]], band: int, stack: int, size: int) -> CanonicalForm:
+    stacks = [tuple(range(s * stack, (s + 1) * stack)) for s in range(size // stack)]
+    no_labels = (0,) * (size + 1)
+
+    # First row: any source row, with the stacks in any order. Emptier rows
+    # start with more zeros, so trying them first tightens the bound sooner.
+    best: Optional[Tuple[int, ...]] = None
+    survivors: List[_Candidate] = []
+    starts = [(t, r) for t, source in enumerate(sources) for r in _distinct_rows(source, range(size), band)]
+    starts.sort(key=lambda start: sources[start[0]][start[1]].count(0), reverse=True)
+    for t, r in starts:
+        for out, layout, labels, next_label in _first_row(sources[t][r], stacks, no_labels, best):
+                if best is None or out < best:
+                    best, survivors = out, []
+                if out == best and len(survivors) < MAX_BEAMS:
+                    survivors.append((t, (r,), layout, labels, next_label))
+    canonical = [best]
+
+    for k in range(1, size):
+        best = None
+        found: Dict[Any, _Candidate] = {}
+        for t, rows, layout, labels, next_label in survivors:
+            source = sources[t]
+            if k % band:
+                current = rows[-1] // band
+                allowed = [r for r in range(current * band, (current + 1) * band) if r not in rows]
+            else:
+                used = {r // band for r in rows}
+                allowed = [r for r in range(size) if r // band not in used]
+            for r in _distinct_rows(source, allowed, band):
+                # The last row only has to reach the smallest grid; one way to do it is enough
+                result = _emit(source[r], layout, labels, next_label, best, single=k == size - 1)
+                if result is None:
+                    continue
+                out, emitted = result
+                if best is None or out < best:
+                    best, found = out, {}
+                for new_layout, new_labels, new_next in emitted:
+                    if len(found) >= MAX_BEAMS:
+                        break
+                    candidate = (t, rows + (r,), new_layout, new_labels, new_next)
+                    found.setdefault(candidate[:4], candidate)
+        survivors = list(found.values())
+        canonical.append(best)
+
+    t, rows, layout, labels, next_label = survivors[0]
+    # Digits missing from the puzzle take the remaining labels in order
+    labels = list(labels)
+    for digit in range(1, size + 1):
+        if not labels[digit]:
+            labels[digit] = next_label
+            next_label += 1
+    transform = Transform(size, t == 1, rows, [col for group in layout for col in group], labels)
+    return CanonicalForm("".join(SYMBOLS[value] for row in canonical for value in row), transform)
+
+
+def _distinct_rows(source, rows, band: int) -> List[int]:
+    """Rows to try, skipping repeats of a row in the same band (swapping them changes nothing)."""
+    seen = set()
+    result = []
+    for r in rows:
+        key = (r // band, source[r])
+        if key not in seen:
+            seen.add(key)
+            result.append(r)
+    return result
+
+
+def _first_row(values: Tuple[int, ...], stacks: List[Tuple[int, ...]], labels: Tuple[int, ...],
+               bound: Optional[Tuple[int, ...]]) -> List[Tuple[Tuple[int, ...], Layout, Tuple[int, ...], int]]:
+    """
+    Smallest first row over every stack order: (out, layout, labels, next
+    label) for each way to reach it, or none if it can't match `bound`.
+    """
+    # (stacks left, layout, labels, next label); every beam entry shares `out`
+    beams = [(tuple(range(len(stacks))), (), labels, 1)]
+    out: Tuple[int, ...] = ()
+    while beams[0][0]:
+        best = None
+        expanded = []
+        for left, layout, beam_labels, next_label in beams:
+            for s in left:
+                for segment, parts, new_labels, new_next in _refine(stacks[s], values, beam_labels, next_label):
+                    if best is None or segment < best:
+                        best, expanded = segment, []
+                    if segment == best and len(expanded) < MAX_BEAMS:
+                        expanded.append((tuple(x for x in left if x != s), layout + parts, new_labels, new_next))
+        out += best
+        beams = expanded
+        if bound is not None:
+            prefix = bound[:len(out)]
+            if out > prefix:
+                return []
+            if out < prefix:
+                bound = None
+    return [(out, layout, beam_labels, next_label) for _, layout, beam_labels, next_label in beams]
+
+
+def _emit(values: Tuple[int, ...], layout: Layout, labels: Tuple[int, ...], next_label: int,
+          bound: Optional[Tuple[int, ...]], single: bool = False):
+    """
+    Smallest output row for a source row under a column layout.
+
+    Returns (out, [(layout, labels, next label), ...]) for every way to reach
+    it (just the first if `single`), or None as soon as the row can't match
+    `bound`.
+    """
+    if not any(values):
+        # An empty row is the smallest possible and tells no columns apart
+        return (0,) * len(values), [(layout, labels, next_label)]
+    out: Tuple[int, ...] = ()
+    beams = [((), labels, next_label)]
+    for group in layout:
+        best = None
+        expanded = []
+        for new_layout, beam_labels, beam_next in beams:
+            for segment, parts, refined_labels, refined_next in _refine(group, values, beam_labels, beam_next):
+                if best is None or segment < best:
+                    best, expanded = segment, []
+                if segment == best and len(expanded) < (1 if single else MAX_BEAMS):
+                    expanded.append((new_layout + parts, refined_labels, refined_next))
+        out += best
+        beams = expanded
+        if bound is not None:
+            prefix = bound[:len(out)]
+            if out > prefix:
+                return None
+            if out < prefix:
+                bound = None
+    return out, beams
+
+
+def _refine(group: Tuple[int, ...], values: Tuple[int, ...], labels: Tuple[int, ...], next_label: int):
+    """
+    Smallest arrangements of a run of columns: empty cells first, then digits
+    by label. Digits seen for the first time are numbered in each possible
+    order, since each gives the same row but a different relabelling.
+    """
+    if len(group) == 1:
+        value = values[group[0]]
+        if not value:
+            yield (0,), (group,), labels, next_label
+        elif labels[value]:
+            yield (labels[value],), (group,), labels, next_label
+        else:
+            yield (next_label,), (group,), labels[:value] + (next_label,) + labels[value + 1:], next_label + 1
+        return
+    if not any(values[c] for c in group):
+        yield (0,) * len(group), (group,), labels, next_label
+        return
+
+    fresh = sorted({values[c] for c in group if values[c] and not labels[values[c]]})
+    for order in permutations(fresh):
+        new_labels = list(labels)
+        label = next_label
+        for digit in order:
+            new_labels[digit] = label
+            label += 1
+        keyed = sorted((new_labels[values[c]] if values[c] else 0, c) for c in group)
+        segment = tuple(value for value, _ in keyed)
+        parts: List[Tuple[int, ...]] = []
+        previous = None
+        for value, col in keyed:
+            if value == previous:
+                # Empty cells (or a digit repeated in an invalid grid) stay together
+                parts[-1] += (col,)
+            else:
+                parts.append((col,))
+            previous = value
+        yield segment, tuple(parts), tuple(new_labels), label
+
+
+def _inverse(order: Sequence[int]) -> Tuple[int, ...]:
+    inverse = [0] * len(order)
+    for i, value in enumerate(order):
+        inverse[value] = i
+    return tuple(inverse)
@@ -0,0 +1,215 @@
+"""
+Validation and difficulty grading of single Sudoku puzzles.
+
+grade_puzzle() checks that a puzzle's givens don't clash and that it has
+exactly one solution, then grades it by the techniques a human needs, using
+the same step order as the hints: naked singles first, then hidden singles
+by row, column and box. A puzzle that singles alone can't finish needs
+search (or techniques the tutor doesn't teach yet).
+
+    easy    naked singles only
+    medium  hidden singles needed too
+    hard    stuck without search
+
+Everything here is plain per-puzzle work with no shared state, so the corpus
+importer can run it in worker processes.
+"""
+
+import re
+from math import isqrt
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from agents.sudoku.canonical import canonical_form
+from agents.sudoku.candidates import SYMBOLS, UNITS, CandidateState, geometry, grid_from_key
+
+# Bit per technique in Grade.techniques
+TECHNIQUES = ("naked_single", "hidden_single_row", "hidden_single_column", "hidden_single_box", "search")
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+_SEARCH = 1 << TECHNIQUES.index("search")
+
+_FIELD_SEPARATOR = re.compile(r"[\s,;:]+")
+
+
+class InvalidPuzzle(ValueError):
+    """A puzzle that can't be graded; `reason` is a short machine-readable code."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class Grade(NamedTuple):
+    """A valid puzzle in canonical form with its grading."""
+    canonical: str
+    size: int
+    givens: int
+    difficulty: str
+    techniques: int
+    steps: int
+
+
+def technique_names(mask: int) -> List[str]:
+    """Technique names set in a Grade.techniques mask."""
+    return [name for bit, name in enumerate(TECHNIQUES) if mask >> bit & 1]
+
+
+def parse_puzzle(line: str) -> Optional[str]:
+    """
+    Grid key from one line of a puzzle collection, or None for blank and comment lines.
+
+    The puzzle is the first field of the line (fields split on whitespace,
+    commas, semicolons or colons), one character per cell with '0' or '.'
+    for empty cells, so "puzzle", "puzzle,solution" and "puzzle rating"
+    lines all work.
+
+    Raises:
+        InvalidPuzzle: If the field isn't a square grid of a supported size
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    field = _FIELD_SEPARATOR.split(line, 1)[0].upper().replace(".", "0")
+    size = isqrt(len(field))
+    if not field or size * size != len(field):
+        raise InvalidPuzzle("format", f"{len(field)} cells is not a square grid")
+    try:
+        geometry(size)
+    except ValueError as e:
+        raise InvalidPuzzle("format", str(e)) from None
+    if any(symbol not in SYMBOLS[:size + 1] for symbol in field):
+        raise InvalidPuzzle("format", f"cell values must be 0-{SYMBOLS[size]} on a {size}x{size} grid")
+    return field
+
+
+def grade_puzzle(key: str) -> Grade:
+    """
+    Validate and grade a puzzle given as a grid key.
+
+    Raises:
+        InvalidPuzzle: With reason "conflict", "no_solution" or "multiple_solutions"
+    """
+    # Uncached: importing a corpus sees each puzzle once
+    form = canonical_form.__wrapped__(key)
+    state = CandidateState(grid_from_key(form.key))
+    _check_givens(state)
+    givens = state.size * state.size - len(state.candidates)
+
+    techniques = 0
+    steps = 0
+    while True:
+        move = state.next_move()
+        if not move:
+            break
+        techniques |= 1 << TECHNIQUES.index(move["type"])
+        state.place(move["row"], move["col"], move["value"])
+        steps += 1
+
+    # Singles are forced, so a grid they finish has exactly one solution
+    if state.candidates:
+        solutions = _count_solutions(state, 2)
+        if solutions == 0:
+            raise InvalidPuzzle("no_solution", "the puzzle has no solution")
+        if solutions > 1:
+            raise InvalidPuzzle("multiple_solutions", "the puzzle has more than one solution")
+        techniques |= _SEARCH
+
+    if techniques & _SEARCH:
+        difficulty = "hard"
+    elif techniques & ~1:
+        difficulty = "medium"
+    else:
+        difficulty = "easy"
+    return Grade(form.key, state.size, givens, difficulty, techniques, steps)
+
+
+def grade_chunk(lines: List[str]) -> Tuple[List[Grade], Dict[str, int]]:
+    """Grade a chunk of lines; returns the valid puzzles and a count of rejects by reason."""
+    grades = []
+    rejected: Dict[str, int] = {}
+    for line in lines:
+        try:
+            key = parse_puzzle(line)
+            if key is not None:
+                grades.append(grade_puzzle(key))
+        except InvalidPuzzle as e:
+            rejected[e.reason] = rejected.get(e.reason, 0) + 1
+    return grades, rejected
+
+
+def _check_givens(state: CandidateState) -> None:
+    for unit in UNITS:
+        for index, cells in enumerate(state.geometry.units[unit]):
+            values = [state.grid[row][col] for row, col in cells if state.grid[row][col]]
+            if len(values) != len(set(values)):
+                raise InvalidPuzzle("conflict", f"a number repeats in {unit} {index + 1}")
+
+
+def _count_solutions(state: CandidateState, limit: int) -> int:
+    """Solutions reachable from state, counting no further than limit."""
+    if not _fill_singles(state):
+        return 0
+    if not state.candidates:
+        return 1
+    # Most constrained cell first
+    cell, mask = min(state.candidates.items(), key=lambda item: item[1].bit_count())
+    count = 0
+    for value in range(1, mask.bit_length()):
+        if not mask >> value & 1:
+            continue
+        branch = state.copy()
+        eliminated = branch.place(cell[0], cell[1], value)
+        if any(not branch.candidates[peer] for peer in eliminated):
+            continue
+        count += _count_solutions(branch, limit - count)
+        if count >= limit:
+            break
+    return count
+
+
+def _fill_singles(state: CandidateState) -> bool:
+    """Place naked and hidden singles until none are left; False on a contradiction."""
+    candidates = state.candidates
+    grid = state.grid
+    all_digits = state.geometry.all_digits
+    unit_lists = list(state.geometry.units.values())
+    while True:
+        progress = False
+        for cell in [cell for cell, mask in candidates.items() if not mask & (mask - 1)]:
+            mask = candidates.get(cell)
+            if mask is None:
+                continue
+            if not mask:
+                return False
+            eliminated = state.place(cell[0], cell[1], mask.bit_length() - 1)
+            if any(not candidates[peer] for peer in eliminated):
+                return False
+            progress = True
+
+        for units in unit_lists:
+            for cells in units:
+                once = twice = placed = 0
+                for row, col in cells:
+                    mask = candidates.get((row, col))
+                    if mask is None:
+                        placed |= 1 << grid[row][col]
+                    else:
+                        twice |= once & mask
+                        once |= mask
+                if once | placed != all_digits:
+                    # Some digit has nowhere left to go in this unit
+                    return False
+                single = once & ~twice
+                while single:
+                    bit = single & -single
+                    single ^= bit
+                    cell = next((cell for cell in cells if candidates.get(cell, 0) & bit), None)
+                    if cell is None:
+                        continue
+                    eliminated = state.place(cell[0], cell[1], bit.bit_length() - 1)
+                    if any(not candidates[peer] for peer in eliminated):
+                        return False
+                    progress = True
+        if not progress:
+            return True
@@ -0,0 +1,132 @@
+"""
+Sudoku hint computation and background prefetching.
+
+solving_move() builds the full hint payload for a grid: the user's last
+number checked for conflicts, then the next step along the puzzle's solve
+path with its explanation, speech and highlight cells. The page pings
+/learnplay/sudoku/prefetch after every move, so hints are usually computed
+on the prefetch workers while the user is still thinking, and each hint
+also queues the one after it. get_next_solving_move then only looks the
+result up.
+"""
+
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from agents.sudoku.candidates import CandidateState, Grid, geometry, grid_key
+from agents.sudoku.solve_path import solve_paths
+from shared.prefetch import Prefetcher
+
+
+def explain_move(move: Dict[str, Any], size: int = 9) -> str:
+    """Teaching explanation for a naked or hidden single on a size x size grid."""
+    if move["type"] == "naked_single":
+        return (
+            f"This is a 'Naked Single' - the easiest Sudoku technique. "
+            f"Cell ({move['row']+1},{move['col']+1}) can only contain "
+            f"the number {move['value']} because all other numbers (1-{size}) are "
+            f"already present in its row, column, or {geometry(size).box_label} box."
+        )
+    if move["type"].startswith("hidden_single"):
+        return (
+            f"This is a 'Hidden Single'. While other numbers might seem possible in "
+            f"cell ({move['row']+1},{move['col']+1}), the number "
+            f"{move['value']} can only go in this cell within its "
+            f"{'row' if 'row' in move['type'] else 'column' if 'column' in move['type'] else 'box'}."
+        )
+    return ""
+
+
+def speech_for_move(move: Dict[str, Any]) -> str:
+    where = f"row {move['row']+1}, column {move['col']+1}"
+    if move["type"] == "naked_single":
+        return f"Look at {where}. Every other number is taken, so it must be {move['value']}."
+    unit = move["type"].rsplit("_", 1)[-1]
+    return f"In this {unit}, {move['value']} fits only at {where}."
+
+
+def solving_move(grid: Grid, puzzle: Optional[str] = None,
+                 last_move: Optional[Tuple[int, int, int]] = None) -> Dict[str, Any]:
+    """
+    Hint payload for get_next_solving_move.
+
+    Args:
+        grid: The user's grid
+        puzzle: The puzzle's starting numbers as a grid key, if known
+        last_move: (row, col, value) the user last placed, checked for conflicts
+    """
+    result: Dict[str, Any] = {"has_wrong_move": False}
+    if last_move:
+        row, col, value = last_move
+        board = CandidateState(grid)
+        conflicts = board.conflicts(row, col, value)
+        if conflicts:
+            result["has_wrong_move"] = True
+            result["wrong_move"] = {
+                "row": row,
+                "col": col,
+                "value": value,
+                "conflict_type": conflicts[0]["type"],
+                "conflicts": conflicts,
+                "explanation": conflicts[0]["message"],
+                "highlight_cells": board.conflict_highlights(row, col, value, conflicts),
+            }
+            # Solve around the mistake rather than from it
+            grid = [list(cells) for cells in grid]
+            grid[row][col] = None
+
+    # Precomputed per puzzle: a lookup unless the user has left the solve path
+    move = solve_paths.next_step(grid, puzzle)
+    if not move:
+        result.update({
+            "has_suggestion": False,
+            "message": "No obvious moves found. The puzzle may need advanced techniques."
+        })
+        return result
+
+    result.update({
+        "has_suggestion": True,
+        "row": move["row"],
+        "col": move["col"],
+        "value": move["value"],
+        "strategy": move["type"],
+        "explanation": explain_move(move, len(grid)),
+        "speech": speech_for_move(move),
+        "highlight_cells": move["highlight_cells"],
+    })
+    return result
+
+
+hint_prefetcher = Prefetcher(solving_move, "sudoku_hint")
+
+
+def _hint_args(grid: Grid, puzzle: Optional[str], last_move: Optional[Dict[str, Any]]) -> Tuple[Hashable, tuple]:
+    key = grid_key(grid)
+    placed = None
+    if last_move:
+        row, col, value = last_move["row"], last_move["col"], last_move["value"]
+        # A last move the grid no longer shows can't conflict, so it doesn't change the hint
+        if grid[row][col] == value:
+            placed = (row, col, value)
+    return (key, puzzle, placed), (grid, puzzle, placed)
+
+
+def get_hint(grid: Grid, puzzle: Optional[str] = None,
+             last_move: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Hint for the grid, prefetched when possible; queues the hint after it."""
+    key, args = _hint_args(grid, puzzle, last_move)
+    result = hint_prefetcher.get(key, *args, group=puzzle)
+    if result.get("has_suggestion"):
+        # Most players place the suggested number next
+        following = [list(cells) for cells in grid]
+        if result["has_wrong_move"]:
+            following[result["wrong_move"]["row"]][result["wrong_move"]["col"]] = None
+        following[result["row"]][result["col"]] = result["value"]
+        prefetch_hint(following, puzzle, {"row": result["row"], "col": result["col"], "value": result["value"]})
+    return result
+
+
+def prefetch_hint(grid: Grid, puzzle: Optional[str] = None,
+                  last_move: Optional[Dict[str, Any]] = None) -> bool:
+    """Queue the hint for a grid the user has just reached; True if work was queued."""
+    key, args = _hint_args(grid, puzzle, last_move)
+    return hint_prefetcher.submit(key, *args, group=puzzle)
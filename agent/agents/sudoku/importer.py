@@ -0,0 +1,124 @@
+"""
+Streaming import of large Sudoku collections into the puzzle store.
+
+Reads a line-based puzzle file (plain, .gz, .bz2 or .xz) lazily, validates
+and grades it in chunks on a process pool, and writes each graded chunk to
+the PuzzleStore as it comes back. Duplicates, including relabelled or
+reshuffled copies, are dropped by the store's canonical-form key. At most
+2 chunks per worker are in flight and nothing else accumulates, so memory
+stays flat however many millions of lines the file has.
+
+Usage:
+    cd agent
+    uv run python -m agents.sudoku.importer puzzles.txt.gz [--db data/sudoku_puzzles.sqlite] [--workers 8]
+"""
+
+import argparse
+import bz2
+import gzip
+import lzma
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from agents.sudoku.grading import Grade, grade_chunk
+from agents.sudoku.puzzle_store import DEFAULT_PATH, PuzzleStore
+
+_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open, ".lzma": lzma.open}
+
+
+def read_lines(path: str) -> Iterator[str]:
+    """Lines of a text file, decompressed on the fly by file extension."""
+    opener = _OPENERS.get(os.path.splitext(path)[1].lower(), open)
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        yield from f
+
+
+def import_puzzles(
+    path: str,
+    store: PuzzleStore,
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    limit: Optional[int] = None,
+    progress_every: int = 100_000,
+) -> Dict[str, int]:
+    """
+    Grade every puzzle in a file and add the new ones to the store.
+
+    Args:
+        path: Puzzle file, one puzzle per line (see grading.parse_puzzle)
+        store: Destination store
+        workers: Worker processes (IMPORT_WORKERS, default: CPU count); 1 grades inline
+        chunk_size: Lines per task sent to a worker
+        limit: Stop after this many lines
+        progress_every: Lines between progress lines
+
+    Returns:
+        Counts of lines read, puzzles added, duplicates and rejects by reason
+    """
+    workers = workers or int(os.getenv("IMPORT_WORKERS", "0")) or os.cpu_count() or 1
+    lines = islice(read_lines(path), limit)
+    chunks = iter(lambda: list(islice(lines, chunk_size)), [])
+    stats: Dict[str, int] = {"lines": 0, "added": 0, "duplicates": 0}
+    started = time.perf_counter()
+    next_report = progress_every
+
+    def record(lines_in_chunk: int, result: Tuple[List[Grade], Dict[str, int]]) -> None:
+        nonlocal next_report
+        grades, rejected = result
+        added = store.add(grades)
+        stats["lines"] += lines_in_chunk
+        stats["added"] += added
+        stats["duplicates"] += len(grades) - added
+        for reason, count in rejected.items():
+            stats[f"rejected_{reason}"] = stats.get(f"rejected_{reason}", 0) + count
+        if stats["lines"] >= next_report:
+            next_report += progress_every
+            rate = stats["lines"] / max(time.perf_counter() - started, 1e-9)
+            print(f"[OK] {stats['lines']:,} lines, {stats['added']:,} new puzzles ({rate:,.0f} lines/s)")
+
+    if workers <= 1:
+        for chunk in chunks:
+            record(len(chunk), grade_chunk(chunk))
+        return stats
+
+    # Oldest first, so chunks are stored in file order
+    in_flight: Deque[Tuple[int, Future]] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks:
+            if len(in_flight) >= workers * 2:
+                size, future = in_flight.popleft()
+                record(size, future.result())
+            in_flight.append((len(chunk), pool.submit(grade_chunk, chunk)))
+        while in_flight:
+            size, future = in_flight.popleft()
+            record(size, future.result())
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import and grade a Sudoku puzzle collection")
+    parser.add_argument("path", help="Puzzle file, one per line; .gz, .bz2 and .xz are read compressed")
+    parser.add_argument("--db", default=os.getenv("SUDOKU_PUZZLE_DB", DEFAULT_PATH), help="Puzzle store")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Lines per worker task")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many lines")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with PuzzleStore(args.db) as store:
+        stats = import_puzzles(args.path, store, args.workers, args.chunk_size, args.limit)
+        summary = store.summary()
+    elapsed = time.perf_counter() - started
+    print(f"[OK] Imported {args.path} into {args.db} in {elapsed:.1f}s")
+    for name, value in stats.items():
+        print(f"    {name}: {value:,}")
+    for size, counts in summary.items():
+        print(f"    {size}: " + ", ".join(f"{count:,} {difficulty}" for difficulty, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
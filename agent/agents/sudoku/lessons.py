@@ -0,0 +1,75 @@
+"""Scripted Sudoku lessons served by the lesson fast path."""
+
+from typing import Any, Dict
+
+from shared.lessons import Lesson
+from agents.sudoku.candidates import geometry
+from agents.sudoku.tools import explain_sudoku_basics
+
+def _basics(step: str, size: int) -> dict:
+    # Call the tool's function directly: same cells, no tool-call overhead
+    return explain_sudoku_basics.func(step=step, size=size)
+
+
+def _board_size(state: Dict[str, Any]) -> int:
+    return state.get("sudoku_size") or 9
+
+
+def basics_lesson(size: int) -> Lesson:
+    """The rules lesson for a size x size board, worded for its boxes and digits."""
+    shape = geometry(size)
+    box = f"{shape.box_rows}×{shape.box_cols}"
+    return Lesson(
+        # 9x9 keeps the original id, so lessons already under way carry on
+        lesson_id="sudoku_basics" if size == 9 else f"sudoku_basics{size}",
+        topic="Sudoku Rules",
+        triggers=[
+            "Explain the basic rules of Sudoku using this board as an example",
+            "Explain basics",
+            "Explain the basics",
+            "Learn Sudoku",
+            "Learn Sudoku basics",
+            "Teach me the rules of Sudoku",
+        ],
+        highlight_tool="highlightCells",
+        highlight_arg="cells",
+        applies=lambda state: _board_size(state) == size,
+        steps=[
+            {
+                "description": f"Understanding {box} boxes",
+                "highlight": _basics("box", size)["cells"],
+                "highlight_message": f"Each {box} box must contain 1-{size} with no repeats",
+                "speak": f"Each {box} box must contain 1-{size} with no repeats",
+                "say": "Click 'Next Step' to continue learning about rows.",
+            },
+            {
+                "description": "Understanding rows",
+                "highlight": _basics("row", size)["cells"],
+                "highlight_message": _basics("row", size)["message"],
+                "speak": f"Each row must contain the numbers 1 to {size} with no repeats.",
+                "say": "Click 'Next Step' to learn about columns.",
+            },
+            {
+                "description": "Understanding columns",
+                "highlight": _basics("column", size)["cells"],
+                "highlight_message": _basics("column", size)["message"],
+                "speak": f"Each column must contain the numbers 1 to {size} with no repeats.",
+                "say": "Click 'Next Step' for the summary.",
+            },
+            {
+                "description": "Putting it all together",
+                "highlight": [],
+                "speak": f"Great job! Each row, column, and box needs 1-{size}",
+                "say": (
+                    _basics("all", size)["explanation"]
+                    + "\n\nGreat job! You now know the basics. Ask for a hint or try solving!"
+                ),
+            },
+        ],
+    )
+
+
+SUDOKU_BASICS_LESSON = basics_lesson(9)
+
+# Other board sizes are taught by the model
+SUDOKU_LESSONS = [SUDOKU_BASICS_LESSON] + [basics_lesson(size) for size in (4, 6, 16)]
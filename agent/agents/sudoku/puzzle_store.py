@@ -0,0 +1,171 @@
+"""
+Compact on-disk store of graded Sudoku puzzles.
+
+Puzzles are kept once per canonical form (see canonical.py), packed as a
+base-(size+1) number: 34 bytes for a 9x9 grid instead of 81 characters.
+The row id is a 64-bit hash of the canonical form, so inserting a
+duplicate is a primary-key lookup and no separate unique index is needed.
+One index on (size, difficulty, givens, techniques) serves every filter and
+the ordering, so a query reads only the rows it returns.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from agents.sudoku.candidates import SYMBOLS
+from agents.sudoku.grading import DIFFICULTIES, TECHNIQUES, Grade, technique_names
+
+DEFAULT_PATH = os.path.join("data", "sudoku_puzzles.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS puzzles (
+    id INTEGER PRIMARY KEY,
+    size INTEGER NOT NULL,
+    cells BLOB NOT NULL,
+    givens INTEGER NOT NULL,
+    difficulty INTEGER NOT NULL,
+    techniques INTEGER NOT NULL,
+    steps INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS puzzles_grade ON puzzles (size, difficulty, givens, techniques);
+"""
+
+_INSERT = "INSERT OR IGNORE INTO puzzles VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+
+def pack_cells(key: str, size: int) -> bytes:
+    """Grid key as a big-endian base-(size+1) number."""
+    value = int(key, size + 1)
+    return value.to_bytes((value.bit_length() + 7) // 8 or 1, "big")
+
+
+def unpack_cells(data: bytes, size: int) -> str:
+    """Inverse of pack_cells."""
+    value = int.from_bytes(data, "big")
+    cells = []
+    for _ in range(size * size):
+        value, digit = divmod(value, size + 1)
+        cells.append(SYMBOLS[digit])
+    return "".join(reversed(cells))
+
+
+def puzzle_id(canonical: str) -> int:
+    """Row id of a canonical grid key: a signed 64-bit hash."""
+    return int.from_bytes(hashlib.blake2b(canonical.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+class PuzzleStore:
+    """
+    Graded puzzles in SQLite, deduplicated by canonical form.
+
+    Args:
+        path: Database file; created with its directory if missing
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def add(self, grades: Iterable[Grade]) -> int:
+        """Insert graded puzzles in one transaction; returns how many were new."""
+        rows = [
+            (puzzle_id(grade.canonical), grade.size, pack_cells(grade.canonical, grade.size), grade.givens,
+             DIFFICULTIES.index(grade.difficulty), grade.techniques, grade.steps)
+            for grade in grades
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(_INSERT, rows)
+            return self._conn.total_changes - before
+
+    def query(
+        self,
+        difficulty: Optional[str] = None,
+        technique: Optional[str] = None,
+        size: int = 9,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Puzzles of a size, optionally filtered, gentlest (most givens) first.
+
+        Args:
+            difficulty: "easy", "medium" or "hard"
+            technique: Only puzzles whose solve path uses this technique (see TECHNIQUES)
+            size: Grid size
+            limit: Puzzles to return
+            offset: Puzzles to skip, for paging
+
+        Returns:
+            Dicts with puzzle (canonical grid key), difficulty, techniques, givens and steps
+        """
+        where, params = self._where(difficulty, technique, size)
+        sql = (f"SELECT size, cells, givens, difficulty, techniques, steps FROM puzzles WHERE {where} "
+               f"ORDER BY givens DESC LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit, offset]).fetchall()
+        return [
+            {
+                "puzzle": unpack_cells(cells, row_size),
+                "size": row_size,
+                "difficulty": DIFFICULTIES[row_difficulty],
+                "techniques": technique_names(techniques),
+                "givens": givens,
+                "steps": steps,
+            }
+            for row_size, cells, givens, row_difficulty, techniques, steps in rows
+        ]
+
+    def count(self, difficulty: Optional[str] = None, technique: Optional[str] = None, size: int = 9) -> int:
+        """Number of puzzles query() would page through."""
+        where, params = self._where(difficulty, technique, size)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM puzzles WHERE {where}", params).fetchone()[0]
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Puzzle counts by size ("9x9") and difficulty."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT size, difficulty, COUNT(*) FROM puzzles GROUP BY size, difficulty"
+            ).fetchall()
+        result: Dict[str, Dict[str, int]] = {}
+        for size, difficulty, count in rows:
+            result.setdefault(f"{size}x{size}", {})[DIFFICULTIES[difficulty]] = count
+        return result
+
+    def _where(self, difficulty: Optional[str], technique: Optional[str], size: int):
+        clauses, params = ["size = ?"], [size]
+        if difficulty is not None:
+            if difficulty not in DIFFICULTIES:
+                raise ValueError(f"Unknown difficulty '{difficulty}': use one of {', '.join(DIFFICULTIES)}")
+            clauses.append("difficulty = ?")
+            params.append(DIFFICULTIES.index(difficulty))
+        if technique is not None:
+            if technique not in TECHNIQUES:
+                raise ValueError(f"Unknown technique '{technique}': use one of {', '.join(TECHNIQUES)}")
+            # Every mask with the technique's bit, so the filter is read from the index
+            bit = 1 << TECHNIQUES.index(technique)
+            masks = [mask for mask in range(1 << len(TECHNIQUES)) if mask & bit]
+            clauses.append(f"techniques IN ({', '.join('?' * len(masks))})")
+            params.extend(masks)
+        return " AND ".join(clauses), params
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "PuzzleStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,219 @@
+"""
+Precomputed human solve paths for Sudoku hints.
+
+A SolvePath is the ordered list of single-technique steps (naked singles,
+then hidden singles by row, column and box) that solves a grid, each with
+its highlight cells and the candidates it eliminates. Paths are planned once
+per puzzle and cached, so a hint only checks that the user's grid still
+agrees with the path and returns the first step the user hasn't filled.
+A grid that has left the path (a different number, an erased given) is
+replanned from where it is.
+
+Paths are planned on the canonical form of the starting grid (see
+canonical.py) and mapped back to the user's orientation, so a puzzle that
+is a relabelled, reshuffled or transposed copy of one already planned for
+any user reuses that plan. Grids at least three quarters filled in are
+planned directly: that is cheaper than canonicalizing them.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from agents.sudoku.canonical import Transform, canonical_form
+from agents.sudoku.candidates import (
+    SYMBOLS, CandidateState, Geometry, Grid, describe_move, geometry, grid_from_key, grid_key,
+)
+
+
+class SolvePath:
+    """Every step from a starting grid until no single remains."""
+
+    def __init__(self, grid: Grid):
+        state = CandidateState(grid)
+        self.size = len(state.grid)
+        self.start = grid_key(state.grid)
+        self.steps: List[Dict[str, Any]] = []
+        while True:
+            move = state.next_move()
+            if not move:
+                break
+            highlights = state.move_highlights(move)
+            eliminated = state.place(move["row"], move["col"], move["value"])
+            self.steps.append({
+                **move,
+                "highlight_cells": highlights,
+                "eliminations": [{"row": r, "col": c, "value": move["value"]} for r, c in eliminated],
+            })
+        # Start grid with every step applied; '0' where the path gets stuck
+        self.target = grid_key(state.grid)
+        self.solved = "0" not in self.target
+
+    def states(self) -> List[str]:
+        """Grid key before each step and after the last one."""
+        keys = [self.start]
+        cells = list(self.start)
+        for step in self.steps:
+            cells[step["row"] * self.size + step["col"]] = SYMBOLS[step["value"]]
+            keys.append("".join(cells))
+        return keys
+
+    def transformed(self, transform: Transform) -> "SolvePath":
+        """This path, planned on a canonical grid, in the orientation and digits of the user's grid."""
+        path = SolvePath.__new__(SolvePath)
+        shape = geometry(self.size)
+        path.size = self.size
+        path.start = transform.key_to_user(self.start)
+        path.target = transform.key_to_user(self.target)
+        path.solved = self.solved
+        path.steps = [_step_to_user(step, transform, shape) for step in self.steps]
+        return path
+
+    def matches(self, key: str) -> bool:
+        """True if the grid keeps every starting number and agrees with the path everywhere else."""
+        if len(key) != len(self.start):
+            return False
+        for start, target, value in zip(self.start, self.target, key):
+            if value == "0":
+                if start != "0":
+                    return False
+            elif value != target:
+                return False
+        return True
+
+    def next_step(self, key: str) -> Optional[Dict[str, Any]]:
+        """First step whose cell is still empty in a matching grid, with crosses on filled cells dropped."""
+        for step in self.steps:
+            if key[step["row"] * self.size + step["col"]] != "0":
+                continue
+            if not any(cell["type"] == "cross" for cell in step["highlight_cells"]):
+                return step
+            return {**step, "highlight_cells": [
+                cell for cell in step["highlight_cells"]
+                if cell["type"] != "cross" or key[cell["row"] * self.size + cell["col"]] == "0"
+            ]}
+        return None
+
+
+class SolvePathCache:
+    """
+    LRU of solve paths, by puzzle and by every grid along each path.
+
+    A grid reached by following the hints in order is found with one dict
+    lookup; one filled in another order is checked against the puzzle's path.
+    """
+
+    def __init__(self, max_paths: Optional[int] = None):
+        self.max_paths = max_paths or int(os.getenv("SOLVE_PATH_CACHE", "256"))
+        # Puzzle key (or start grid key) -> path
+        self._paths: "OrderedDict[str, SolvePath]" = OrderedDict()
+        # Grid key of every state along a cached path -> that path's name in _paths
+        self._by_state: Dict[str, str] = {}
+        # Canonical start key -> path planned from that canonical grid
+        self._canonical: "OrderedDict[str, SolvePath]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.plans = 0
+        self.shared = 0
+
+    def next_step(self, grid: Grid, puzzle: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Next step for grid along the cached path, planning or replanning if needed.
+
+        Args:
+            grid: The user's current grid
+            puzzle: Key of the puzzle's starting numbers, when known; its path is
+                planned from those numbers rather than from the current grid
+        """
+        key = grid_key(grid)
+        with self._lock:
+            name = self._by_state.get(key) or puzzle
+            path = self._paths.get(name) if name else None
+            if path is not None and path.matches(key):
+                self._paths.move_to_end(name)
+                self.hits += 1
+                return path.next_step(key)
+            known = path is not None
+
+        path = None
+        if puzzle and not known and len(puzzle) == len(key):
+            path = self._plan(puzzle)
+            if not path.matches(key):
+                path = None
+        if path is None:
+            # Diverged from the puzzle's path: plan from where the user is
+            path = self._plan(key)
+        self._store(puzzle or path.start, path)
+        return path.next_step(key)
+
+    def _plan(self, key: str) -> SolvePath:
+        """Path from the grid with this key, reusing the plan of any equivalent grid."""
+        if key.count("0") * 4 <= len(key):
+            # Mostly filled in: planning takes well under a millisecond, less
+            # than canonicalizing, and such grids are rarely shared
+            return SolvePath(grid_from_key(key))
+        form = canonical_form(key)
+        with self._lock:
+            path = self._canonical.get(form.key)
+            if path is not None:
+                self._canonical.move_to_end(form.key)
+                self.shared += 1
+        if path is None:
+            path = SolvePath(grid_from_key(form.key))
+            with self._lock:
+                self._canonical[form.key] = path
+                while len(self._canonical) > self.max_paths:
+                    self._canonical.popitem(last=False)
+        return path.transformed(form.transform)
+
+    def _store(self, name: str, path: SolvePath) -> None:
+        with self._lock:
+            self.plans += 1
+            self._drop(name)
+            self._paths[name] = path
+            for state in path.states():
+                self._by_state[state] = name
+            while len(self._paths) > self.max_paths:
+                self._drop(next(iter(self._paths)))
+
+    def _drop(self, name: str) -> None:
+        path = self._paths.pop(name, None)
+        if path is None:
+            return
+        for state in path.states():
+            if self._by_state.get(state) == name:
+                del self._by_state[state]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._paths.clear()
+            self._by_state.clear()
+            self._canonical.clear()
+
+
+def _step_to_user(step: Dict[str, Any], transform: Transform, shape: Geometry) -> Dict[str, Any]:
+    row, col = transform.cell_to_user(step["row"], step["col"])
+    move_type = step["type"]
+    if move_type.startswith("hidden_single_"):
+        move_type = "hidden_single_" + transform.unit_to_user(move_type.rsplit("_", 1)[-1])
+    move = {"type": move_type, "row": row, "col": col, "value": transform.value_to_user(step["value"])}
+    move["description"] = describe_move(move, shape)
+    return {
+        **move,
+        "highlight_cells": [_cell_to_user(cell, transform) for cell in step["highlight_cells"]],
+        "eliminations": [_cell_to_user(cell, transform) for cell in step["eliminations"]],
+    }
+
+
+def _cell_to_user(cell: Dict[str, Any], transform: Transform) -> Dict[str, Any]:
+    row, col = transform.cell_to_user(cell["row"], cell["col"])
+    mapped = {**cell, "row": row, "col": col}
+    if "value" in cell:
+        mapped["value"] = transform.value_to_user(cell["value"])
+    if "label" in cell:
+        mapped["label"] = str(transform.value_to_user(int(cell["label"])))
+    return mapped
+
+
+solve_paths = SolvePathCache()
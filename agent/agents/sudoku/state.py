@@ -13,5 +13,6 @@ class SudokuAgentState(BaseTeachingState):
     
     # Sudoku-specific state
     sudoku_grid: Optional[List[List[Optional[int]]]] = None
+    sudoku_size: int = 9  # 4, 6, 9 or 16; boxes are 2x2, 2x3, 3x3 or 4x4
     last_move: Optional[Dict[str, Any]] = None
     teaching_mode: str = "play"  # play, teach, practice
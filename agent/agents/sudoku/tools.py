@@ -3,7 +3,11 @@ Sudoku teaching tools for the AI agent.
 """
 
 from typing import List, Dict, Any, Optional
-from langchain.tools import tool
+from langchain.tools import tool, ToolRuntime
+from agents.sudoku.candidates import CandidateState, digits, geometry, is_grid_key
+from agents.sudoku.hints import explain_move, get_hint
+from agents.sudoku.solve_path import solve_paths
+from shared.base_state import readable
 
 @tool
 def analyze_sudoku_grid(grid: List[List[Optional[int]]]) -> Dict[str, Any]:
@@ -11,44 +15,13 @@ def analyze_sudoku_grid(grid: List[List[Optional[int]]]) -> Dict[str, Any]:
     Analyze a Sudoku grid and identify teaching strategies.
     
     Args:
-        grid: 9x9 Sudoku grid where None represents empty cells
+        grid: Sudoku grid (4x4, 6x6, 9x9 or 16x16) where None represents empty cells
         
     Returns:
         Dictionary with analysis including strategies found
     """
-    strategies_found = []
-    
-    # Find naked singles
-    for row in range(9):
-        for col in range(9):
-            if grid[row][col] is None:
-                possible = get_possible_values(grid, row, col)
-                if len(possible) == 1:
-                    strategies_found.append({
-                        "type": "naked_single",
-                        "row": row,
-                        "col": col,
-                        "value": possible[0],
-                        "description": f"Cell ({row+1},{col+1}) can only be {possible[0]}"
-                    })
-    
-    # Find hidden singles in rows
-    for row in range(9):
-        for value in range(1, 10):
-            possible_cols = []
-            for col in range(9):
-                if grid[row][col] is None and value in get_possible_values(grid, row, col):
-                    possible_cols.append(col)
-            
-            if len(possible_cols) == 1:
-                col = possible_cols[0]
-                strategies_found.append({
-                    "type": "hidden_single_row",
-                    "row": row,
-                    "col": col,
-                    "value": value,
-                    "description": f"In row {row+1}, only cell ({row+1},{col+1}) can be {value}"
-                })
+    candidates = CandidateState(grid)
+    strategies_found = candidates.naked_singles() + candidates.hidden_singles("row")
     
     return {
         "strategies_found": strategies_found,
@@ -62,16 +35,18 @@ def validate_move(grid: List[List[Optional[int]]], row: int, col: int, value: in
     Validate if a move is correct and provide explanation.
     
     Args:
-        grid: Current Sudoku grid
-        row: Row index (0-8)
-        col: Column index (0-8)
-        value: Value to place (1-9)
+        grid: Current Sudoku grid (4x4, 6x6, 9x9 or 16x16)
+        row: Row index (0-8 on a 9x9 grid)
+        col: Column index (0-8 on a 9x9 grid)
+        value: Value to place (1-9 on a 9x9 grid)
         
     Returns:
         Validation result with explanation
     """
+    shape = geometry(len(grid))
+    
     # Check if value already exists in row
-    for c in range(9):
+    for _, c in shape.unit_cells("row", row):
         if c != col and grid[row][c] == value:
             return {
                 "valid": False,
@@ -80,7 +55,7 @@ def validate_move(grid: List[List[Optional[int]]], row: int, col: int, value: in
             }
     
     # Check if value already exists in column
-    for r in range(9):
+    for r, _ in shape.unit_cells("column", col):
         if r != row and grid[r][col] == value:
             return {
                 "valid": False,
@@ -88,18 +63,14 @@ def validate_move(grid: List[List[Optional[int]]], row: int, col: int, value: in
                 "message": f"The number {value} already appears in column {col+1} at row {r+1}"
             }
     
-    # Check if value already exists in 3x3 box
-    box_row = (row // 3) * 3
-    box_col = (col // 3) * 3
-    
-    for r in range(box_row, box_row + 3):
-        for c in range(box_col, box_col + 3):
-            if (r != row or c != col) and grid[r][c] == value:
-                return {
-                    "valid": False,
-                    "error": "box_conflict",
-                    "message": f"The number {value} already appears in this 3x3 box at ({r+1},{c+1})"
-                }
+    # Check if value already exists in the box
+    for r, c in shape.unit_cells("box", shape.box_of[(row, col)]):
+        if (r != row or c != col) and grid[r][c] == value:
+            return {
+                "valid": False,
+                "error": "box_conflict",
+                "message": f"The number {value} already appears in this {shape.box_label} box at ({r+1},{c+1})"
+            }
     
     return {
         "valid": True,
@@ -117,31 +88,15 @@ def suggest_next_move(grid: List[List[Optional[int]]]) -> Dict[str, Any]:
     Returns:
         Suggested move with educational explanation
     """
-    analysis = analyze_sudoku_grid.invoke({"grid": grid})
+    best_strategy = solve_paths.next_step(grid)
     
-    if not analysis["strategies_found"]:
+    if not best_strategy:
         return {
             "has_suggestion": False,
             "message": "No obvious moves found. Try looking for more advanced patterns."
         }
     
-    best_strategy = analysis["next_best_strategy"]
-    
-    explanation = ""
-    if best_strategy["type"] == "naked_single":
-        explanation = (
-            f"This is a 'Naked Single' - the easiest Sudoku technique. "
-            f"Cell ({best_strategy['row']+1},{best_strategy['col']+1}) can only contain "
-            f"the number {best_strategy['value']} because all other numbers (1-9) are "
-            f"already present in its row, column, or 3x3 box."
-        )
-    elif best_strategy["type"].startswith("hidden_single"):
-        explanation = (
-            f"This is a 'Hidden Single'. While other numbers might seem possible in "
-            f"cell ({best_strategy['row']+1},{best_strategy['col']+1}), the number "
-            f"{best_strategy['value']} can only go in this cell within its "
-            f"{'row' if 'row' in best_strategy['type'] else 'column' if 'column' in best_strategy['type'] else 'box'}."
-        )
+    explanation = explain_move(best_strategy, len(grid))
     
     return {
         "has_suggestion": True,
@@ -152,41 +107,97 @@ def suggest_next_move(grid: List[List[Optional[int]]]) -> Dict[str, Any]:
         "explanation": explanation
     }
 
+def _live_grid(state: Dict[str, Any]) -> Optional[List[List[Optional[int]]]]:
+    if state.get("sudoku_grid"):
+        return state["sudoku_grid"]
+    board = readable(state, "Current state of the Sudoku grid") or {}
+    return board.get("grid") if isinstance(board, dict) else None
+
+
+def _live_puzzle(state: Dict[str, Any], size: int) -> Optional[str]:
+    """The puzzle's starting numbers as a grid key (81 characters on a 9x9 grid), if the page sends them."""
+    board = readable(state, "Current state of the Sudoku grid") or {}
+    puzzle = board.get("puzzle") if isinstance(board, dict) else None
+    return puzzle if isinstance(puzzle, str) and is_grid_key(puzzle, size) else None
+
+
+def _last_move(state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    move = state.get("last_move") or readable(state, "Last number the user placed on the Sudoku grid")
+    if isinstance(move, dict) and move.get("value") and move.get("row") is not None and move.get("col") is not None:
+        return move
+    return None
+
+
 @tool
-def explain_sudoku_basics(step: str = "all") -> Dict[str, Any]:
+def get_next_solving_move(runtime: ToolRuntime, grid: Optional[List[List[Optional[int]]]] = None) -> Dict[str, Any]:
+    """
+    Get the next solving move for the board the user is looking at, ready to display.
+    Also checks the user's last placed number for conflicts. Use this for hints and
+    step-by-step solving instead of getCurrentGrid + suggest_next_move.
+    
+    Args:
+        grid: Only pass a grid to analyze a board other than the live one
+        
+    Returns:
+        has_wrong_move / wrong_move: the user's last number clashes with the
+            cells in wrong_move.highlight_cells (their cell yellow, clashes red)
+        has_suggestion / row / col / value / strategy / explanation / speech:
+            the next move; pass highlight_cells and explanation straight to
+            highlightCells and speech to speak_message
+    """
+    state = runtime.state or {}
+    live = not grid
+    grid = grid or _live_grid(state)
+    if not grid:
+        return {
+            "has_wrong_move": False,
+            "has_suggestion": False,
+            "message": "No grid loaded yet. Please start a game first."
+        }
+    puzzle = _live_puzzle(state, len(grid)) if live else None
+    
+    return get_hint(grid, puzzle, _last_move(state))
+
+_COUNT_WORDS = {4: "four", 6: "six", 8: "eight", 9: "nine", 12: "twelve", 16: "sixteen"}
+
+@tool
+def explain_sudoku_basics(step: str = "all", size: int = 9) -> Dict[str, Any]:
     """
     Explain the basic rules of Sudoku with visual highlighting guides.
     This tool provides step-by-step explanations with highlighting for:
-    - 3x3 boxes (each must have 1-9 with no repeats)
+    - 3x3 boxes (each must have 1-9 with no repeats; 2x2, 2x3, 4x4 on other sizes)
     - Rows (each must have 1-9 with no repeats)
     - Columns (each must have 1-9 with no repeats)
     
     Args:
         step: Which rule to explain ("box", "row", "column", or "all" for overview)
+        size: Grid size (4, 6, 9 or 16)
         
     Returns:
         Dictionary with explanation and cells to highlight
     """
+    shape = geometry(size)
+    box = f"{shape.box_rows}×{shape.box_cols}"
+    count = _COUNT_WORDS.get(size, str(size))
     
     if step == "box":
-        # Highlight the top-left 3x3 box as an example
+        # Highlight the top-left box as an example
         cells_to_highlight = []
-        for row in range(3):
-            for col in range(3):
-                cells_to_highlight.append({
-                    "row": row,
-                    "col": col,
-                    "type": "highlight",
-                    "color": "blue"
-                })
+        for row, col in shape.unit_cells("box", 0):
+            cells_to_highlight.append({
+                "row": row,
+                "col": col,
+                "type": "highlight",
+                "color": "blue"
+            })
         
         return {
             "step": "box",
             "cells": cells_to_highlight,
-            "message": "Each 3×3 box must contain numbers 1-9 with no repeats. I'm highlighting one box.",
+            "message": f"Each {box} box must contain numbers 1-{size} with no repeats. I'm highlighting one box.",
             "explanation": (
-                "**3×3 Box Rule**: The Sudoku grid is divided into nine 3×3 boxes. "
-                "Each box must contain all numbers from 1 to 9 exactly once. "
+                f"**{box} Box Rule**: The Sudoku grid is divided into {count} {box} boxes. "
+                f"Each box must contain all numbers from 1 to {size} exactly once. "
                 "No number can repeat within the same box."
             )
         }
@@ -194,7 +205,7 @@ def explain_sudoku_basics(step: str = "all") -> Dict[str, Any]:
     elif step == "row":
         # Highlight the first row as an example
         cells_to_highlight = []
-        for col in range(9):
+        for col in range(size):
             cells_to_highlight.append({
                 "row": 0,
                 "col": col,
@@ -205,17 +216,17 @@ def explain_sudoku_basics(step: str = "all") -> Dict[str, Any]:
         return {
             "step": "row",
             "cells": cells_to_highlight,
-            "message": "Each row must contain numbers 1-9 with no repeats. I'm highlighting one row.",
+            "message": f"Each row must contain numbers 1-{size} with no repeats. I'm highlighting one row.",
             "explanation": (
                 "**Row Rule**: Each horizontal row across the entire grid must contain "
-                "all numbers from 1 to 9 exactly once. No number can repeat within the same row."
+                f"all numbers from 1 to {size} exactly once. No number can repeat within the same row."
             )
         }
     
     elif step == "column":
         # Highlight the first column as an example
         cells_to_highlight = []
-        for row in range(9):
+        for row in range(size):
             cells_to_highlight.append({
                 "row": row,
                 "col": 0,
@@ -226,10 +237,10 @@ def explain_sudoku_basics(step: str = "all") -> Dict[str, Any]:
         return {
             "step": "column",
             "cells": cells_to_highlight,
-            "message": "Each column must contain numbers 1-9 with no repeats. I'm highlighting one column.",
+            "message": f"Each column must contain numbers 1-{size} with no repeats. I'm highlighting one column.",
             "explanation": (
                 "**Column Rule**: Each vertical column down the entire grid must contain "
-                "all numbers from 1 to 9 exactly once. No number can repeat within the same column."
+                f"all numbers from 1 to {size} exactly once. No number can repeat within the same column."
             )
         }
     
@@ -237,12 +248,12 @@ def explain_sudoku_basics(step: str = "all") -> Dict[str, Any]:
         return {
             "step": "overview",
             "cells": [],
-            "message": "Sudoku has three main rules: boxes, rows, and columns must each have 1-9 with no repeats.",
+            "message": f"Sudoku has three main rules: boxes, rows, and columns must each have 1-{size} with no repeats.",
             "explanation": (
                 "**Sudoku Basic Rules**:\n\n"
-                "1. **3×3 Boxes**: Each of the nine 3×3 boxes must contain numbers 1-9 (no repeats)\n"
-                "2. **Rows**: Each of the nine horizontal rows must contain numbers 1-9 (no repeats)\n"
-                "3. **Columns**: Each of the nine vertical columns must contain numbers 1-9 (no repeats)\n\n"
+                f"1. **{box} Boxes**: Each of the {count} {box} boxes must contain numbers 1-{size} (no repeats)\n"
+                f"2. **Rows**: Each of the {count} horizontal rows must contain numbers 1-{size} (no repeats)\n"
+                f"3. **Columns**: Each of the {count} vertical columns must contain numbers 1-{size} (no repeats)\n\n"
                 "When you place a number, it must satisfy ALL THREE rules at once!"
             )
         }
@@ -305,24 +316,13 @@ def get_possible_values(grid: List[List[Optional[int]]], row: int, col: int) ->
     if grid[row][col] is not None:
         return []
     
-    possible = set(range(1, 10))
-    
-    # Remove values in same row
-    for c in range(9):
-        if grid[row][c] is not None:
-            possible.discard(grid[row][c])
-    
-    # Remove values in same column
-    for r in range(9):
-        if grid[r][col] is not None:
-            possible.discard(grid[r][col])
+    shape = geometry(len(grid))
     
-    # Remove values in same 3x3 box
-    box_row = (row // 3) * 3
-    box_col = (col // 3) * 3
-    for r in range(box_row, box_row + 3):
-        for c in range(box_col, box_col + 3):
-            if grid[r][c] is not None:
-                possible.discard(grid[r][c])
+    # Remove values in the same row, column and box
+    used = 0
+    for r, c in shape.peers[(row, col)]:
+        value = grid[r][c]
+        if value:
+            used |= 1 << value
     
-    return sorted(list(possible))
+    return digits(shape.all_digits & ~used)
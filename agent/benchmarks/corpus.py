@@ -0,0 +1,47 @@
+"""
+Fixed puzzle and position corpus shared by the benchmarks.
+
+Sudoku puzzles are 81-character strings (0 = empty), rows top to bottom;
+use parse_grid() to get the List[List[Optional[int]]] form the tools take.
+Other board sizes use the same one-character-per-cell form, with A-G for
+10-16 on 16x16.
+"""
+
+from math import isqrt
+from typing import Dict, List, Optional
+
+SUDOKU_PUZZLES: Dict[str, str] = {
+    "easy": "530070000600195000098000060800060003400803001700020006060000280000419005000080079",
+    "medium": "000260701680070090190004500820100040004602900050003028009300074040050036703018000",
+    "hard": "000000907000420180000705026100904000050000040000507009920108000034059000507000000",
+    # A single given row: every empty cell has many candidates
+    "near_empty": "123456789" + "0" * 72,
+}
+
+# Other board sizes, each solvable with naked and hidden singles alone
+SUDOKU_SIZED_PUZZLES: Dict[str, str] = {
+    "4x4": "0140000100002004",
+    "6x6": "360000005300020100003004240000500001",
+    # 110 of 256 cells given
+    "16x16": (
+        "09D2060G1007008030A01E470F0000020000500C00D036000000000036AG10009D200000E005080B6A000400080090230000"
+        "F0CB0003600008009D200AG104750006AG0000500000A00040000CB9D000470080B9D230000E00B9D20600104050006AG004"
+        "75F00090G00005000000000A70F0C09000000104000D2360G1E075F8"
+    ),
+}
+
+CHESS_POSITIONS: Dict[str, str] = {
+    # Ruy Lopez after 3.Bb5
+    "opening": "r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+    # Queen's Gambit structure, both sides developed
+    "middlegame": "r2q1rk1/pp2bppp/2n1pn2/3p4/3P4/2NBPN2/PP3PPP/R2Q1RK1 w - - 0 10",
+    # Back-rank motif with rooks and pawns
+    "endgame": "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+}
+
+
+def parse_grid(puzzle: str) -> List[List[Optional[int]]]:
+    """Turn a puzzle string (81 characters for 9x9) into a square grid with None for blanks."""
+    size = isqrt(len(puzzle))
+    values = [int(ch, 36) or None for ch in puzzle]
+    return [values[row * size:(row + 1) * size] for row in range(size)]
@@ -0,0 +1,186 @@
+"""
+Scripted chat model for offline load tests.
+
+ScriptedChatModel stands in for the provider returned by get_llm_provider.
+It streams its reply token by token with a configurable time to first token
+and output rate, and picks the reply from the conversation the way the real
+tutor prompts ask the model to: Sudoku hints call get_next_solving_move,
+vs-AI chess turns call analyze_and_suggest_move, then both finish with
+frontend highlight/voice calls.
+"""
+
+import asyncio
+import json
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import (
+    BaseChatModel,
+    agenerate_from_stream,
+    generate_from_stream,
+)
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+_FEN = re.compile(r"FEN: (\S+ [wb] \S+ \S+ \d+ \d+)")
+
+
+def _call(name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    return {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:24]}", "type": "tool_call"}
+
+
+def _trailing_tool_results(messages: List[BaseMessage]) -> Dict[str, str]:
+    """Tool results since the last AI message that made tool calls."""
+    results = {}
+    for message in reversed(messages):
+        if not isinstance(message, ToolMessage):
+            break
+        results[message.name or ""] = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    return results
+
+
+def sudoku_script(messages: List[BaseMessage]) -> AIMessage:
+    last = messages[-1]
+    if isinstance(last, HumanMessage):
+        if "hint" in str(last.content).lower():
+            return AIMessage(content="", tool_calls=[_call("get_next_solving_move", {})])
+        return AIMessage(content=(
+            "Good question! Look at the row, column and box around an empty cell and "
+            "rule out every number already there. Ask me for a hint whenever you are stuck."
+        ))
+
+    results = _trailing_tool_results(messages)
+    if "get_next_solving_move" in results:
+        move = json.loads(results["get_next_solving_move"])
+        if move.get("has_wrong_move"):
+            wrong = move["wrong_move"]
+            return AIMessage(content="", tool_calls=[
+                _call("highlightCells", {"cells": wrong["highlight_cells"], "message": wrong["explanation"]}),
+                _call("speak_message", {"message": "That number clashes with the red cells. Try another one."}),
+            ])
+        if not move.get("has_suggestion"):
+            return AIMessage(content="I couldn't find an easy move here. Try looking for pairs!")
+        return AIMessage(content="", tool_calls=[
+            _call("highlightCells", {"cells": move["highlight_cells"], "message": move["explanation"]}),
+            _call("speak_message", {"message": move["speech"]}),
+        ])
+
+    return AIMessage(content="See the highlighted cell? Only one number fits there. Give it a try!")
+
+
+def chess_script(messages: List[BaseMessage]) -> AIMessage:
+    last = messages[-1]
+    if isinstance(last, HumanMessage):
+        found = _FEN.search(str(last.content))
+        if not found:
+            return AIMessage(content=(
+                "Control the center, develop your knights and bishops early, and castle "
+                "to keep your king safe. Want me to suggest a move?"
+            ))
+        fen = found.group(1)
+        return AIMessage(content="", tool_calls=[
+            _call("analyze_and_suggest_move", {"fen": fen, "skill_level": "advanced"}),
+        ])
+
+    results = _trailing_tool_results(messages)
+    if "analyze_and_suggest_move" in results:
+        result = json.loads(results["analyze_and_suggest_move"])
+        if not result.get("has_move"):
+            return AIMessage(content="The game is over - well played!")
+        return AIMessage(content="", tool_calls=[
+            _call("makeAIMove", {"move": result["move"]}),
+            _call("highlightSquares", {"squares": result["highlight_squares"], "message": "My move"}),
+            _call("speak_message", {"message": f"I play {result['san']} to improve my position."}),
+        ])
+
+    return AIMessage(content="Your turn! Think about which of my pieces is undefended.")
+
+
+def router_script(messages: List[BaseMessage]) -> AIMessage:
+    return AIMessage(content=(
+        "Both games build focus and planning. Sudoku is quicker to pick up, while chess "
+        "rewards long-term strategy. Which sounds more fun to you right now?"
+    ))
+
+
+SCRIPTS = {"router": router_script, "sudoku": sudoku_script, "chess": chess_script}
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Fake streaming chat model driven by a per-agent script."""
+
+    agent: str
+    ttft: float = 0.4
+    tokens_per_second: float = 60.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        self.calls += 1
+        return SCRIPTS[self.agent](messages)
+
+    def _chunks(self, reply: AIMessage) -> List[AIMessageChunk]:
+        words = reply.content.split(" ") if reply.content else []
+        chunks = [AIMessageChunk(content=(w if i == 0 else f" {w}")) for i, w in enumerate(words)]
+        # Tool call arguments stream as one final chunk
+        chunks.append(AIMessageChunk(
+            content="",
+            tool_call_chunks=[
+                {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                for i, c in enumerate(reply.tool_calls)
+            ],
+            usage_metadata={
+                "input_tokens": 3000,
+                "output_tokens": max(len(words), 1) + 40 * len(reply.tool_calls),
+                "total_tokens": 3000 + max(len(words), 1) + 40 * len(reply.tool_calls),
+            },
+            chunk_position="last",
+        ))
+        return chunks
+
+    def _delay(self, index: int, chunk: AIMessageChunk) -> float:
+        if index == 0:
+            return self.ttft
+        tokens = 1 + len(json.dumps([c.get("args") for c in chunk.tool_call_chunks])) // 4
+        return tokens / self.tokens_per_second
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        for index, chunk in enumerate(self._chunks(self._reply(messages))):
+            time.sleep(self._delay(index, chunk))
+            if run_manager and chunk.content:
+                run_manager.on_llm_new_token(chunk.content)
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        for index, chunk in enumerate(self._chunks(self._reply(messages))):
+            await asyncio.sleep(self._delay(index, chunk))
+            if run_manager and chunk.content:
+                await run_manager.on_llm_new_token(chunk.content)
+            yield ChatGenerationChunk(message=chunk)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return generate_from_stream(self._stream(messages, stop, run_manager, **kwargs))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return await agenerate_from_stream(self._astream(messages, stop, run_manager, **kwargs))
+
+
+def make_fake_provider(ttft: float, tokens_per_second: float, models: Optional[Dict[str, ScriptedChatModel]] = None):
+    """Build a drop-in replacement for llm_provider.get_llm_provider."""
+    models = models if models is not None else {}
+
+    def get_llm_provider(agent: Optional[str] = None) -> ScriptedChatModel:
+        name = agent or "router"
+        if name not in models:
+            models[name] = ScriptedChatModel(agent=name, ttft=ttft, tokens_per_second=tokens_per_second)
+        return models[name]
+
+    return get_llm_provider
@@ -0,0 +1,277 @@
+"""
+Micro-benchmarks for the Sudoku and Chess tool hot paths.
+
+Sudoku cases run over the easy/medium/hard/near-empty grids in
+benchmarks/corpus.py plus a 4x4, 6x6 and 16x16 puzzle:
+
+    sudoku.analyze_sudoku_grid    16x16 should stay within a few milliseconds
+    sudoku.validate_move          a value that passes every check
+    sudoku.get_possible_values
+    sudoku.solve_path_hint        a hint halfway along the solve path
+    sudoku.canonical_form         uncached
+
+Chess cases run over the opening/middlegame/endgame positions:
+
+    chess.analyze_position        tactical motifs included
+    chess.find_motifs             should stay well under a millisecond
+    chess.get_attacked_squares
+    chess.suggest_move            after the first call, a transposition-table hit
+    chess.search                  cold "advanced" search
+
+For each case it reports ops/sec (median of several timed rounds) and peak
+memory allocated per call.
+
+Throughput is also expressed relative to a fixed pure-Python calibration
+loop timed alongside each round, so a baseline recorded on one machine can
+gate a run on another (e.g. a laptop baseline checked in CI).
+
+Usage:
+    cd agent
+    uv run python benchmarks/hot_paths.py [--filter sudoku] [--min-time 0.2]
+    uv run python benchmarks/hot_paths.py --save-baseline benchmarks/hot_paths_baseline.json
+    uv run python benchmarks/hot_paths.py --baseline benchmarks/hot_paths_baseline.json --max-regression 0.2
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENT_DIR))
+
+from corpus import CHESS_POSITIONS, SUDOKU_PUZZLES, SUDOKU_SIZED_PUZZLES, parse_grid  # noqa: E402
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+def _first_empty(grid: List[List[Any]]) -> Tuple[int, int]:
+    size = len(grid)
+    return next((r, c) for r in range(size) for c in range(size) if grid[r][c] is None)
+
+
+def build_cases() -> List[Case]:
+    """Every (name, zero-argument callable) pair to benchmark."""
+    import chess
+    from agents.chess.motifs import find_motifs
+    from agents.chess.search import TranspositionTable, search
+    from agents.chess.strength import strength_for_level
+    from agents.chess.tools import analyzer
+    from agents.sudoku.canonical import canonical_form
+    from agents.sudoku.solve_path import SolvePath, grid_key, solve_paths
+    from agents.sudoku.tools import analyze_sudoku_grid, get_possible_values, validate_move
+
+    cases: List[Case] = []
+    for level, puzzle in {**SUDOKU_PUZZLES, **SUDOKU_SIZED_PUZZLES}.items():
+        grid = parse_grid(puzzle)
+        row, col = _first_empty(grid)
+        # A value that passes every check, so validate_move scans row, column and box
+        value = (get_possible_values(grid, row, col) or [1])[0]
+        cases += [
+            (f"sudoku.analyze_sudoku_grid[{level}]", lambda g=grid: analyze_sudoku_grid.func(g)),
+            (f"sudoku.validate_move[{level}]", lambda g=grid, r=row, c=col, v=value: validate_move.func(g, r, c, v)),
+            (f"sudoku.get_possible_values[{level}]", lambda g=grid, r=row, c=col: get_possible_values(g, r, c)),
+        ]
+        # A hint halfway along the puzzle's solve path, filled in path order
+        path = SolvePath(grid)
+        midway = [list(cells) for cells in grid]
+        for step in path.steps[:len(path.steps) // 2]:
+            midway[step["row"]][step["col"]] = step["value"]
+        cases.append((f"sudoku.solve_path_hint[{level}]",
+                      lambda g=midway, p=puzzle: solve_paths.next_step(g, p)))
+        # Uncached: the cost a puzzle nobody has loaded before pays once
+        cases.append((f"sudoku.canonical_form[{level}]",
+                      lambda k=grid_key(grid): canonical_form.__wrapped__(k)))
+
+    for phase, fen in CHESS_POSITIONS.items():
+        cases += [
+            (f"chess.analyze_position[{phase}]", lambda f=fen: analyzer.analyze_position(f)),
+            (f"chess.find_motifs[{phase}]", lambda b=chess.Board(fen): find_motifs(b)),
+            (f"chess.get_attacked_squares[{phase}]", lambda f=fen: analyzer.get_attacked_squares(f, "white")),
+            (f"chess.suggest_move[{phase}]", lambda f=fen: analyzer.suggest_move(f, "advanced")),
+            # An empty table each call: the cost of a position nobody has searched
+            (f"chess.search[{phase}]",
+             lambda f=fen: search(chess.Board(f), strength_for_level("advanced").limits, TranspositionTable())),
+        ]
+    return cases
+
+
+def _calibration_workload() -> int:
+    # Fixed mix of the operations the tools lean on: list/set building,
+    # nested indexing and small-int arithmetic
+    grid = [[(r * 9 + c) % 10 or None for c in range(9)] for r in range(9)]
+    total = 0
+    for r in range(9):
+        seen = {v for v in grid[r] if v is not None}
+        total += sum(v for v in range(1, 10) if v not in seen)
+    return total
+
+
+def _calls_per_round(func: Callable[[], Any], min_time: float) -> int:
+    """Number of calls that takes about min_time."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 4 or number >= 1 << 20:
+            break
+        number *= 2
+    return max(1, int(number * min_time / max(elapsed, 1e-9)))
+
+
+def _timed_round(func: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return number / (time.perf_counter() - start)
+
+
+def measure_speed(func: Callable[[], Any], min_time: float, rounds: int) -> Tuple[float, float]:
+    """
+    Time func in rounds interleaved with the calibration loop.
+
+    Returns:
+        (median ops/sec, median ops/sec relative to the calibration round
+        run just before it, which cancels out CPU frequency drift and noisy
+        neighbours)
+    """
+    # A first call that fills a lazy cache (e.g. planning a solve path) would
+    # otherwise size the rounds at a call or two and time mostly noise
+    func()
+    number = _calls_per_round(func, min_time)
+    calibration_number = _calls_per_round(_calibration_workload, min_time / 4)
+    speeds, relative = [], []
+    for _ in range(rounds):
+        calibration = _timed_round(_calibration_workload, calibration_number)
+        ops = _timed_round(func, number)
+        speeds.append(ops)
+        relative.append(ops / calibration)
+    return statistics.median(speeds), statistics.median(relative)
+
+
+def _peak_alloc_bytes(func: Callable[[], Any], calls: int = 20) -> int:
+    """Median peak traced memory of a single call."""
+    func()  # Keep lazy caches and interned strings out of the measurement
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            func()
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return int(statistics.median(peaks))
+
+
+def run(cases: List[Case], min_time: float, rounds: int) -> Dict[str, Any]:
+    # suggest_move picks among equally good moves at random
+    random.seed(0)
+    calibration, _ = measure_speed(_calibration_workload, min_time, rounds)
+    results = {}
+    for name, func in cases:
+        ops, relative = measure_speed(func, min_time, rounds)
+        results[name] = {
+            "ops_per_second": round(ops, 1),
+            "us_per_call": round(1e6 / ops, 2),
+            "relative_speed": round(relative, 5),
+            "alloc_bytes_per_call": _peak_alloc_bytes(func),
+        }
+    return {
+        "python": sys.version.split()[0],
+        "calibration_ops_per_second": round(calibration, 1),
+        "cases": results,
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """
+    Return a description of every case slower, or allocating more, than the
+    baseline by more than max_regression. Speed is compared relative to the
+    calibration loop so the two runs may come from different machines.
+    """
+    regressions = []
+    for name, new in result["cases"].items():
+        old = baseline.get("cases", {}).get(name)
+        if not old:
+            continue
+        if old.get("relative_speed"):
+            change = (old["relative_speed"] - new["relative_speed"]) / old["relative_speed"]
+            if change > max_regression:
+                regressions.append(f"{name} speed: {old['ops_per_second']} -> {new['ops_per_second']} ops/s "
+                                   f"({change:+.0%} worse after calibration)")
+        if old.get("alloc_bytes_per_call"):
+            change = (new["alloc_bytes_per_call"] - old["alloc_bytes_per_call"]) / old["alloc_bytes_per_call"]
+            if change > max_regression:
+                regressions.append(f"{name} allocations: {old['alloc_bytes_per_call']} -> "
+                                   f"{new['alloc_bytes_per_call']} bytes/call ({change:+.0%} worse)")
+    return regressions
+
+
+def _print_report(result: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    print(f"\nPython {result['python']}, calibration {result['calibration_ops_per_second']} ops/s\n")
+    print(f"   {'case':<42} {'ops/sec':>12} {'us/call':>10} {'alloc/call':>12} {'vs base':>8}")
+    for name, stats in result["cases"].items():
+        old = baseline.get("cases", {}).get(name, {})
+        delta = ""
+        if old.get("relative_speed"):
+            delta = f"{stats['relative_speed'] / old['relative_speed'] - 1:+.0%}"
+        print(f"   {name:<42} {stats['ops_per_second']:>12,.0f} {stats['us_per_call']:>10} "
+              f"{stats['alloc_bytes_per_call'] / 1024:>9.1f} KB {delta:>8}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed round")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per case")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Write results as the new baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="Fail if results regress against this file")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed relative regression per case (default 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    cases = [case for case in build_cases() if args.filter in case[0]]
+    if not cases:
+        print(f"[ERROR] No benchmark matches '{args.filter}'", file=sys.stderr)
+        return 1
+
+    baseline: Dict[str, Any] = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    result = run(cases, args.min_time, args.rounds)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _print_report(result, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare(result, baseline, args.max_regression)
+        if regressions:
+            print(f"\n[ERROR] Regressions beyond {args.max_regression:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"   {line}", file=sys.stderr)
+            return 1
+        print(f"\n[OK] No regressions beyond {args.max_regression:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
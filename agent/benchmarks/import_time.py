@@ -0,0 +1,128 @@
+"""
+Cold-start benchmark for the graphs registered in langgraph.json.
+
+Each graph is loaded in a fresh interpreter under `python -X importtime`,
+the same way the LangGraph server loads it (by file path), and the script
+reports wall time plus the slowest modules by cumulative import time.
+
+Usage:
+    cd agent
+    uv run python benchmarks/import_time.py [--runs 3] [--top 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+
+# Loads a graph module by path like langgraph-api does, then prints wall time
+_LOADER = """
+import importlib.util, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("graph_module", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+getattr(module, sys.argv[2])
+print(f"{(time.perf_counter() - start) * 1000:.1f}")
+"""
+
+
+def load_graphs() -> Dict[str, Tuple[str, str]]:
+    """Read graph name -> (file path, attribute) from langgraph.json."""
+    with open(AGENT_DIR / "langgraph.json") as f:
+        config = json.load(f)
+
+    graphs = {}
+    for name, target in config["graphs"].items():
+        path, attribute = target.split(":")
+        graphs[name] = (str((AGENT_DIR / path).resolve()), attribute)
+    return graphs
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """Parse `-X importtime` output into (module, cumulative microseconds)."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(cumulative)))
+    return modules
+
+
+def measure(path: str, attribute: str) -> Tuple[float, List[Tuple[str, int]]]:
+    """Load one graph in a fresh interpreter; return wall ms and module timings."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(AGENT_DIR)
+    # Model clients validate credentials at construction; a placeholder is enough
+    env.setdefault("OPENAI_API_KEY", "benchmark-placeholder")
+    env.setdefault("ANTHROPIC_API_KEY", "benchmark-placeholder")
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _LOADER, path, attribute],
+        cwd=AGENT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to load {path}:\n{result.stderr[-2000:]}")
+
+    wall_ms = float(result.stdout.strip().splitlines()[-1])
+    return wall_ms, parse_importtime(result.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per graph")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results = {}
+    for name, (path, attribute) in load_graphs().items():
+        walls = []
+        modules: List[Tuple[str, int]] = []
+        for _ in range(args.runs):
+            wall_ms, modules = measure(path, attribute)
+            walls.append(wall_ms)
+
+        local_modules = sorted(
+            (m for m in modules if m[0].split(".")[0] in ("agents", "shared", "llm_provider", "main")),
+            key=lambda m: m[1],
+            reverse=True,
+        )
+        results[name] = {
+            "median_ms": round(statistics.median(walls), 1),
+            "min_ms": round(min(walls), 1),
+            "modules_imported": len(modules),
+            "slowest": [
+                {"module": m, "cumulative_ms": round(us / 1000, 1)}
+                for m, us in sorted(modules, key=lambda m: m[1], reverse=True)[:args.top]
+            ],
+            "local_modules": [
+                {"module": m, "cumulative_ms": round(us / 1000, 1)}
+                for m, us in local_modules[:args.top]
+            ],
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    for name, result in results.items():
+        print(f"\n{name}: median {result['median_ms']} ms, min {result['min_ms']} ms, "
+              f"{result['modules_imported']} modules")
+        for entry in result["local_modules"]:
+            print(f"   {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,527 @@
+"""
+Offline load test for router_agent, sudoku_agent and chess_agent.
+
+The graphs are loaded from langgraph.json exactly as the server loads them,
+but get_llm_provider is swapped for a scripted streaming fake model
+(benchmarks/fake_llm.py) and ElevenLabs for a local stub server
+(benchmarks/tts_stub.py). Simulated sessions play the frontend's part:
+they run the frontend tools the agent calls (speak_message goes through
+TTSService to the stub, makeAIMove updates the board) and send the results
+back, turn after turn.
+
+Scenarios: Sudoku basics lesson, Sudoku hints, Chess basics lesson, games
+against the chess AI, and home-page chat. Reports throughput, p50/p95/p99
+turn latency, LLM calls per turn and memory per concurrent session, and can
+fail when results regress against a saved baseline.
+
+By default each session carries its own history, as the frontend does with
+no server-side persistence. With --checkpointer the graphs run on
+shared/checkpointer.py's SQLiteCheckpointer instead, and each session sends
+only its new messages under its own thread_id.
+
+Usage:
+    cd agent
+    uv run python benchmarks/load_test.py [--sessions 2000] [--concurrency 1000]
+    uv run python benchmarks/load_test.py --checkpointer /tmp/load_test.sqlite
+    uv run python benchmarks/load_test.py --save-baseline benchmarks/load_baseline.json
+    uv run python benchmarks/load_test.py --baseline benchmarks/load_baseline.json --max-regression 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import json
+import os
+import pickle
+import random
+import resource
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENT_DIR))
+
+from corpus import SUDOKU_PUZZLES, parse_grid  # noqa: E402
+from fake_llm import ScriptedChatModel, make_fake_provider  # noqa: E402
+from import_time import load_graphs  # noqa: E402
+from tts_stub import start_tts_stub  # noqa: E402
+
+GRAPHS = ("router_agent", "sudoku_agent", "chess_agent")
+
+SUDOKU_ACTIONS = [
+    "startTeaching", "updateTeachingStep", "endTeaching", "highlightCells", "speak_message",
+    "clearHighlights", "getCurrentGrid", "fillCell",
+]
+CHESS_ACTIONS = [
+    "startTeaching", "updateTeachingStep", "endTeaching", "highlightSquares", "speak_message",
+    "clearHighlights", "makeAIMove",
+]
+
+# Scenario -> share of sessions
+DEFAULT_MIX = {
+    "sudoku_lesson": 0.2,
+    "sudoku_hints": 0.25,
+    "chess_lesson": 0.1,
+    "chess_vs_ai": 0.25,
+    "router_chat": 0.2,
+}
+
+# State fields carried between turns when no checkpointer does it
+_CARRIED_STATE = (
+    "teaching_active", "teaching_topic", "teaching_current_step", "teaching_total_steps",
+    "current_game",
+)
+
+# Compared against the baseline: metric -> True if higher is better
+_GATED = {
+    "turns_per_second": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "memory_per_session_kb": False,
+}
+
+
+def _actions(names: List[str]) -> List[Dict[str, Any]]:
+    return [
+        {"type": "function", "function": {
+            "name": name, "description": name, "parameters": {"type": "object", "properties": {}},
+        }}
+        for name in names
+    ]
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak, not current, RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def load_agent_graphs() -> Dict[str, Any]:
+    """Import each graph module by file path, as langgraph-api does."""
+    graphs = {}
+    for name, (path, attribute) in load_graphs().items():
+        if name not in GRAPHS:
+            continue
+        spec = importlib.util.spec_from_file_location(f"load_test_{name}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        graphs[name] = getattr(module, attribute)
+    return graphs
+
+
+class Session:
+    """One simulated browser tab talking to one graph."""
+
+    def __init__(self, graph: Any, actions: List[str], tts_executor: ThreadPoolExecutor, tts_service: Any,
+                 checkpointed: bool = False):
+        self.graph = graph
+        self.checkpointed = checkpointed
+        self.config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        self.actions = _actions(actions)
+        self.tts_executor = tts_executor
+        self.tts_service = tts_service
+        self.messages: List[Any] = []
+        # Tool results not yet sent when a turn hit its round limit
+        self.unsent: List[Any] = []
+        self.state: Dict[str, Any] = {}
+        self.grid = None
+        self.puzzle = ""
+        self.board = None
+        self.tts_calls = 0
+
+    async def turn(self, text: str) -> float:
+        """Send a user message and run frontend tools until the agent replies with text."""
+        from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+        start = time.perf_counter()
+        new_messages: List[Any] = self.unsent + [HumanMessage(content=text)]
+        self.unsent = []
+
+        for _ in range(8):
+            if self.checkpointed:
+                # The checkpointer holds the history and state; send only what's new
+                result = await self.graph.ainvoke({
+                    "messages": new_messages,
+                    "copilotkit": {"actions": self.actions, "context": self._context()},
+                }, self.config)
+            else:
+                result = await self.graph.ainvoke({
+                    "messages": self.messages + new_messages,
+                    "copilotkit": {"actions": self.actions, "context": self._context()},
+                    **self.state,
+                })
+                self.state = {k: result[k] for k in _CARRIED_STATE if k in result}
+            self.messages = result["messages"]
+
+            last = self.messages[-1]
+            if not isinstance(last, AIMessage) or not last.tool_calls:
+                break
+            new_messages = []
+            for call in last.tool_calls:
+                content = await self._run_frontend_tool(call["name"], call.get("args") or {})
+                new_messages.append(ToolMessage(content=content, tool_call_id=call["id"], name=call["name"]))
+        else:
+            self.unsent = new_messages
+
+        return time.perf_counter() - start
+
+    def _context(self) -> List[Dict[str, Any]]:
+        """The useCopilotReadable entries the page would send."""
+        if self.grid is None:
+            return []
+        return [{"description": "Current state of the Sudoku grid",
+                 "value": json.dumps({"grid": self.grid, "puzzle": self.puzzle})}]
+
+    async def _run_frontend_tool(self, name: str, args: Dict[str, Any]) -> str:
+        if name == "speak_message":
+            self.tts_calls += 1
+            loop = asyncio.get_running_loop()
+            audio = await loop.run_in_executor(
+                self.tts_executor, self.tts_service.generate_speech, args.get("message", ""),
+            )
+            return json.dumps({"success": audio is not None})
+        if name == "getCurrentGrid":
+            return json.dumps({"grid": self.grid})
+        if name == "makeAIMove" and self.board is not None:
+            import chess
+
+            move = chess.Move.from_uci(args["move"])
+            if move in self.board.legal_moves:
+                self.board.push(move)
+                return json.dumps({"success": True, "fen": self.board.fen()})
+            return json.dumps({"success": False, "error": "Illegal move"})
+        return json.dumps({"success": True})
+
+    def last_tool_result(self, name: str) -> Optional[Dict[str, Any]]:
+        for message in reversed(self.messages):
+            if getattr(message, "name", None) == name and message.type == "tool":
+                try:
+                    return json.loads(message.content)
+                except ValueError:
+                    return None
+        return None
+
+
+async def sudoku_lesson(session: Session, rng: random.Random) -> List[float]:
+    from agents.sudoku.lessons import SUDOKU_BASICS_LESSON
+
+    times = [await session.turn("Explain basics")]
+    for _ in range(SUDOKU_BASICS_LESSON.total_steps - 1):
+        times.append(await session.turn("Continue to the next step"))
+    return times
+
+
+async def sudoku_hints(session: Session, rng: random.Random) -> List[float]:
+    from agents.sudoku.hints import prefetch_hint
+
+    session.puzzle = SUDOKU_PUZZLES[rng.choice(["easy", "medium", "hard"])]
+    session.grid = parse_grid(session.puzzle)
+    times = []
+    for _ in range(3):
+        times.append(await session.turn("Give me a hint"))
+        move = session.last_tool_result("get_next_solving_move")
+        if move and move.get("has_suggestion"):
+            # The player follows the hint, and the page pings /learnplay/sudoku/prefetch
+            session.grid[move["row"]][move["col"]] = move["value"]
+            prefetch_hint(session.grid, session.puzzle, {k: move[k] for k in ("row", "col", "value")})
+    return times
+
+
+async def chess_lesson(session: Session, rng: random.Random) -> List[float]:
+    from agents.chess.lessons import CHESS_BASICS_LESSON
+
+    times = [await session.turn("Learn chess basics")]
+    for _ in range(CHESS_BASICS_LESSON.total_steps - 1):
+        times.append(await session.turn("Continue to the next step"))
+    return times
+
+
+async def chess_vs_ai(session: Session, rng: random.Random) -> List[float]:
+    import chess
+
+    session.board = chess.Board()
+    times = []
+    for _ in range(4):
+        if session.board.is_game_over():
+            break
+        session.board.push(rng.choice(list(session.board.legal_moves)))
+        if session.board.is_game_over():
+            break
+        times.append(await session.turn(
+            f"Make your move as my opponent. FEN: {session.board.fen()}"
+        ))
+    return times
+
+
+async def router_chat(session: Session, rng: random.Random) -> List[float]:
+    return [
+        await session.turn("Hello!"),
+        await session.turn("Which game is easier?"),
+        await session.turn("I get bored easily, what would keep me engaged?"),
+    ]
+
+
+SCENARIOS = {
+    "sudoku_lesson": ("sudoku_agent", SUDOKU_ACTIONS, sudoku_lesson),
+    "sudoku_hints": ("sudoku_agent", SUDOKU_ACTIONS, sudoku_hints),
+    "chess_lesson": ("chess_agent", CHESS_ACTIONS, chess_lesson),
+    "chess_vs_ai": ("chess_agent", CHESS_ACTIONS, chess_vs_ai),
+    "router_chat": ("router_agent", [], router_chat),
+}
+
+
+def _assign_scenarios(sessions: int, mix: Dict[str, float], rng: random.Random) -> List[str]:
+    names = list(mix)
+    return rng.choices(names, weights=[mix[n] for n in names], k=sessions)
+
+
+async def run_load(
+    graphs: Dict[str, Any],
+    sessions: int,
+    concurrency: int,
+    mix: Dict[str, float],
+    seed: int,
+    tts_executor: ThreadPoolExecutor,
+    tts_service: Any,
+    checkpointed: bool = False,
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    plan = _assign_scenarios(sessions, mix, rng)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: Dict[str, List[float]] = {name: [] for name in SCENARIOS}
+    failures: Dict[str, int] = {name: 0 for name in SCENARIOS}
+    state_bytes: List[int] = []
+    tts_calls = 0
+
+    peak_rss = _rss_bytes()
+    sampling = True
+
+    async def sample_memory() -> None:
+        nonlocal peak_rss
+        while sampling:
+            peak_rss = max(peak_rss, _rss_bytes())
+            await asyncio.sleep(0.05)
+
+    async def run_session(index: int, scenario: str) -> None:
+        nonlocal tts_calls
+        graph_name, actions, script = SCENARIOS[scenario]
+        async with semaphore:
+            session = Session(graphs[graph_name], actions, tts_executor, tts_service, checkpointed)
+            try:
+                latencies[scenario].extend(await script(session, random.Random(seed + index)))
+            except Exception as e:
+                failures[scenario] += 1
+                if failures[scenario] == 1:
+                    print(f"[ERROR] {scenario} session failed: {e!r}", file=sys.stderr)
+            tts_calls += session.tts_calls
+            state_bytes.append(len(pickle.dumps(session.messages)))
+
+    sampler = asyncio.create_task(sample_memory())
+    start = time.perf_counter()
+    await asyncio.gather(*(run_session(i, s) for i, s in enumerate(plan)))
+    wall = time.perf_counter() - start
+    sampling = False
+    await sampler
+
+    return {
+        "wall": wall,
+        "latencies": latencies,
+        "failures": failures,
+        "state_bytes": state_bytes,
+        "tts_calls": tts_calls,
+        "peak_rss": peak_rss,
+    }
+
+
+def summarize(
+    run: Dict[str, Any],
+    sessions: int,
+    concurrency: int,
+    baseline_rss: int,
+    llm_calls: int,
+    checkpoint_bytes: Optional[int] = None,
+) -> Dict[str, Any]:
+    all_latencies = [t for times in run["latencies"].values() for t in times]
+    turns = len(all_latencies)
+    active = min(concurrency, sessions)
+
+    def stats(values: List[float]) -> Dict[str, Any]:
+        return {
+            "turns": len(values),
+            "p50_ms": round(_percentile(values, 0.50) * 1000, 1),
+            "p95_ms": round(_percentile(values, 0.95) * 1000, 1),
+            "p99_ms": round(_percentile(values, 0.99) * 1000, 1),
+        }
+
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "wall_seconds": round(run["wall"], 2),
+        "turns": turns,
+        "turns_per_second": round(turns / run["wall"], 1) if run["wall"] else 0.0,
+        "sessions_per_second": round(sessions / run["wall"], 1) if run["wall"] else 0.0,
+        **{k: v for k, v in stats(all_latencies).items() if k != "turns"},
+        "llm_calls_per_turn": round(llm_calls / turns, 2) if turns else 0.0,
+        "tts_calls": run["tts_calls"],
+        "failed_sessions": sum(run["failures"].values()),
+        "memory_per_session_kb": round(max(0, run["peak_rss"] - baseline_rss) / active / 1024, 1),
+        "state_per_session_kb": round(statistics.mean(run["state_bytes"]) / 1024, 1) if run["state_bytes"] else 0.0,
+        "checkpoint_db_per_session_kb": (
+            round(checkpoint_bytes / sessions / 1024, 1) if checkpoint_bytes is not None else None
+        ),
+        "scenarios": {name: stats(values) for name, values in run["latencies"].items() if values},
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Return a description of every gated metric worse than baseline by more than max_regression."""
+    regressions = []
+    for metric, higher_is_better in _GATED.items():
+        old, new = baseline.get(metric), result.get(metric)
+        if not old or new is None:
+            continue
+        change = (old - new) / old if higher_is_better else (new - old) / old
+        if change > max_regression:
+            regressions.append(f"{metric}: {old} -> {new} ({change:+.0%} worse)")
+    return regressions
+
+
+def _print_report(result: Dict[str, Any]) -> None:
+    print(f"\n{result['sessions']} sessions, {result['concurrency']} concurrent, "
+          f"{result['turns']} turns in {result['wall_seconds']} s")
+    print(f"   throughput: {result['turns_per_second']} turns/s, {result['sessions_per_second']} sessions/s")
+    print(f"   turn latency: p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, p99 {result['p99_ms']} ms")
+    print(f"   LLM calls per turn: {result['llm_calls_per_turn']}, TTS calls: {result['tts_calls']}")
+    print(f"   memory per session: {result['memory_per_session_kb']} KB "
+          f"(conversation state {result['state_per_session_kb']} KB)")
+    if result["checkpoint_db_per_session_kb"] is not None:
+        print(f"   checkpoint database: {result['checkpoint_db_per_session_kb']} KB per session")
+    if result["failed_sessions"]:
+        print(f"   [ERROR] failed sessions: {result['failed_sessions']}")
+    for name, stats in result["scenarios"].items():
+        print(f"   {name:>14}: {stats['turns']:>6} turns  p50 {stats['p50_ms']:>8} ms  "
+              f"p95 {stats['p95_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=2000, help="Simulated sessions to run")
+    parser.add_argument("--concurrency", type=int, default=1000, help="Sessions active at once")
+    parser.add_argument("--ttft", type=float, default=0.4, help="Fake LLM time to first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="Fake LLM output rate")
+    parser.add_argument("--tts-latency", type=float, default=0.15, help="TTS stub base latency (s)")
+    parser.add_argument("--tts-workers", type=int, default=64, help="Threads for TTS requests")
+    parser.add_argument("--checkpointer", metavar="FILE",
+                        help="Persist sessions with the SQLite checkpointer in this (fresh) database")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    parser.add_argument("--verbose", action="store_true", help="Keep the agents' console output")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Write results as the new baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="Fail if results regress against this file")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed relative regression per gated metric (default 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    stub, stub_url = start_tts_stub(latency=args.tts_latency)
+    os.environ.update({
+        "TTS_PROVIDER": "elevenlabs",
+        "ELEVENLABS_API_KEY": "load-test-stub",
+        "ELEVENLABS_BASE_URL": stub_url,
+    })
+    # Model clients validate credentials at construction; a placeholder is enough
+    os.environ.setdefault("OPENAI_API_KEY", "load-test-placeholder")
+
+    import llm_provider
+    from shared.tts_service import get_tts_service
+
+    models: Dict[str, ScriptedChatModel] = {}
+    llm_provider.get_llm_provider = make_fake_provider(args.ttft, args.tokens_per_second, models)
+
+    saver = None
+    if args.checkpointer:
+        from shared.checkpointer import SQLiteCheckpointer
+
+        for suffix in ("", "-wal", "-shm"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(args.checkpointer + suffix)
+        saver = SQLiteCheckpointer(args.checkpointer)
+
+    output = sys.stdout if args.verbose else open(os.devnull, "w")
+    tts_executor = ThreadPoolExecutor(max_workers=args.tts_workers)
+    checkpoint_bytes = None
+    try:
+        with contextlib.redirect_stdout(output):
+            graphs = load_agent_graphs()
+            if saver:
+                graphs = {name: graph.copy(update={"checkpointer": saver}) for name, graph in graphs.items()}
+            tts_service = get_tts_service()
+
+            # Warm-up: one session per scenario, so lazy imports and caches
+            # are not counted as per-session memory
+            asyncio.run(run_load(graphs, len(SCENARIOS), len(SCENARIOS),
+                                 {name: 1.0 for name in SCENARIOS}, args.seed,
+                                 tts_executor, tts_service, saver is not None))
+            baseline_rss = _rss_bytes()
+            calls_before = sum(model.calls for model in models.values())
+
+            run = asyncio.run(run_load(graphs, args.sessions, args.concurrency, DEFAULT_MIX,
+                                       args.seed, tts_executor, tts_service, saver is not None))
+            llm_calls = sum(model.calls for model in models.values()) - calls_before
+    finally:
+        tts_executor.shutdown(wait=False)
+        stub.shutdown()
+        if saver:
+            saver.close()
+            checkpoint_bytes = sum(
+                os.path.getsize(args.checkpointer + suffix)
+                for suffix in ("", "-wal") if os.path.exists(args.checkpointer + suffix)
+            )
+
+    result = summarize(run, args.sessions, args.concurrency, baseline_rss, llm_calls, checkpoint_bytes)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        _print_report(result)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if result["failed_sessions"]:
+        return 1
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\n[ERROR] Regressions beyond {args.max_regression:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"   {line}", file=sys.stderr)
+            return 1
+        print(f"\n[OK] No regressions beyond {args.max_regression:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
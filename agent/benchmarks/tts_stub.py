@@ -0,0 +1,85 @@
+"""
+Local stand-in for the ElevenLabs text-to-speech API.
+
+Answers POST /v1/text-to-speech/<voice_id> with silent MP3-sized bytes after
+a delay that grows with the text, so TTS load can be tested without an API
+key or network access. Point the agent at it with:
+
+    ELEVENLABS_BASE_URL=http://127.0.0.1:8765/v1 ELEVENLABS_API_KEY=stub
+
+Usage:
+    cd agent
+    uv run python benchmarks/tts_stub.py [--port 8765] [--latency 0.15]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+# 128 kbps MP3 is about 16 KB per second of speech; speech runs ~15 chars/sec
+_BYTES_PER_CHAR = 16000 // 15
+
+
+class _Handler(BaseHTTPRequestHandler):
+    latency = 0.15
+    seconds_per_char = 0.002
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            text = json.loads(self.rfile.read(length) or b"{}").get("text", "")
+        except ValueError:
+            text = ""
+
+        if not self.path.startswith("/v1/text-to-speech/") or not text:
+            self.send_response(400)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        time.sleep(self.latency + self.seconds_per_char * len(text))
+        body = b"\xff\xfb" + b"\x00" * (_BYTES_PER_CHAR * len(text))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def start_tts_stub(port: int = 0, latency: float = 0.15) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the stub in a background thread.
+
+    Returns:
+        (server, base URL for ELEVENLABS_BASE_URL); call server.shutdown() to stop
+    """
+    handler = type("TTSStubHandler", (_Handler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.15, help="Seconds before audio is returned")
+    args = parser.parse_args()
+
+    server, url = start_tts_stub(args.port, args.latency)
+    print(f"TTS stub listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,213 @@
 """
 Multi-LLM provider support for the agent.
 Supports OpenAI, Azure OpenAI, Anthropic, and Ollama.
+
+Chat model clients are kept in a registry keyed by their resolved config,
+so graphs asking for the same model share one client, and all OpenAI-style
+clients share one tuned HTTP connection pool.
 """
 
 import os
-from typing import Any, Dict
-from langchain_openai import ChatOpenAI, AzureChatOpenAI
-from langchain_anthropic import ChatAnthropic
+import threading
+from typing import Any, Dict, Optional, Tuple
+from shared.env import load_env
+
+# Provider -> (env var holding the model name, default model)
+_MODEL_SETTINGS = {
+    "openai": ("OPENAI_MODEL", "gpt-4o-mini"),  # Faster default
+    "azure-openai": ("AZURE_OPENAI_DEPLOYMENT", None),
+    "anthropic": ("ANTHROPIC_MODEL", "claude-3-5-sonnet-20241022"),
+    "ollama": ("OLLAMA_MODEL", "llama3.1:8b"),
+}
+
+# Memoized chat model clients, keyed by resolved config
+_clients: Dict[Tuple, Any] = {}
+_clients_lock = threading.Lock()
+
+# Shared HTTP clients for OpenAI-compatible providers
+_http_clients: Optional[Tuple[Any, Any]] = None
 
-def get_llm_provider():
+
+def _get_callbacks(config: Dict[str, Any]):
     """
-    Get the configured LLM provider based on environment variables.
-    Optimized for low latency and good teaching quality.
+    Callbacks attached to every chat model.
+    Records latency and token metrics, and with TTS_STREAMING enabled, speaks
+    assistant text sentence by sentence while it streams instead of after the
+    whole reply is done.
+    """
+    from shared.metrics import get_llm_metrics_handler
+    from shared.tts_pipeline import StreamingSpeechHandler, is_streaming_tts_enabled
+
+    callbacks = []
+    metrics_handler = get_llm_metrics_handler(config["provider"], config["model"])
+    if metrics_handler is not None:
+        callbacks.append(metrics_handler)
+    if is_streaming_tts_enabled():
+        callbacks.append(StreamingSpeechHandler())
+    return callbacks or None
+
+
+def _agent_env(agent: Optional[str], name: str) -> Optional[str]:
+    """Read a per-agent override such as ROUTER_LLM_MODEL."""
+    if not agent:
+        return None
+    return os.getenv(f"{agent.upper()}_{name}") or None
+
+
+def _get_http_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60")),
+    )
+
+
+def get_http_clients() -> Tuple[Any, Any]:
+    """
+    Get the (sync, async) httpx clients shared by every OpenAI-style model.
+    One keep-alive pool serves all graphs in the worker.
+    """
+    global _http_clients
+    if _http_clients is None:
+        import httpx
+
+        limits = _get_http_limits()
+        timeout = httpx.Timeout(float(os.getenv("LLM_TIMEOUT", "60")), connect=10.0)
+        _http_clients = (
+            httpx.Client(limits=limits, timeout=timeout),
+            httpx.AsyncClient(limits=limits, timeout=timeout),
+        )
+    return _http_clients
+
+
+def resolve_llm_config(agent: Optional[str] = None) -> Dict[str, Any]:
     """
-    provider = os.getenv("LLM_PROVIDER", "openai").lower()
-    
+    Resolve the model configuration for an agent.
+
+    Every setting can be overridden per agent with an env var prefixed by the
+    agent name, e.g. ROUTER_LLM_MODEL=gpt-4o-mini or CHESS_LLM_PROVIDER=anthropic.
+
+    Args:
+        agent: Agent name ("router", "sudoku", "chess") or None for defaults
+
+    Returns:
+        Dictionary with provider, model, temperature, max_tokens and endpoint
+    """
+    load_env()
+    provider = (_agent_env(agent, "LLM_PROVIDER") or os.getenv("LLM_PROVIDER", "openai")).lower()
+
+    if provider not in _MODEL_SETTINGS:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+
+    model_env, default_model = _MODEL_SETTINGS[provider]
+
+    endpoint = None
+    if provider == "azure-openai":
+        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+    elif provider == "ollama":
+        endpoint = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+
     # Lower temperature for more consistent teaching responses
-    # Default to gpt-4o-mini for faster responses
-    default_temperature = float(os.getenv("LLM_TEMPERATURE", "0.3"))
-    
+    return {
+        "provider": provider,
+        "model": _agent_env(agent, "LLM_MODEL") or os.getenv(model_env, default_model),
+        "temperature": float(_agent_env(agent, "LLM_TEMPERATURE") or os.getenv("LLM_TEMPERATURE", "0.3")),
+        "max_tokens": int(_agent_env(agent, "LLM_MAX_TOKENS") or os.getenv("LLM_MAX_TOKENS", "1000")),
+        "endpoint": endpoint,
+    }
+
+
+def _create_client(config: Dict[str, Any]):
+    """Build a chat model client; provider SDKs are imported only when selected."""
+    provider = config["provider"]
+    callbacks = _get_callbacks(config)
+
     if provider == "openai":
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # Faster default
+        from langchain_openai import ChatOpenAI
+        http_client, http_async_client = get_http_clients()
         return ChatOpenAI(
-            model=model,
-            temperature=default_temperature,
-            max_tokens=int(os.getenv("LLM_MAX_TOKENS", "1000")),  # Limit for speed
+            model=config["model"],
+            temperature=config["temperature"],
+            max_tokens=config["max_tokens"],  # Limit for speed
             streaming=True,  # Enable streaming for perceived speed
+            stream_usage=True,  # Token usage (incl. cached tokens) on streamed replies
+            callbacks=callbacks,
+            http_client=http_client,
+            http_async_client=http_async_client,
         )
-    
+
     elif provider == "azure-openai":
+        from langchain_openai import AzureChatOpenAI
+        http_client, http_async_client = get_http_clients()
         return AzureChatOpenAI(
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT"),
+            azure_endpoint=config["endpoint"],
+            azure_deployment=config["model"],
             api_version="2024-02-15-preview",
-            temperature=default_temperature,
-            max_tokens=int(os.getenv("LLM_MAX_TOKENS", "1000")),
+            temperature=config["temperature"],
+            max_tokens=config["max_tokens"],
             streaming=True,
+            callbacks=callbacks,
+            http_client=http_client,
+            http_async_client=http_async_client,
         )
-    
+
     elif provider == "anthropic":
+        # langchain-anthropic already shares one cached httpx pool per base URL
+        from langchain_anthropic import ChatAnthropic
         return ChatAnthropic(
-            model=os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-20241022"),
-            temperature=default_temperature,
-            max_tokens=int(os.getenv("LLM_MAX_TOKENS", "1000")),
+            model=config["model"],
+            temperature=config["temperature"],
+            max_tokens=config["max_tokens"],
+            streaming=True,
+            callbacks=callbacks,
         )
-    
+
     elif provider == "ollama":
         from langchain_ollama import ChatOllama
         return ChatOllama(
-            base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
-            model=os.getenv("OLLAMA_MODEL", "llama3.1:8b"),
-            temperature=default_temperature,
+            base_url=config["endpoint"],
+            model=config["model"],
+            temperature=config["temperature"],
+            callbacks=callbacks,
+            client_kwargs={"limits": _get_http_limits()},
         )
-    
+
     else:
         raise ValueError(f"Unsupported LLM provider: {provider}")
 
-def get_provider_info() -> Dict[str, Any]:
+
+def get_llm_provider(agent: Optional[str] = None):
+    """
+    Get the chat model for an agent based on environment variables.
+    Optimized for low latency and good teaching quality.
+
+    Clients are memoized by resolved config, so agents using the same model
+    share a single instance (and connection pool) for the life of the worker.
+
+    Args:
+        agent: Agent name ("router", "sudoku", "chess") for per-agent overrides
+    """
+    config = resolve_llm_config(agent)
+    key = tuple(sorted(config.items()))
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _create_client(config)
+            _clients[key] = client
+    return client
+
+
+def get_provider_info(agent: Optional[str] = None) -> Dict[str, Any]:
     """
     Get information about the current LLM provider configuration.
     """
-    provider = os.getenv("LLM_PROVIDER", "openai").lower()
-    
-    info = {
-        "provider": provider,
-        "model": None,
-        "endpoint": None
+    config = resolve_llm_config(agent)
+
+    return {
+        "provider": config["provider"],
+        "model": config["model"],
+        "endpoint": config["endpoint"],
     }
-    
-    if provider == "openai":
-        info["model"] = os.getenv("OPENAI_MODEL", "gpt-4o")
-    elif provider == "azure-openai":
-        info["model"] = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-        info["endpoint"] = os.getenv("AZURE_OPENAI_ENDPOINT")
-    elif provider == "anthropic":
-        info["model"] = os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-20241022")
-    elif provider == "ollama":
-        info["model"] = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
-        info["endpoint"] = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    
-    return info
@@ -1,7 +1,20 @@
 """Shared tools and utilities for all game agents."""
 
-from .voice_tools import speak_message
-from .tts_service import tts_service
-from .base_state import BaseTeachingState
+from importlib import import_module
 
-__all__ = ["speak_message", "tts_service", "BaseTeachingState"]
+# Exports are resolved on first access so importing a submodule such as
+# shared.base_state does not pull in the tool and TTS stacks.
+_EXPORTS = {
+    "speak_message": ".voice_tools",
+    "get_tts_service": ".tts_service",
+    "tts_service": ".tts_service",
+    "BaseTeachingState": ".base_state",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
@@ -1,6 +1,7 @@
 """Base state schema for all teaching agents."""
 
-from typing import Optional, List
+import json
+from typing import Any, Dict, Optional, List
 from copilotkit import CopilotKitState
 
 
@@ -19,3 +20,19 @@ class BaseTeachingState(CopilotKitState):
     
     # Proverbs (for home page compatibility)
     proverbs: List[str] = []
+
+
+def readable(state: Dict[str, Any], description: str) -> Any:
+    """Value of a frontend useCopilotReadable entry, decoded from JSON when needed."""
+    context = (state.get("copilotkit") or {}).get("context") or []
+    for entry in context:
+        entry = entry if isinstance(entry, dict) else getattr(entry, "__dict__", {})
+        if entry.get("description") == description:
+            value = entry.get("value")
+            if isinstance(value, str):
+                try:
+                    return json.loads(value)
+                except ValueError:
+                    return None
+            return value
+    return None
@@ -0,0 +1,647 @@
+"""
+Durable SQLite checkpointer for the agent graphs.
+
+SQLiteCheckpointer is a LangGraph BaseCheckpointSaver built for many
+concurrent sessions in one worker:
+
+- WAL mode, so readers never block the writer
+- One background writer thread that commits every pending write from all
+  sessions in a single transaction (group commit)
+- Checkpoint, metadata and channel blobs are zlib-compressed
+- List channels (the message history) are delta-encoded: each version
+  stores only the messages appended since the previous one, with a full
+  keyframe every CHECKPOINT_KEYFRAME versions, so a long chat costs O(n)
+  storage instead of O(n^2)
+- A TTL sweeper drops threads idle for longer than CHECKPOINT_TTL
+
+Nothing but a bounded LRU of message digests is kept in memory, so memory
+per worker stays flat however many sessions it has served.
+
+The `langgraph dev` server supplies its own persistence and rejects graphs
+compiled with a checkpointer; use this one wherever the graphs are hosted
+directly, e.g. graph.copy(update={"checkpointer": get_checkpointer()}).
+"""
+
+import asyncio
+import hashlib
+import os
+import queue
+import random
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+DEFAULT_PATH = os.path.join(".langgraph_api", "learnplay_checkpoints.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_id TEXT,
+    checkpoint BLOB NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    data BLOB NOT NULL,
+    base_version TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    task_path TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS threads_by_age ON threads (updated_at);
+"""
+
+_PUT_BLOB = "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?)"
+_PUT_CHECKPOINT = "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)"
+_PUT_WRITE = "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+_REPLACE_WRITE = "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+_TOUCH_THREAD = "INSERT OR REPLACE INTO threads VALUES (?, ?)"
+_DELETE_THREAD = [
+    "DELETE FROM checkpoints WHERE thread_id = ?",
+    "DELETE FROM blobs WHERE thread_id = ?",
+    "DELETE FROM writes WHERE thread_id = ?",
+    "DELETE FROM threads WHERE thread_id = ?",
+]
+
+# Payloads shorter than this are stored raw; zlib only adds overhead
+_COMPRESS_MIN = 128
+_RAW, _ZLIB = b"\x00", b"\x01"
+_COUNT = struct.Struct(">I")
+
+# Writer-queue markers
+_SWEEP = object()
+_STOP = object()
+
+
+class _Packed:
+    """
+    A serde (type, bytes) pair bound as one column.
+
+    sqlite3 calls __conform__ when the row is written, so compression runs
+    on the writer thread (zlib releases the GIL) rather than on the event
+    loop that called put().
+    """
+
+    __slots__ = ("type_", "data")
+
+    def __init__(self, type_: str, data: bytes):
+        self.type_ = type_
+        self.data = data
+
+    def __conform__(self, protocol: Any) -> Optional[bytes]:
+        if protocol is not sqlite3.PrepareProtocol:
+            return None
+        payload = self.type_.encode() + b"\x00" + self.data
+        if len(payload) < _COMPRESS_MIN:
+            return _RAW + payload
+        # Checkpoint payloads are a few KB: a 4 KB window compresses as well as
+        # the default 32 KB one and halves the per-call setup cost
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 12, 4)
+        return _ZLIB + compressor.compress(payload) + compressor.flush()
+
+
+def _unpack(value: bytes) -> Tuple[str, bytes]:
+    payload = zlib.decompress(value[1:]) if value[:1] == _ZLIB else value[1:]
+    type_, _, data = payload.partition(b"\x00")
+    return type_.decode(), data
+
+
+def _split_array(data: bytes) -> Optional[Tuple[int, bytes]]:
+    """(item count, concatenated item encodings) of a msgpack array, or None."""
+    head = data[:1]
+    if not head:
+        return None
+    if 0x90 <= head[0] <= 0x9F:
+        return head[0] & 0x0F, data[1:]
+    if head[0] == 0xDC:
+        return struct.unpack_from(">H", data, 1)[0], data[3:]
+    if head[0] == 0xDD:
+        return struct.unpack_from(">I", data, 1)[0], data[5:]
+    return None
+
+
+def _array_header(count: int) -> bytes:
+    if count < 16:
+        return bytes([0x90 | count])
+    if count < 1 << 16:
+        return b"\xdc" + struct.pack(">H", count)
+    return b"\xdd" + struct.pack(">I", count)
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """
+    SQLite checkpoint saver with batched writes, compression and delta-encoded message history.
+
+    Args:
+        path: Database file; created with its directory if missing
+        ttl_seconds: Threads idle for longer are deleted by the sweeper (0 disables it)
+        sweep_interval: Seconds between sweeps
+        batch_window: Seconds the writer waits for more writes before committing
+        keyframe_interval: Deltas between full copies of a list channel
+        cache_entries: (thread, channel) pairs whose last list digests are kept for delta encoding
+        serde: Serializer; defaults to LangGraph's JsonPlusSerializer
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        *,
+        ttl_seconds: Optional[float] = None,
+        sweep_interval: Optional[float] = None,
+        batch_window: Optional[float] = None,
+        keyframe_interval: Optional[int] = None,
+        cache_entries: Optional[int] = None,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("CHECKPOINT_TTL", "86400"))
+        self.sweep_interval = sweep_interval or float(os.getenv("CHECKPOINT_SWEEP_INTERVAL", "300"))
+        self.batch_window = batch_window if batch_window is not None else float(os.getenv("CHECKPOINT_BATCH_MS", "5")) / 1000
+        self.keyframe_interval = keyframe_interval or int(os.getenv("CHECKPOINT_KEYFRAME", "32"))
+        self.cache_entries = cache_entries or int(os.getenv("CHECKPOINT_CACHE_ENTRIES", "10000"))
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        setup = self._connect()
+        setup.executescript(_SCHEMA)
+        setup.close()
+
+        # (thread_id, checkpoint_ns, channel) -> (version, item count, body length, body digest, delta depth)
+        self._last_lists: "OrderedDict[Tuple[str, str, str], Tuple[str, int, int, bytes, int]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        self._readers = threading.local()
+        self._reader_connections: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        # thread_id -> writes queued but not yet committed
+        self._pending: Dict[str, int] = {}
+        self._pending_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+
+    # -- connections ---------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL only risks the last commits on power loss, never corruption
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._readers.conn = self._connect()
+            with self._readers_lock:
+                self._reader_connections.append(conn)
+        return conn
+
+    # -- writer --------------------------------------------------------------
+
+    def _submit(self, thread_id: str, statements: List[Tuple[str, tuple]]) -> None:
+        with self._pending_lock:
+            self._pending[thread_id] = self._pending.get(thread_id, 0) + 1
+        self._queue.put((thread_id, statements))
+
+    def _sync(self, thread_id: Optional[str] = None) -> None:
+        """Wait until the writes queued for thread_id (or any thread) are committed."""
+        with self._pending_lock:
+            if not (self._pending.get(thread_id) if thread_id else self._pending):
+                return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        next_sweep = time.monotonic() + self.sweep_interval
+        running = True
+        while running:
+            try:
+                item = self._queue.get(timeout=max(0.0, next_sweep - time.monotonic()))
+            except queue.Empty:
+                item = _SWEEP
+
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window
+            # Gather more writes until a barrier, the stop marker or the window closes
+            while isinstance(batch[-1], tuple):
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            writes = [entry for entry in batch if isinstance(entry, tuple)]
+            if writes:
+                self._commit(conn, [statements for _, statements in writes])
+                with self._pending_lock:
+                    for thread_id, _ in writes:
+                        self._pending[thread_id] -= 1
+                        if not self._pending[thread_id]:
+                            del self._pending[thread_id]
+
+            for entry in batch:
+                if entry is _SWEEP:
+                    self._sweep(conn)
+                    next_sweep = time.monotonic() + self.sweep_interval
+                elif entry is _STOP:
+                    running = False
+                elif isinstance(entry, threading.Event):
+                    entry.set()
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, writes: List[List[Tuple[str, tuple]]]) -> None:
+        try:
+            self._execute(conn, [statement for group in writes for statement in group])
+        except sqlite3.Error as e:
+            # Retry each put on its own so one bad row doesn't drop the whole batch
+            print(f"[WARNING] Checkpoint batch failed ({e}); retrying writes one by one")
+            for group in writes:
+                try:
+                    self._execute(conn, group)
+                except sqlite3.Error as e:
+                    print(f"[ERROR] Dropped checkpoint write: {e}")
+
+    @staticmethod
+    def _execute(conn: sqlite3.Connection, statements: List[Tuple[str, tuple]]) -> None:
+        conn.execute("BEGIN")
+        try:
+            for sql, params in statements:
+                conn.execute(sql, params)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _sweep(self, conn: sqlite3.Connection) -> None:
+        """Delete threads idle for longer than the TTL, a few hundred at a time."""
+        if self.ttl_seconds <= 0:
+            return
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        while True:
+            expired = [row[0] for row in conn.execute(
+                "SELECT thread_id FROM threads WHERE updated_at < ? LIMIT 200", (cutoff,)
+            )]
+            if not expired:
+                break
+            self._execute(conn, [(sql, (thread_id,)) for thread_id in expired for sql in _DELETE_THREAD])
+            self._forget(set(expired))
+            removed += len(expired)
+        if removed:
+            print(f"[OK] Checkpoint sweeper removed {removed} idle threads")
+
+    def _forget(self, thread_ids: set) -> None:
+        with self._cache_lock:
+            for key in [key for key in self._last_lists if key[0] in thread_ids]:
+                del self._last_lists[key]
+
+    def close(self) -> None:
+        """Flush pending writes and close every connection."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._readers_lock:
+            for conn in self._reader_connections:
+                conn.close()
+            self._reader_connections.clear()
+
+    def __enter__(self) -> "SQLiteCheckpointer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # -- encoding ------------------------------------------------------------
+
+    def _blob_params(self, thread_id: str, checkpoint_ns: str, channel: str, version: str,
+                     values: Dict[str, Any]) -> tuple:
+        if channel not in values:
+            return (thread_id, checkpoint_ns, channel, version, "empty", b"", None)
+        value = values[channel]
+        if not isinstance(value, list):
+            type_, data = self.serde.dumps_typed(value)
+            return (thread_id, checkpoint_ns, channel, version, type_, _Packed(type_, data), None)
+
+        # msgpack encodes a list as a header followed by each item's encoding,
+        # so items appended since the last version are a byte suffix of the body
+        type_, data = self.serde.dumps_typed(value)
+        split = _split_array(data) if type_ == "msgpack" else None
+        if split is None:
+            return (thread_id, checkpoint_ns, channel, version, type_, _Packed(type_, data), None)
+        count, body = split
+
+        key = (thread_id, checkpoint_ns, channel)
+        with self._cache_lock:
+            last = self._last_lists.get(key)
+        base_version, depth, stored = None, 0, body
+        if last:
+            last_version, last_count, last_length, last_digest, last_depth = last
+            if (last_depth < self.keyframe_interval and count >= last_count and len(body) >= last_length
+                    and hashlib.blake2b(body[:last_length], digest_size=16).digest() == last_digest):
+                base_version, depth = last_version, last_depth + 1
+                stored = body[last_length:]
+                count -= last_count
+        entry = (version, split[0], len(body), hashlib.blake2b(body, digest_size=16).digest(), depth)
+        with self._cache_lock:
+            self._last_lists[key] = entry
+            self._last_lists.move_to_end(key)
+            while len(self._last_lists) > self.cache_entries:
+                self._last_lists.popitem(last=False)
+        return (thread_id, checkpoint_ns, channel, version, "list", _Packed("list", _COUNT.pack(count) + stored),
+                base_version)
+
+    def _load_list(self, conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str,
+                   channel: str, data: bytes, base_version: Optional[str]) -> List[Any]:
+        chunks = [_unpack(data)[1]]
+        while base_version is not None:
+            row = conn.execute(
+                "SELECT data, base_version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, base_version),
+            ).fetchone()
+            if row is None:
+                print(f"[WARNING] Missing checkpoint delta base {channel}@{base_version} for thread {thread_id}")
+                break
+            chunks.append(_unpack(row[0])[1])
+            base_version = row[1]
+        chunks.reverse()
+        count = sum(_COUNT.unpack_from(chunk)[0] for chunk in chunks)
+        body = b"".join(chunk[_COUNT.size:] for chunk in chunks)
+        return self.serde.loads_typed(("msgpack", _array_header(count) + body))
+
+    def _load_blobs(self, conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str,
+                    versions: ChannelVersions) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        for channel, version in versions.items():
+            row = conn.execute(
+                "SELECT kind, data, base_version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is None or row[0] == "empty":
+                continue
+            kind, data, base_version = row
+            if kind == "list":
+                values[channel] = self._load_list(conn, thread_id, checkpoint_ns, channel, data, base_version)
+            else:
+                values[channel] = self.serde.loads_typed(_unpack(data))
+        return values
+
+    def _tuple(self, conn: sqlite3.Connection, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+               parent_id: Optional[str], checkpoint_data: bytes,
+               metadata: Optional[CheckpointMetadata] = None,
+               metadata_data: Optional[bytes] = None) -> CheckpointTuple:
+        checkpoint = self.serde.loads_typed(_unpack(checkpoint_data))
+        if metadata is None:
+            metadata = self.serde.loads_typed(_unpack(metadata_data))
+        writes = conn.execute(
+            "SELECT task_id, channel, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? "
+            "AND checkpoint_id = ? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id,
+            }},
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(conn, thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+            },
+            metadata=metadata,
+            parent_config=(
+                {"configurable": {
+                    "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id,
+                }}
+                if parent_id
+                else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed(_unpack(value)))
+                            for task_id, channel, value in writes],
+        )
+
+    # -- BaseCheckpointSaver -------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        self._sync(thread_id)
+        conn = self._reader()
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        if checkpoint_id := get_checkpoint_id(config):
+            row = conn.execute(
+                "SELECT checkpoint_id, parent_id, checkpoint, metadata FROM checkpoints "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            ).fetchone()
+        else:
+            row = conn.execute(
+                "SELECT checkpoint_id, parent_id, checkpoint, metadata FROM checkpoints "
+                "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+        if row is None:
+            return None
+        return self._tuple(conn, thread_id, checkpoint_ns, row[0], row[1], row[2], metadata_data=row[3])
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        self._sync(config["configurable"]["thread_id"] if config else None)
+        conn = self._reader()
+        where, params = [], []
+        if config:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                where.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint, metadata FROM checkpoints"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY checkpoint_id DESC"
+
+        rows = conn.execute(query, params).fetchall()
+        for thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint_data, metadata_data in rows:
+            if limit is not None and limit <= 0:
+                break
+            metadata = self.serde.loads_typed(_unpack(metadata_data))
+            if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield self._tuple(conn, thread_id, checkpoint_ns, checkpoint_id, parent_id,
+                              checkpoint_data, metadata=metadata)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        saved = checkpoint.copy()
+        values: Dict[str, Any] = saved.pop("channel_values")  # type: ignore[misc]
+
+        statements = [
+            (_PUT_BLOB, self._blob_params(thread_id, checkpoint_ns, channel, str(version), values))
+            for channel, version in new_versions.items()
+        ]
+        statements.append((_PUT_CHECKPOINT, (
+            thread_id,
+            checkpoint_ns,
+            checkpoint["id"],
+            config["configurable"].get("checkpoint_id"),
+            _Packed(*self.serde.dumps_typed(saved)),
+            _Packed(*self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))),
+        )))
+        statements.append((_TOUCH_THREAD, (thread_id, time.time())))
+        self._submit(thread_id, statements)
+
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"],
+        }}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        statements = []
+        for index, (channel, value) in enumerate(writes):
+            idx = WRITES_IDX_MAP.get(channel, index)
+            # Special channels (errors, interrupts) overwrite; regular writes are idempotent
+            sql = _REPLACE_WRITE if idx < 0 else _PUT_WRITE
+            statements.append((sql, (
+                thread_id, checkpoint_ns, checkpoint_id, task_id, idx, task_path, channel,
+                _Packed(*self.serde.dumps_typed(value)),
+            )))
+        if statements:
+            self._submit(thread_id, statements)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._submit(thread_id, [(sql, (thread_id,)) for sql in _DELETE_THREAD])
+        self._forget({thread_id})
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        # put only serializes and queues; the writer thread does the I/O
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+_checkpointer: Optional[SQLiteCheckpointer] = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> SQLiteCheckpointer:
+    """Get or create the process-wide checkpointer at CHECKPOINT_DB."""
+    global _checkpointer
+    if _checkpointer is None:
+        with _checkpointer_lock:
+            if _checkpointer is None:
+                path = os.getenv("CHECKPOINT_DB", DEFAULT_PATH)
+                _checkpointer = SQLiteCheckpointer(path)
+                print(f"[OK] SQLite checkpointer at {path}")
+    return _checkpointer
@@ -0,0 +1,102 @@
+"""
+Lightweight local text embeddings.
+
+Uses the hashing trick over word unigrams/bigrams and character trigrams,
+giving sparse, L2-normalized vectors with no model download and no network
+call. Good enough to match near-identical phrasings of short chat messages.
+"""
+
+import math
+import re
+import zlib
+from typing import Dict, List, Tuple
+
+SparseVector = Dict[int, float]
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Numbers and board squares: a digit, row or square that changes the question
+_SPECIFIC = re.compile(r"[a-h][1-8]|\d+")
+
+# Number of hash buckets; collisions are rare for short messages
+DIMENSIONS = 1 << 18
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def specific_tokens(text: str) -> List[str]:
+    """
+    Numbers and chess squares in text, in order.
+
+    Two messages can embed almost identically while asking about different
+    cells, digits or squares ("row 3 column 4" vs "row 3 column 5"), so
+    similarity matches should also agree on these.
+    """
+    return _SPECIFIC.findall(normalize_text(text))
+
+
+def _bucket(feature: str) -> int:
+    return zlib.crc32(feature.encode("utf-8")) & (DIMENSIONS - 1)
+
+
+def embed_text(text: str) -> SparseVector:
+    """
+    Embed text as a sparse, L2-normalized hashed feature vector.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Mapping of bucket index -> weight
+    """
+    words = normalize_text(text).split()
+    vector: SparseVector = {}
+
+    def add(feature: str, weight: float) -> None:
+        index = _bucket(feature)
+        vector[index] = vector.get(index, 0.0) + weight
+
+    for word in words:
+        add(f"w:{word}", 1.0)
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            add(f"c:{padded[i:i + 3]}", 0.5)
+    for first, second in zip(words, words[1:]):
+        add(f"b:{first} {second}", 1.0)
+
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    if norm == 0:
+        return {}
+    return {i: w / norm for i, w in vector.items()}
+
+
+def cosine_similarity(a: SparseVector, b: SparseVector) -> float:
+    """Cosine similarity of two normalized sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(i, 0.0) for i, w in a.items())
+
+
+class VectorIndex:
+    """Small in-memory brute-force index over sparse vectors."""
+
+    def __init__(self):
+        self._vectors: Dict[str, SparseVector] = {}
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def add(self, key: str, vector: SparseVector) -> None:
+        self._vectors[key] = vector
+
+    def remove(self, key: str) -> None:
+        self._vectors.pop(key, None)
+
+    def search(self, vector: SparseVector, k: int = 1) -> List[Tuple[str, float]]:
+        """Return the k most similar keys with their scores, best first."""
+        scored = [(key, cosine_similarity(vector, v)) for key, v in self._vectors.items()]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:k]
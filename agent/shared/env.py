@@ -0,0 +1,13 @@
+"""Environment loading shared by all agents."""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """
+    Load agent/.env into the process environment.
+    Runs once per process; later calls are no-ops.
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
@@ -0,0 +1,176 @@
+"""
+Conversation history compaction for long tutoring sessions.
+
+Every model call used to receive the whole chat, including old tool results
+full of grids and highlight arrays, so input tokens grew with every turn.
+HistoryCompactionMiddleware rewrites only what is sent to the model (the
+stored conversation is untouched):
+
+- the last HISTORY_KEEP_TURNS turns are sent verbatim
+- the HISTORY_SUMMARY_TURNS turns before those are kept with tool results
+  and large tool-call arguments reduced to short summaries
+- anything older is dropped
+
+Lesson progress comes from the teaching fields in state, which are passed to
+the model as a short note on the latest user message instead of being
+inferred from history.
+"""
+
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+
+# Longest text kept from a summarized message
+_TEXT_LIMIT = 300
+# Longest JSON kept for a single summarized tool-call argument
+_ARG_LIMIT = 80
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} chars omitted]"
+
+
+def summarize_tool_result(content: Any) -> str:
+    """
+    Reduce a tool result to its scalar fields.
+
+    JSON objects keep short strings, numbers and booleans (e.g. is_valid,
+    row, col, message) and drop lists and nested objects such as grids and
+    highlight arrays. Anything else is truncated.
+    """
+    text = content if isinstance(content, str) else json.dumps(content, default=str)
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return _truncate(text, _TEXT_LIMIT)
+
+    if not isinstance(data, dict):
+        return _truncate(text, _TEXT_LIMIT)
+
+    summary = {}
+    for key, value in data.items():
+        if isinstance(value, (bool, int, float)) or value is None:
+            summary[key] = value
+        elif isinstance(value, str):
+            summary[key] = _truncate(value, _TEXT_LIMIT // 2)
+    return json.dumps(summary)
+
+
+def _summarize_args(args: Dict[str, Any]) -> Dict[str, Any]:
+    compact = {}
+    for key, value in args.items():
+        encoded = json.dumps(value, default=str)
+        compact[key] = value if len(encoded) <= _ARG_LIMIT else f"<{len(encoded)} chars omitted>"
+    return compact
+
+
+def _summarize_message(message: AnyMessage) -> AnyMessage:
+    if isinstance(message, ToolMessage):
+        return message.model_copy(update={"content": summarize_tool_result(message.content)})
+
+    if isinstance(message, AIMessage):
+        content = message.content
+        if isinstance(content, str):
+            content = _truncate(content, _TEXT_LIMIT)
+        return message.model_copy(update={
+            "content": content,
+            "tool_calls": [
+                {**call, "args": _summarize_args(call.get("args") or {})}
+                for call in message.tool_calls
+            ],
+        })
+
+    if isinstance(message, HumanMessage) and isinstance(message.content, str):
+        return message.model_copy(update={"content": _truncate(message.content, _TEXT_LIMIT)})
+
+    return message
+
+
+def split_turns(messages: List[AnyMessage]) -> List[List[AnyMessage]]:
+    """
+    Group messages into turns, each starting at a user message.
+
+    Dropping or summarizing whole turns never separates a tool call from its
+    tool result.
+    """
+    turns: List[List[AnyMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def teaching_note(state: Dict[str, Any]) -> Optional[str]:
+    """Describe lesson progress from state, or None when no lesson is running."""
+    if not state.get("teaching_active"):
+        return None
+    step = int(state.get("teaching_current_step") or 0)
+    total = int(state.get("teaching_total_steps") or 0)
+    topic = state.get("teaching_topic") or "lesson"
+    return f'[Teaching progress: "{topic}" step {step} of {total} completed]'
+
+
+class HistoryCompactionMiddleware(AgentMiddleware):
+    """
+    Keeps model input bounded however long the session runs.
+
+    Runs after the lesson and response-cache middleware so those still match
+    the user's own words, and before PromptCacheMiddleware.
+    """
+
+    def __init__(self, keep_turns: Optional[int] = None, summary_turns: Optional[int] = None):
+        super().__init__()
+        self.keep_turns = keep_turns or int(os.getenv("HISTORY_KEEP_TURNS", "6"))
+        self.summary_turns = (
+            summary_turns if summary_turns is not None
+            else int(os.getenv("HISTORY_SUMMARY_TURNS", "10"))
+        )
+
+    @property
+    def name(self) -> str:
+        return "HistoryCompactionMiddleware"
+
+    def compact(self, messages: List[AnyMessage], state: Dict[str, Any]) -> List[AnyMessage]:
+        """Return the messages to send to the model for this call."""
+        turns = split_turns(messages)
+        recent = turns[-self.keep_turns:]
+        older = turns[:-self.keep_turns][-self.summary_turns:] if self.summary_turns else []
+
+        compacted = [_summarize_message(m) for turn in older for m in turn]
+        for turn in recent:
+            compacted.extend(turn)
+
+        note = teaching_note(state)
+        if note and recent and isinstance(recent[-1][0], HumanMessage):
+            # The latest user message opens the last turn
+            index = len(compacted) - len(recent[-1])
+            human = compacted[index]
+            if isinstance(human.content, str):
+                compacted[index] = human.model_copy(update={"content": f"{human.content}\n\n{note}"})
+
+        return compacted
+
+    def _prepare(self, request: ModelRequest) -> ModelRequest:
+        if not request.messages:
+            return request
+        return request.override(messages=self.compact(request.messages, request.state or {}))
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        return handler(self._prepare(request))
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        return await handler(self._prepare(request))
@@ -0,0 +1,96 @@
+"""
+Custom HTTP routes served next to the graphs.
+
+Mounted into the LangGraph server through the "http.app" entry in
+langgraph.json, so they run in the same worker as the graphs and share its
+caches:
+
+    GET  /learnplay/metrics          see shared/metrics_app.py
+    GET  /learnplay/metrics/summary
+    POST /learnplay/sudoku/prefetch  Start computing the hint for a grid the
+                                     user just reached
+    POST /learnplay/chess/review     Review a PGN game; one JSON finding per
+                                     line (NDJSON) as each move is analyzed
+
+The routes live under /learnplay so they never shadow the server's own
+endpoints. On startup the local TTS workers are warmed up when TTS_PROVIDER
+is piper or espeak.
+"""
+
+import json
+import threading
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from shared.metrics_app import router as metrics_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from shared.tts_service import warm_up_tts
+
+    # Loads local voice models in the background; the server starts right away
+    threading.Thread(target=warm_up_tts, name="tts-warm-up", daemon=True).start()
+    yield
+
+
+app = FastAPI(title="LearnPlay", lifespan=lifespan)
+app.include_router(metrics_router)
+
+
+class SudokuMove(BaseModel):
+    row: int = Field(ge=0)
+    col: int = Field(ge=0)
+    value: Optional[int] = Field(default=None, ge=1)
+
+
+class SudokuPrefetch(BaseModel):
+    # 4x4 up to 16x16 (9x9 on the page today)
+    grid: List[List[Optional[int]]] = Field(min_length=4, max_length=16)
+    puzzle: Optional[str] = Field(default=None, pattern=r"^[0-9A-G]+$")
+    last_move: Optional[SudokuMove] = None
+
+
+@app.post("/learnplay/sudoku/prefetch")
+def sudoku_prefetch(request: SudokuPrefetch) -> JSONResponse:
+    # Imported here so the server starts without loading the Sudoku agent
+    from agents.sudoku.candidates import geometry, is_grid_key
+    from agents.sudoku.hints import prefetch_hint
+
+    size = len(request.grid)
+    try:
+        geometry(size)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=422)
+    if any(len(row) != size or any(v is not None and not 1 <= v <= size for v in row) for row in request.grid):
+        return JSONResponse({"error": f"grid must be {size}x{size} with values 1-{size} or null"}, status_code=422)
+    if request.puzzle is not None and not is_grid_key(request.puzzle, size):
+        return JSONResponse({"error": f"puzzle must have {size * size} cells for a {size}x{size} grid"},
+                            status_code=422)
+    move = request.last_move
+    if move and (move.row >= size or move.col >= size or (move.value or 0) > size):
+        return JSONResponse({"error": f"last_move must be on the {size}x{size} grid"}, status_code=422)
+
+    last_move = request.last_move.model_dump() if request.last_move and request.last_move.value else None
+    queued = prefetch_hint(request.grid, request.puzzle, last_move)
+    return JSONResponse({"queued": queued})
+
+
+class ChessReview(BaseModel):
+    pgn: str = Field(min_length=1, max_length=100_000)
+
+
+@app.post("/learnplay/chess/review")
+def chess_review(request: ChessReview):
+    from agents.chess.review import InvalidGame, review_game
+
+    try:
+        events = review_game(request.pgn)
+    except InvalidGame as e:
+        return JSONResponse({"error": str(e)}, status_code=422)
+    # Sent line by line as moves are analyzed; closing the stream cancels the rest
+    return StreamingResponse((json.dumps(event) + "\n" for event in events), media_type="application/x-ndjson")
@@ -0,0 +1,182 @@
+"""
+Local intent classification in front of the router LLM.
+
+Most home-page messages are greetings, "which game should I learn?" or
+"teach me chess" - questions the router prompt already answers word for
+word. IntentRouterMiddleware classifies the user's message on the CPU and
+replies directly when it is confident:
+
+1. Regex rules, checked in order (first match wins)
+2. Optionally, nearest-neighbour match against each intent's example
+   phrasings using the local hashed embeddings
+
+Anything unmatched or ambiguous goes to the model as before.
+"""
+
+import os
+import re
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Pattern, Sequence, Tuple, Union
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.messages import AIMessage, HumanMessage
+
+from .embeddings import VectorIndex, embed_text, normalize_text
+
+
+def is_intent_router_enabled() -> bool:
+    """Rule-based routing is on unless INTENT_ROUTER=false."""
+    return os.getenv("INTENT_ROUTER", "true").lower() not in ("0", "false", "no")
+
+
+class Intent:
+    """
+    A message category that can be answered without the model.
+
+    Args:
+        name: Intent name, reported in response_metadata["intent_router"]
+        patterns: Regexes (matched against the normalized message)
+        reply: Canned reply, or a function of the regex match returning one
+        game: Game the reply hands the user off to ("sudoku", "chess"), if any
+        examples: Example phrasings for the similarity fallback
+        excludes: Regexes that veto the intent, e.g. the other game's name
+    """
+
+    def __init__(
+        self,
+        name: str,
+        patterns: Sequence[str],
+        reply: Union[str, Callable[[Optional[re.Match]], str]],
+        game: Optional[str] = None,
+        examples: Sequence[str] = (),
+        excludes: Sequence[str] = (),
+    ):
+        self.name = name
+        self.patterns: List[Pattern] = [re.compile(p) for p in patterns]
+        self.reply = reply
+        self.game = game
+        self.examples = list(examples)
+        self.excludes: List[Pattern] = [re.compile(p) for p in excludes]
+
+    def match(self, text: str) -> Optional[re.Match]:
+        if any(p.search(text) for p in self.excludes):
+            return None
+        for pattern in self.patterns:
+            found = pattern.search(text)
+            if found:
+                return found
+        return None
+
+    def render(self, found: Optional[re.Match]) -> str:
+        return self.reply(found) if callable(self.reply) else self.reply
+
+
+class IntentClassifier:
+    """
+    Classifies short messages into intents.
+
+    Messages longer than max_words are never classified: long messages tend
+    to carry details a canned reply would ignore.
+    """
+
+    def __init__(
+        self,
+        intents: Sequence[Intent],
+        similarity_threshold: Optional[float] = None,
+        max_words: Optional[int] = None,
+    ):
+        self.intents = {intent.name: intent for intent in intents}
+        self.similarity_threshold = similarity_threshold or float(
+            os.getenv("INTENT_ROUTER_SIMILARITY", "0.8")
+        )
+        self.max_words = max_words or int(os.getenv("INTENT_ROUTER_MAX_WORDS", "20"))
+
+        # INTENT_ROUTER_SIMILARITY=0 turns the similarity fallback off
+        self._index = VectorIndex()
+        if self.similarity_threshold > 0:
+            for intent in intents:
+                for i, example in enumerate(intent.examples):
+                    self._index.add(f"{intent.name}|{i}", embed_text(example))
+
+    def classify(self, message: str) -> Tuple[Optional[Intent], Optional[re.Match], str]:
+        """
+        Returns:
+            (intent, regex match, method) where method is "rule", "similarity"
+            or "none"
+        """
+        text = normalize_text(message)
+        if not text or len(text.split()) > self.max_words:
+            return None, None, "none"
+
+        for intent in self.intents.values():
+            found = intent.match(text)
+            if found:
+                return intent, found, "rule"
+
+        if len(self._index):
+            matches = self._index.search(embed_text(text), k=2)
+            if matches and matches[0][1] >= self.similarity_threshold:
+                name = matches[0][0].split("|")[0]
+                intent = self.intents[name]
+                # Vetoes apply to similarity matches too
+                if not any(p.search(text) for p in intent.excludes):
+                    return intent, None, "similarity"
+
+        return None, None, "none"
+
+
+class IntentRouterMiddleware(AgentMiddleware):
+    """
+    Answers confidently classified user messages without the model.
+
+    Handoffs to a game are marked with response_metadata["handoff"]; the
+    reply itself tells the user which page to open.
+    """
+
+    def __init__(self, classifier: IntentClassifier):
+        super().__init__()
+        self.classifier = classifier
+
+    @property
+    def name(self) -> str:
+        return "IntentRouterMiddleware"
+
+    def _route(self, request: ModelRequest) -> Optional[AIMessage]:
+        if not is_intent_router_enabled() or not request.messages:
+            return None
+        last = request.messages[-1]
+        if not isinstance(last, HumanMessage) or not isinstance(last.content, str):
+            return None
+
+        intent, found, method = self.classifier.classify(last.content)
+        if intent is None:
+            return None
+
+        metadata: Dict[str, Any] = {"intent_router": intent.name, "intent_method": method}
+        if intent.game:
+            metadata["handoff"] = intent.game
+        return AIMessage(
+            content=intent.render(found),
+            id=f"intent-{uuid.uuid4().hex}",
+            response_metadata=metadata,
+        )
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        message = self._route(request)
+        if message is not None:
+            return ModelResponse(result=[message])
+        return handler(request)
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        message = self._route(request)
+        if message is not None:
+            return ModelResponse(result=[message])
+        return await handler(request)
@@ -0,0 +1,260 @@
+"""
+Deterministic fast path for scripted lessons.
+
+Scripted lessons (e.g. "Learn Sudoku Basics") are a fixed sequence of
+frontend tool calls per step. LessonMiddleware emits those calls directly,
+driven by the teaching fields in BaseTeachingState, so "Next Step" clicks
+never wait on an LLM round-trip. Anything that is not a lesson step falls
+through to the model.
+
+With TTS_STREAMING on, steps do not call speak_message: the step's voice
+line is spoken through the streamed-speech events once the frontend has run
+the step's tools.
+"""
+
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from .embeddings import normalize_text
+from .teaching_tools import is_continuation
+from .tts_pipeline import aspeak_text, is_streaming_tts_enabled, speak_text
+
+# Tool call ids look like "lesson_<lesson id>_<step>_<random>"
+_CALL_PREFIX = "lesson_"
+
+
+def is_lesson_fast_path_enabled() -> bool:
+    """Scripted lessons skip the LLM unless LESSON_FAST_PATH=false."""
+    return os.getenv("LESSON_FAST_PATH", "true").lower() not in ("0", "false", "no")
+
+
+class Lesson:
+    """
+    A scripted multi-step lesson.
+
+    Each step is a dict with:
+        description: Progress label passed to updateTeachingStep
+        highlight: Items for the highlight tool (cells or squares), may be empty
+        highlight_message: Text shown with the highlight
+        speak: Voice line (under 25 words)
+        say: Chat text sent once the frontend has run the step's tools
+
+    applies, when given, is called with the agent state and returns False
+    when the script doesn't fit the current game (e.g. another board size);
+    the request then goes to the model or to another lesson.
+    """
+
+    def __init__(
+        self,
+        lesson_id: str,
+        topic: str,
+        triggers: Sequence[str],
+        steps: List[Dict[str, Any]],
+        highlight_tool: str,
+        highlight_arg: str,
+        applies: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ):
+        self.lesson_id = lesson_id
+        self.topic = topic
+        self.triggers = {normalize_text(t) for t in triggers}
+        self.steps = steps
+        self.highlight_tool = highlight_tool
+        self.highlight_arg = highlight_arg
+        self.applies = applies
+
+    @property
+    def total_steps(self) -> int:
+        return len(self.steps)
+
+    @property
+    def required_tools(self) -> set:
+        tools = {"startTeaching", "updateTeachingStep", "endTeaching", self.highlight_tool}
+        if not is_streaming_tts_enabled():
+            tools.add("speak_message")
+        return tools
+
+    def applies_to(self, state: Dict[str, Any]) -> bool:
+        return self.applies is None or self.applies(state)
+
+    def matches_start(self, message: str) -> bool:
+        return normalize_text(message) in self.triggers
+
+    def _call(self, step_number: int, name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        call_id = f"{_CALL_PREFIX}{self.lesson_id}_{step_number}_{uuid.uuid4().hex[:8]}"
+        return {"name": name, "args": args, "id": call_id, "type": "tool_call"}
+
+    def step_message(self, step_number: int) -> AIMessage:
+        """Build the tool-call message for a step (1-based)."""
+        step = self.steps[step_number - 1]
+        calls = []
+
+        if step_number == 1:
+            calls.append(self._call(step_number, "startTeaching", {
+                "totalSteps": self.total_steps,
+                "topic": self.topic,
+            }))
+
+        calls.append(self._call(step_number, "updateTeachingStep", {
+            "stepNumber": step_number,
+            "stepDescription": step["description"],
+        }))
+
+        if step.get("highlight"):
+            calls.append(self._call(step_number, self.highlight_tool, {
+                self.highlight_arg: step["highlight"],
+                "message": step.get("highlight_message", step["speak"]),
+            }))
+
+        if not is_streaming_tts_enabled():
+            calls.append(self._call(step_number, "speak_message", {"message": step["speak"]}))
+
+        if step_number == self.total_steps:
+            calls.append(self._call(step_number, "endTeaching", {}))
+
+        return AIMessage(
+            content="",
+            tool_calls=calls,
+            id=f"lesson-{uuid.uuid4().hex}",
+            response_metadata={"lesson_fast_path": f"{self.lesson_id}:{step_number}"},
+        )
+
+    def closing_message(self, step_number: int) -> AIMessage:
+        """Chat text that ends the turn after the step's tools have run."""
+        return AIMessage(
+            content=self.steps[step_number - 1]["say"],
+            id=f"lesson-{uuid.uuid4().hex}",
+            response_metadata={"lesson_fast_path": f"{self.lesson_id}:{step_number}:done"},
+        )
+
+
+def _parse_call_id(call_id: str) -> Optional[Tuple[str, int]]:
+    if not call_id or not call_id.startswith(_CALL_PREFIX):
+        return None
+    parts = call_id[len(_CALL_PREFIX):].rsplit("_", 2)
+    if len(parts) != 3 or not parts[1].isdigit():
+        return None
+    return parts[0], int(parts[1])
+
+
+def _frontend_tool_names(state: Dict[str, Any]) -> set:
+    actions = (state.get("copilotkit") or {}).get("actions") or []
+    return {a.get("function", {}).get("name") or a.get("name") for a in actions}
+
+
+class LessonMiddleware(AgentMiddleware):
+    """
+    Runs scripted lessons without the model and keeps teaching state current.
+
+    Teaching fields (teaching_active, teaching_topic, teaching_current_step,
+    teaching_total_steps) are updated from every startTeaching /
+    updateTeachingStep / endTeaching call, whether it came from a script or
+    from the LLM, so state - not chat history - says where a lesson is.
+    """
+
+    def __init__(self, lessons: Sequence[Lesson]):
+        super().__init__()
+        self.lessons = {lesson.lesson_id: lesson for lesson in lessons}
+
+    @property
+    def name(self) -> str:
+        return "LessonMiddleware"
+
+    def _fast_path(self, request: ModelRequest) -> Tuple[Optional[AIMessage], Optional[str]]:
+        """The scripted reply, if any, and the voice line to stream with it."""
+        if not is_lesson_fast_path_enabled() or not request.messages:
+            return None, None
+
+        state = request.state or {}
+        last = request.messages[-1]
+
+        # Frontend has run a scripted step's tools: finish the turn
+        if isinstance(last, ToolMessage):
+            parsed = _parse_call_id(last.tool_call_id)
+            if parsed is None or parsed[0] not in self.lessons:
+                return None, None
+            lesson = self.lessons[parsed[0]]
+            if not 1 <= parsed[1] <= lesson.total_steps:
+                return None, None
+            speech = lesson.steps[parsed[1] - 1]["speak"] if is_streaming_tts_enabled() else None
+            return lesson.closing_message(parsed[1]), speech
+
+        if not isinstance(last, HumanMessage) or not isinstance(last.content, str):
+            return None, None
+
+        lesson, step_number = self._next_step(state, last.content)
+        if lesson is None:
+            return None, None
+
+        # Only script steps the page can actually render
+        if not lesson.required_tools <= _frontend_tool_names(state):
+            return None, None
+        return lesson.step_message(step_number), None
+
+    def _next_step(self, state: Dict[str, Any], message: str) -> Tuple[Optional[Lesson], int]:
+        lessons = [lesson for lesson in self.lessons.values() if lesson.applies_to(state)]
+        for lesson in lessons:
+            if lesson.matches_start(message):
+                return lesson, 1
+
+        if not is_continuation(message) or not state.get("teaching_active"):
+            return None, 0
+
+        for lesson in lessons:
+            if state.get("teaching_topic") == lesson.topic:
+                step_number = int(state.get("teaching_current_step") or 0) + 1
+                if step_number <= lesson.total_steps:
+                    return lesson, step_number
+        return None, 0
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        message, speech = self._fast_path(request)
+        if message is not None:
+            if speech:
+                speak_text(speech)
+            return ModelResponse(result=[message])
+        return handler(request)
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        message, speech = self._fast_path(request)
+        if message is not None:
+            if speech:
+                await aspeak_text(speech)
+            return ModelResponse(result=[message])
+        return await handler(request)
+
+    def after_model(self, state: Dict[str, Any], runtime: Any) -> Optional[Dict[str, Any]]:
+        messages = state.get("messages") or []
+        if not messages or not isinstance(messages[-1], AIMessage):
+            return None
+
+        update: Dict[str, Any] = {}
+        for call in messages[-1].tool_calls:
+            args = call.get("args") or {}
+            if call["name"] == "startTeaching":
+                update.update({
+                    "teaching_active": True,
+                    "teaching_topic": str(args.get("topic", "")),
+                    "teaching_total_steps": int(args.get("totalSteps") or 0),
+                    "teaching_current_step": 0,
+                })
+            elif call["name"] == "updateTeachingStep":
+                update["teaching_current_step"] = int(args.get("stepNumber") or 0)
+            elif call["name"] == "endTeaching":
+                update["teaching_active"] = False
+
+        return update or None
+
+    async def aafter_model(self, state: Dict[str, Any], runtime: Any) -> Optional[Dict[str, Any]]:
+        return self.after_model(state, runtime)
@@ -0,0 +1,397 @@
+"""
+In-process latency and payload metrics.
+
+Collects histograms and counters for graph nodes, backend tools, LLM calls
+(time to first token, tokens/sec, token counts) and TTS, and renders them in
+the Prometheus text format. There is no client library or collector to run:
+metrics live in memory and are read through shared/metrics_app.py.
+
+Set METRICS=false to turn collection off.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+def is_metrics_enabled() -> bool:
+    """Metrics are collected unless METRICS=false."""
+    return os.getenv("METRICS", "true").lower() not in ("0", "false", "no")
+
+
+# Seconds; spans in-process tools (sub-ms) up to slow LLM turns
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Bytes of JSON in and out of a tool
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+# Output tokens per second
+RATE_BUCKETS = (5, 10, 20, 40, 60, 80, 100, 150, 200, 400)
+
+
+def _label_key(labelnames: Sequence[str], labels: Dict[str, str]) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [{"labels": dict(zip(self.labelnames, key)), "value": value} for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count, max]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, value]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+            series[3] = max(series[3], value)
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._series.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {count}"
+
+    def _quantile(self, counts: List[int], count: int, largest: float, q: float) -> Optional[float]:
+        # Upper bound of the bucket holding the q-th observation
+        if not count:
+            return None
+        rank = q * count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return min(bound, largest)
+        return largest
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2], s[3])) for key, s in self._series.items()]
+        return [
+            {
+                "labels": dict(zip(self.labelnames, key)),
+                "count": count,
+                "mean": total / count if count else None,
+                "max": largest,
+                "p50": self._quantile(counts, count, largest, 0.5),
+                "p95": self._quantile(counts, count, largest, 0.95),
+                "p99": self._quantile(counts, count, largest, 0.99),
+            }
+            for key, (counts, total, count, largest) in items
+        ]
+
+
+class MetricsRegistry:
+    """Holds every metric of the worker process."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Any) -> Any:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        """Readable snapshot with approximate percentiles, for use without Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+
+registry = MetricsRegistry()
+
+NODE_DURATION = registry.histogram(
+    "learnplay_node_duration_seconds", "Graph node run time", ["graph", "node"])
+NODE_ERRORS = registry.counter(
+    "learnplay_node_errors_total", "Graph node runs that raised", ["graph", "node"])
+TOOL_DURATION = registry.histogram(
+    "learnplay_tool_duration_seconds", "Backend tool run time", ["graph", "tool"])
+TOOL_PAYLOAD = registry.histogram(
+    "learnplay_tool_payload_bytes", "Size of tool input and output",
+    ["graph", "tool", "direction"], SIZE_BUCKETS)
+TOOL_ERRORS = registry.counter(
+    "learnplay_tool_errors_total", "Backend tool runs that raised", ["graph", "tool"])
+LLM_TTFT = registry.histogram(
+    "learnplay_llm_time_to_first_token_seconds", "Time to first streamed token",
+    ["provider", "model"])
+LLM_DURATION = registry.histogram(
+    "learnplay_llm_duration_seconds", "Full LLM call time", ["provider", "model"])
+LLM_TOKENS_PER_SECOND = registry.histogram(
+    "learnplay_llm_output_tokens_per_second", "Output tokens per second after the first token",
+    ["provider", "model"], RATE_BUCKETS)
+LLM_TOKENS = registry.counter(
+    "learnplay_llm_tokens_total", "LLM tokens by type (input, output, cached)",
+    ["provider", "model", "type"])
+LLM_ERRORS = registry.counter(
+    "learnplay_llm_errors_total", "LLM calls that raised", ["provider", "model"])
+TTS_DURATION = registry.histogram(
+    "learnplay_tts_duration_seconds", "TTSService.generate_speech time", ["backend"])
+TTS_TEXT = registry.histogram(
+    "learnplay_tts_text_chars", "Characters sent to TTS", ["backend"],
+    (16, 32, 64, 128, 256, 512, 1024))
+TTS_ERRORS = registry.counter(
+    "learnplay_tts_errors_total", "Failed TTS requests", ["backend"])
+PREFETCH = registry.counter(
+    "learnplay_prefetch_total",
+    "Speculative work by outcome (hit, partial, wait, miss, submitted, cancelled, dropped)",
+    ["name", "outcome"])
+
+
+def _payload_size(value: Any) -> int:
+    content = getattr(value, "content", value)
+    if isinstance(content, (bytes, str)):
+        return len(content)
+    try:
+        return len(json.dumps(content, default=str))
+    except (TypeError, ValueError):
+        return len(str(content))
+
+
+class _Timer:
+    """Start times per callback run id."""
+
+    def __init__(self):
+        self._starts: Dict[UUID, Tuple[float, Dict[str, Any]]] = {}
+
+    def start(self, run_id: UUID, **info: Any) -> None:
+        self._starts[run_id] = (time.perf_counter(), info)
+
+    def stop(self, run_id: UUID) -> Tuple[Optional[float], Dict[str, Any]]:
+        started = self._starts.pop(run_id, None)
+        if started is None:
+            return None, {}
+        return time.perf_counter() - started[0], started[1]
+
+
+class GraphMetricsHandler(BaseCallbackHandler):
+    """
+    Times every graph node and backend tool run.
+
+    Attached to a compiled graph with instrument_graph(); LangGraph passes
+    graph callbacks to every node and tool call.
+    """
+
+    # Record timings when events fire, not when an executor gets to them
+    run_inline = True
+
+    def __init__(self, graph_name: str):
+        self.graph_name = graph_name
+        self._timer = _Timer()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # Only the node's own run; nested runnables inherit the metadata
+        if node and kwargs.get("name") == node:
+            self._timer.start(run_id, node=node)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs) -> None:
+        elapsed, info = self._timer.stop(run_id)
+        if elapsed is not None:
+            NODE_DURATION.observe(elapsed, graph=self.graph_name, node=info["node"])
+
+    def on_chain_error(self, error, *, run_id, **kwargs) -> None:
+        elapsed, info = self._timer.stop(run_id)
+        if elapsed is not None:
+            NODE_DURATION.observe(elapsed, graph=self.graph_name, node=info["node"])
+            NODE_ERRORS.inc(graph=self.graph_name, node=info["node"])
+
+    def on_tool_start(self, serialized, input_str, *, run_id, inputs=None, **kwargs) -> None:
+        tool = kwargs.get("name") or (serialized or {}).get("name") or "unknown"
+        TOOL_PAYLOAD.observe(
+            _payload_size(inputs if inputs is not None else input_str),
+            graph=self.graph_name, tool=tool, direction="input",
+        )
+        self._timer.start(run_id, tool=tool)
+
+    def on_tool_end(self, output, *, run_id, **kwargs) -> None:
+        elapsed, info = self._timer.stop(run_id)
+        if elapsed is not None:
+            TOOL_DURATION.observe(elapsed, graph=self.graph_name, tool=info["tool"])
+            TOOL_PAYLOAD.observe(
+                _payload_size(output), graph=self.graph_name, tool=info["tool"], direction="output",
+            )
+
+    def on_tool_error(self, error, *, run_id, **kwargs) -> None:
+        elapsed, info = self._timer.stop(run_id)
+        if elapsed is not None:
+            TOOL_DURATION.observe(elapsed, graph=self.graph_name, tool=info["tool"])
+            TOOL_ERRORS.inc(graph=self.graph_name, tool=info["tool"])
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Records TTFT, duration, throughput and token usage of one chat model."""
+
+    run_inline = True
+
+    def __init__(self, provider: str, model: str):
+        self.labels = {"provider": provider, "model": model or ""}
+        # run_id -> [start, first token time, streamed chunk count]
+        self._runs: Dict[UUID, List[Any]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self._runs[run_id] = [time.perf_counter(), None, 0]
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs) -> None:
+        self._runs[run_id] = [time.perf_counter(), None, 0]
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs) -> None:
+        run = self._runs.get(run_id)
+        if run is None:
+            return
+        if run[1] is None:
+            run[1] = time.perf_counter()
+            LLM_TTFT.observe(run[1] - run[0], **self.labels)
+        run[2] += 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        now = time.perf_counter()
+        LLM_DURATION.observe(now - run[0], **self.labels)
+
+        usage = self._usage(response)
+        input_tokens = usage.get("input_tokens") or 0
+        output_tokens = usage.get("output_tokens") or run[2]
+        cached = (usage.get("input_token_details") or {}).get("cache_read") or 0
+        LLM_TOKENS.inc(input_tokens, type="input", **self.labels)
+        LLM_TOKENS.inc(output_tokens, type="output", **self.labels)
+        if cached:
+            LLM_TOKENS.inc(cached, type="cached", **self.labels)
+
+        if run[1] is not None and now > run[1] and output_tokens:
+            LLM_TOKENS_PER_SECOND.observe(output_tokens / (now - run[1]), **self.labels)
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        run = self._runs.pop(run_id, None)
+        if run is not None:
+            LLM_DURATION.observe(time.perf_counter() - run[0], **self.labels)
+            LLM_ERRORS.inc(**self.labels)
+
+    @staticmethod
+    def _usage(response: Any) -> Dict[str, Any]:
+        for generations in getattr(response, "generations", None) or []:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    return dict(usage)
+        return {}
+
+
+def instrument_graph(graph: Any, graph_name: str) -> Any:
+    """
+    Return the compiled graph with node and tool timing attached.
+
+    Returns the graph unchanged when METRICS=false.
+    """
+    if not is_metrics_enabled():
+        return graph
+    return graph.with_config(callbacks=[GraphMetricsHandler(graph_name)])
+
+
+def get_llm_metrics_handler(provider: str, model: str) -> Optional[LLMMetricsHandler]:
+    """Callback for a chat model client, or None when METRICS=false."""
+    if not is_metrics_enabled():
+        return None
+    return LLMMetricsHandler(provider, model)
@@ -0,0 +1,30 @@
+"""
+HTTP routes for the in-process metrics.
+
+Served by the LangGraph server through shared/http_app.py, so they read the
+registry of the same worker that runs the graphs:
+
+    GET  /learnplay/metrics          Prometheus text format (scrape target)
+    GET  /learnplay/metrics/summary  JSON with counts and p50/p95/p99
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from shared.metrics import registry
+
+router = APIRouter()
+
+
+@router.get("/learnplay/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        registry.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.get("/learnplay/metrics/summary")
+def metrics_summary() -> JSONResponse:
+    return JSONResponse(registry.summary())
+
@@ -0,0 +1,172 @@
+"""
+Speculative background computation with a bounded queue.
+
+A Prefetcher runs `compute(*args)` on a small worker pool ahead of the
+request that will need it and keeps the result under a caller-chosen key.
+When the request arrives, get() returns a finished result immediately, waits
+for one already running, or computes it inline and cancels queued work for
+the same group, which the user has since moved past.
+
+The queue is bounded: a burst of submissions cancels the oldest queued work
+instead of piling up behind the workers.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from .metrics import PREFETCH
+
+
+def is_prefetch_enabled() -> bool:
+    """Check whether background prefetching is switched on."""
+    return os.getenv("PREFETCH", "true").lower() not in ("0", "false", "no")
+
+
+class Prefetcher:
+    """
+    Keyed results of `compute`, filled in ahead of time by worker threads.
+
+    Args:
+        compute: Function to run; its result is stored under the submitted key
+        name: Label for logs, metrics and worker thread names
+        workers: Worker threads (PREFETCH_WORKERS)
+        max_pending: Submissions queued but not started (PREFETCH_QUEUE)
+        max_results: Finished results kept, least recently used dropped first
+    """
+
+    def __init__(
+        self,
+        compute: Callable[..., Any],
+        name: str,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_results: int = 1024,
+    ):
+        self.compute = compute
+        self.name = name
+        self.workers = workers or int(os.getenv("PREFETCH_WORKERS", "2"))
+        self.max_pending = max_pending or int(os.getenv("PREFETCH_QUEUE", "32"))
+        self.max_results = max_results
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._results: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._futures: Dict[Hashable, Future] = {}
+        # Submitted but not started, oldest first (an ordered set)
+        self._queued: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._group_of: Dict[Hashable, Hashable] = {}
+        self._groups: Dict[Hashable, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, *args: Any, group: Optional[Hashable] = None) -> bool:
+        """
+        Queue compute(*args) under key unless it is done or in flight.
+
+        A submission supersedes queued work in the same group (e.g. an older
+        grid of the same puzzle). Returns True if work was queued.
+        """
+        if not is_prefetch_enabled():
+            return False
+        with self._lock:
+            if key in self._results or key in self._futures:
+                return False
+            if group is not None:
+                self._cancel_group(group, keep=key)
+            while len(self._queued) >= self.max_pending:
+                # Newer states are likelier to be asked for than old ones
+                if not self._cancel(next(iter(self._queued)), "dropped"):
+                    PREFETCH.inc(name=self.name, outcome="dropped")
+                    return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=f"{self.name}-prefetch"
+                )
+            self._queued[key] = None
+            if group is not None:
+                self._group_of[key] = group
+                self._groups.setdefault(group, set()).add(key)
+            self._futures[key] = self._executor.submit(self._run, key, args)
+        PREFETCH.inc(name=self.name, outcome="submitted")
+        return True
+
+    def get(self, key: Hashable, *args: Any, group: Optional[Hashable] = None) -> Any:
+        """Result for key: cached, awaited if already running, else computed now."""
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                PREFETCH.inc(name=self.name, outcome="hit")
+                return self._results[key]
+            future = self._futures.get(key)
+            if future is not None and key in self._queued:
+                # Still waiting for a worker: quicker to compute it here
+                future = None if self._cancel(key, "cancelled") else future
+            if group is not None:
+                self._cancel_group(group, keep=key)
+
+        if future is not None:
+            try:
+                value = future.result()
+                PREFETCH.inc(name=self.name, outcome="wait")
+                return value
+            except Exception:
+                pass
+
+        PREFETCH.inc(name=self.name, outcome="miss")
+        value = self.compute(*args)
+        self._store(key, value)
+        return value
+
+    def _run(self, key: Hashable, args: tuple) -> Any:
+        with self._lock:
+            self._queued.pop(key, None)
+            self._release_group(key)
+        try:
+            value = self.compute(*args)
+        except Exception as e:
+            print(f"[WARNING] {self.name} prefetch failed: {e}")
+            with self._lock:
+                self._futures.pop(key, None)
+            raise
+        self._store(key, value)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._futures.pop(key, None)
+            self._results[key] = value
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def _cancel(self, key: Hashable, outcome: str) -> bool:
+        """Cancel queued work for key; False if a worker has already started it."""
+        future = self._futures.get(key)
+        if future is None or not future.cancel():
+            return False
+        self._futures.pop(key, None)
+        self._queued.pop(key, None)
+        self._release_group(key)
+        PREFETCH.inc(name=self.name, outcome=outcome)
+        return True
+
+    def _cancel_group(self, group: Hashable, keep: Hashable) -> None:
+        for key in list(self._groups.get(group, ())):
+            if key != keep:
+                self._cancel(key, "cancelled")
+
+    def _release_group(self, key: Hashable) -> None:
+        group = self._group_of.pop(key, None)
+        if group is not None:
+            keys = self._groups.get(group)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._groups[group]
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._queued):
+                self._cancel(key, "cancelled")
+            self._results.clear()
@@ -0,0 +1,171 @@
+"""
+Provider-side prompt caching for the large static system prompts.
+
+The Sudoku and Chess system prompts plus their tool schemas are several
+thousand tokens and identical on every turn. PromptCacheMiddleware keeps that
+prefix byte-stable (system prompt first, tools in a fixed order) so providers
+can serve it from their prompt cache:
+
+- Anthropic: explicit cache_control breakpoints on the tool schemas, the
+  system prompt and the latest message.
+- OpenAI / Azure OpenAI: prefix caching is automatic; a per-agent
+  prompt_cache_key keeps an agent's requests on the same cache.
+
+Cached-token counts are logged for every call and summed per agent.
+"""
+
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.messages import AIMessage, SystemMessage
+
+
+def is_prompt_cache_enabled() -> bool:
+    """Prompt caching is on unless PROMPT_CACHE=false."""
+    return os.getenv("PROMPT_CACHE", "true").lower() not in ("0", "false", "no")
+
+
+def _cache_control() -> Dict[str, str]:
+    # "5m" (default) or "1h"; the 1h cache costs more to write
+    return {"type": "ephemeral", "ttl": os.getenv("PROMPT_CACHE_TTL", "5m")}
+
+
+def _tool_name(tool: Any) -> str:
+    if isinstance(tool, dict):
+        return tool.get("function", {}).get("name") or tool.get("name") or ""
+    return getattr(tool, "name", "")
+
+
+def _provider(model: Any) -> Optional[str]:
+    # Match on class name so no provider SDK is imported just to check
+    return {
+        "ChatAnthropic": "anthropic",
+        "ChatOpenAI": "openai",
+        "AzureChatOpenAI": "azure-openai",
+    }.get(type(model).__name__)
+
+
+# Per-agent token counters, shared by all graphs in the worker
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+class PromptCacheMiddleware(AgentMiddleware):
+    """
+    Marks the static prompt prefix as cacheable and reports cache usage.
+
+    Place it last in the middleware list so it sees the final tool list,
+    including the frontend tools added by CopilotKitMiddleware.
+    """
+
+    def __init__(self, agent_name: str):
+        super().__init__()
+        self.agent_name = agent_name
+
+    @property
+    def name(self) -> str:
+        return f"PromptCacheMiddleware[{self.agent_name}]"
+
+    def _prepare(self, request: ModelRequest) -> ModelRequest:
+        if not is_prompt_cache_enabled():
+            return request
+
+        # Frontend tools arrive in registration order; sort so the
+        # tools block of the prompt is identical on every call
+        tools = sorted(request.tools, key=_tool_name)
+        provider = _provider(request.model)
+
+        if provider == "anthropic":
+            return request.override(
+                tools=self._anthropic_tools(tools),
+                system_message=self._anthropic_system(request.system_message),
+                # Also caches the conversation so far for the next turn
+                model_settings={**request.model_settings, "cache_control": _cache_control()},
+            )
+
+        if provider == "openai":
+            return request.override(
+                tools=tools,
+                model_settings={
+                    "prompt_cache_key": f"learnplay-{self.agent_name}",
+                    **request.model_settings,
+                },
+            )
+
+        return request.override(tools=tools)
+
+    @staticmethod
+    def _anthropic_tools(tools: List[Any]) -> List[Any]:
+        if not tools:
+            return tools
+        from langchain_anthropic.chat_models import convert_to_anthropic_tool
+
+        # Breakpoint on the last tool caches every tool schema
+        last = dict(convert_to_anthropic_tool(tools[-1]))
+        last["cache_control"] = _cache_control()
+        return [*tools[:-1], last]
+
+    @staticmethod
+    def _anthropic_system(system: Optional[SystemMessage]) -> Optional[SystemMessage]:
+        if system is None or not isinstance(system.content, str):
+            return system
+        # Tools come before the system prompt, so this covers both
+        return SystemMessage(content=[{
+            "type": "text",
+            "text": system.content,
+            "cache_control": _cache_control(),
+        }])
+
+    def _report(self, response: Any) -> None:
+        if isinstance(response, ModelResponse):
+            messages = response.result
+        else:
+            messages = [response]
+
+        for message in messages:
+            if not isinstance(message, AIMessage) or not message.usage_metadata:
+                continue
+            usage = message.usage_metadata
+            details = usage.get("input_token_details") or {}
+            input_tokens = usage.get("input_tokens") or 0
+            cached = details.get("cache_read") or 0
+            written = details.get("cache_creation") or 0
+
+            with _stats_lock:
+                stats = _stats.setdefault(self.agent_name, {
+                    "calls": 0, "input_tokens": 0, "cached_tokens": 0, "cache_write_tokens": 0,
+                })
+                stats["calls"] += 1
+                stats["input_tokens"] += input_tokens
+                stats["cached_tokens"] += cached
+                stats["cache_write_tokens"] += written
+
+            percent = round(100 * cached / input_tokens) if input_tokens else 0
+            print(f"[PROMPT CACHE] {self.agent_name}: {input_tokens} input tokens, "
+                  f"{cached} cached ({percent}%), {written} written")
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        response = handler(self._prepare(request))
+        self._report(response)
+        return response
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        response = await handler(self._prepare(request))
+        self._report(response)
+        return response
+
+
+def get_prompt_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Input, cached and cache-write token totals per agent."""
+    with _stats_lock:
+        return {agent: dict(stats) for agent, stats in _stats.items()}
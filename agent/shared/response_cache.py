@@ -0,0 +1,306 @@
+"""
+Opt-in response cache in front of the chat model.
+
+Repeated tutoring questions ("How do I play Sudoku?", "explain naked single")
+are answered from memory instead of another LLM round-trip. Entries are keyed
+by agent, system prompt, tool set, relevant state, the live board and the
+normalized user message. Lookups try an exact match first, then an embedding-similarity match
+within the same agent/prompt/state partition that names the same numbers and
+squares.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.messages import AIMessage, HumanMessage
+
+from .base_state import readable
+from .embeddings import SparseVector, VectorIndex, embed_text, normalize_text, specific_tokens
+from .teaching_tools import is_continuation
+
+
+def is_response_cache_enabled() -> bool:
+    """Check whether the response cache is switched on."""
+    return os.getenv("RESPONSE_CACHE", "false").lower() in ("1", "true", "yes")
+
+
+class ResponseCache:
+    """
+    Two-tier (exact + semantic) LRU cache with a per-entry TTL.
+
+    Each partition (agent, prompt hash, tools, state) has its own vector index,
+    so a similar question can never match an answer given in another context.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        similarity_threshold: Optional[float] = None,
+        embed: Callable[[str], SparseVector] = embed_text,
+    ):
+        self.max_entries = max_entries or int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+        self.similarity_threshold = similarity_threshold or float(
+            os.getenv("RESPONSE_CACHE_SIMILARITY", "0.9")
+        )
+        # Swap in a model-based embedder for paraphrase-level matching
+        self.embed = embed
+
+        self._entries: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        self._indexes: Dict[str, VectorIndex] = {}
+        self._lock = threading.Lock()
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+
+    @staticmethod
+    def _entry_key(partition: str, message: str) -> str:
+        return f"{partition}|{message}"
+
+    def get(self, partition: str, message: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Look up a cached response.
+
+        Returns:
+            (cached value, tier) where tier is "exact" or "semantic", or (None, None)
+        """
+        normalized = normalize_text(message)
+        now = time.monotonic()
+
+        with self._lock:
+            key = self._entry_key(partition, normalized)
+            value = self._get_live(key, now)
+            if value is not None:
+                self.hits["exact"] += 1
+                return value, "exact"
+
+            index = self._indexes.get(partition)
+            if index is not None and len(index):
+                matches = index.search(self.embed(normalized), k=1)
+                # Only rephrasings: the same numbers and squares, in the same order
+                if (matches and matches[0][1] >= self.similarity_threshold
+                        and specific_tokens(matches[0][0][len(partition) + 1:]) == specific_tokens(normalized)):
+                    value = self._get_live(matches[0][0], now)
+                    if value is not None:
+                        self.hits["semantic"] += 1
+                        return value, "semantic"
+
+            self.misses += 1
+            return None, None
+
+    def _get_live(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        # Caller holds self._lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, partition, value = entry
+        if expires_at < now:
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, partition: str, message: str, value: Dict[str, Any]) -> None:
+        """Store a response, evicting the least recently used entries if full."""
+        normalized = normalize_text(message)
+        key = self._entry_key(partition, normalized)
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, partition, value)
+            self._entries.move_to_end(key)
+            self._indexes.setdefault(partition, VectorIndex()).add(key, self.embed(normalized))
+
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: str) -> None:
+        # Caller holds self._lock
+        _, partition, _ = self._entries.pop(key)
+        index = self._indexes.get(partition)
+        if index is not None:
+            index.remove(key)
+            if not len(index):
+                del self._indexes[partition]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._indexes.clear()
+
+
+# Shared by all graphs in the worker
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the shared response cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+def _tool_name(tool: Any) -> str:
+    if isinstance(tool, dict):
+        return tool.get("function", {}).get("name") or tool.get("name") or ""
+    return getattr(tool, "name", "")
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCacheMiddleware(AgentMiddleware):
+    """
+    Serves fresh user turns from the shared ResponseCache when enabled.
+
+    Only model calls whose latest message is a user message are cached;
+    calls that follow tool results depend on those results and always go
+    to the model.
+
+    Args:
+        agent_name: Agent the entries belong to
+        state_keys: State fields the answer depends on, matched by value
+        board_keys: State fields holding the board, matched by hash
+        board_readables: Descriptions of the frontend readables holding the
+            board, matched by hash. Answers replay their tool calls with the
+            board in the arguments, so they only match on the same board.
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        state_keys: Sequence[str] = (),
+        board_keys: Sequence[str] = (),
+        board_readables: Sequence[str] = (),
+    ):
+        super().__init__()
+        self.agent_name = agent_name
+        self.state_keys = tuple(state_keys)
+        self.board_keys = tuple(board_keys)
+        self.board_readables = tuple(board_readables)
+
+    @property
+    def name(self) -> str:
+        return f"ResponseCacheMiddleware[{self.agent_name}]"
+
+    def _lookup_key(self, request: ModelRequest) -> Optional[Tuple[str, str]]:
+        if not is_response_cache_enabled() or not request.messages:
+            return None
+        if request.response_format is not None:
+            return None
+
+        last = request.messages[-1]
+        if not isinstance(last, HumanMessage) or not isinstance(last.content, str):
+            return None
+        # Meaning depends on lesson progress, not on the wording
+        if is_continuation(last.content):
+            return None
+
+        state = request.state or {}
+        state_part = "|".join(f"{k}={state.get(k)!r}" for k in self.state_keys)
+        tools_part = ",".join(sorted(_tool_name(t) for t in request.tools))
+        board = [state.get(k) for k in self.board_keys]
+        board += [readable(state, description) for description in self.board_readables]
+        partition = "|".join([
+            self.agent_name,
+            _hash(request.system_prompt or ""),
+            _hash(tools_part),
+            state_part,
+            _hash(json.dumps(board, sort_keys=True, default=str)),
+        ])
+        return partition, last.content
+
+    @staticmethod
+    def _to_response(value: Dict[str, Any], tier: str) -> ModelResponse:
+        # Fresh tool call ids so replayed calls never collide with earlier ones
+        tool_calls = [
+            {**call, "id": f"call_{uuid.uuid4().hex[:24]}"} for call in value["tool_calls"]
+        ]
+        message = AIMessage(
+            content=value["content"],
+            tool_calls=tool_calls,
+            response_metadata={"response_cache": tier},
+        )
+        return ModelResponse(result=[message])
+
+    @staticmethod
+    def _to_value(response: ModelResponse) -> Optional[Dict[str, Any]]:
+        if response.structured_response is not None or len(response.result) != 1:
+            return None
+        message = response.result[0]
+        if not isinstance(message, AIMessage) or message.invalid_tool_calls:
+            return None
+        return {
+            "content": message.content,
+            "tool_calls": [
+                {"name": call["name"], "args": call["args"], "type": "tool_call"}
+                for call in message.tool_calls
+            ],
+        }
+
+    def _store(self, lookup: Tuple[str, str], response: Any) -> None:
+        if isinstance(response, AIMessage):
+            response = ModelResponse(result=[response])
+        if isinstance(response, ModelResponse):
+            value = self._to_value(response)
+            if value is not None:
+                get_response_cache().put(lookup[0], lookup[1], value)
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        lookup = self._lookup_key(request)
+        if lookup is None:
+            return handler(request)
+
+        value, tier = get_response_cache().get(*lookup)
+        if value is not None:
+            return self._to_response(value, tier)
+
+        response = handler(request)
+        self._store(lookup, response)
+        return response
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        lookup = self._lookup_key(request)
+        if lookup is None:
+            return await handler(request)
+
+        value, tier = get_response_cache().get(*lookup)
+        if value is not None:
+            return self._to_response(value, tier)
+
+        response = await handler(request)
+        self._store(lookup, response)
+        return response
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for the shared response cache."""
+    cache = get_response_cache()
+    return {
+        "exact_hits": cache.hits["exact"],
+        "semantic_hits": cache.hits["semantic"],
+        "misses": cache.misses,
+        "entries": len(cache),
+    }
@@ -66,3 +66,28 @@ def format_progress_percentage(current: int, total: int) -> float:
         return 0.0
     
     return min(100.0, (current / total) * 100.0)
+
+
+# "Next Step" button text and common free-typed equivalents
+CONTINUATION_PHRASES = {
+    "continue",
+    "next",
+    "next step",
+    "continue to the next step",
+    "go on",
+    "keep going",
+}
+
+
+def is_continuation(message: str) -> bool:
+    """
+    Check whether a user message just asks to advance the current lesson.
+    
+    Args:
+        message: Raw user message
+        
+    Returns:
+        True if the message is a "continue"/"next step" request
+    """
+    normalized = " ".join("".join(ch for ch in message.lower() if ch.isalnum() or ch.isspace()).split())
+    return normalized in CONTINUATION_PHRASES
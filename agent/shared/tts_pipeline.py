@@ -0,0 +1,403 @@
+"""
+Sentence-level TTS pipelining for streamed assistant text.
+
+Streamed tokens are split into sentences as they arrive, each finished
+sentence is sent to TTS right away, and the resulting audio clips are
+delivered strictly in sentence order. Only a limited number of sentences
+are synthesized ahead of the one being delivered.
+
+Chunks are sent as LangChain custom events named "tts_chunk" and "tts_end";
+the CopilotKit runtime forwards them to the page as CUSTOM events, where
+useStreamedSpeech plays them. The model call does not return until the last
+chunk has been sent: events dispatched after the node finishes are dropped.
+"""
+
+import asyncio
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, SystemMessage
+
+# Sentence terminator followed by whitespace (closing quotes/brackets allowed)
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+|\n{2,}|\n(?=\s*(?:[-*]|\d+\.)\s)")
+
+# Words ending in '.' that do not end a sentence
+_ABBREVIATIONS = {"e.g.", "i.e.", "etc.", "vs.", "mr.", "mrs.", "ms.", "dr.", "st.", "no."}
+
+# Markdown noise that should not be read aloud
+_MARKDOWN = re.compile(r"[*_`#>]+")
+
+# Shared synthesis workers (bounded across all pipelines in this process)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("TTS_PIPELINE_WORKERS", "4")),
+                thread_name_prefix="tts-pipeline",
+            )
+        return _executor
+
+
+class SentenceSplitter:
+    """Incrementally splits streamed text into complete sentences."""
+
+    def __init__(self, min_chars: int = 12):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add streamed text and return any sentences completed by it.
+
+        Args:
+            text: Next chunk of streamed text
+
+        Returns:
+            List of complete, cleaned sentences (may be empty)
+        """
+        self._buffer += text
+        sentences = []
+        start = 0
+
+        for match in _SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()]
+            last_word = candidate.split()[-1].lower() if candidate.split() else ""
+            if last_word in _ABBREVIATIONS:
+                continue
+            # Merge very short fragments ("Hi!") into the next sentence
+            if len(candidate.strip()) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+
+        self._buffer = self._buffer[start:]
+        return [s for s in (_clean(s) for s in sentences) if s]
+
+    def flush(self) -> Optional[str]:
+        """Return whatever text remains at the end of the stream."""
+        remainder = _clean(self._buffer)
+        self._buffer = ""
+        return remainder or None
+
+
+def _tool_name(tool: Any) -> str:
+    if isinstance(tool, dict):
+        return tool.get("function", {}).get("name") or tool.get("name") or ""
+    return getattr(tool, "name", "")
+
+
+def _clean(text: str) -> str:
+    return " ".join(_MARKDOWN.sub("", text).split())
+
+
+class SpeechPipeline:
+    """
+    Synthesizes sentences concurrently and delivers audio in order.
+
+    At most `lookahead` sentences are synthesizing at once; later sentences
+    wait in a queue so a long answer cannot flood the TTS provider.
+    """
+
+    def __init__(
+        self,
+        synthesize: Callable[[str], Optional[str]],
+        sink: Callable[[Dict[str, Any]], None],
+        lookahead: Optional[int] = None,
+        audio_format: str = "audio/mpeg",
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self.synthesize = synthesize
+        self.sink = sink
+        self.lookahead = max(1, lookahead or int(os.getenv("TTS_PIPELINE_LOOKAHEAD", "2")))
+        self.audio_format = audio_format
+        self._executor = executor or _get_executor()
+
+        self._lock = threading.Lock()
+        self._emit_lock = threading.Lock()
+        self._all_emitted = threading.Condition(self._lock)
+        self._waiting: Deque[Tuple[int, str]] = deque()
+        self._finished: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._in_flight = 0
+        self._submitted = 0
+        self._next_to_emit = 0
+
+    def submit(self, sentence: str) -> None:
+        """Queue a sentence for synthesis; returns immediately."""
+        with self._lock:
+            self._waiting.append((self._submitted, sentence))
+            self._submitted += 1
+            self._start_waiting()
+
+    def _start_waiting(self) -> None:
+        # Caller holds self._lock
+        while self._waiting and self._in_flight < self.lookahead:
+            index, sentence = self._waiting.popleft()
+            self._in_flight += 1
+            future = self._executor.submit(self.synthesize, sentence)
+            future.add_done_callback(
+                lambda f, i=index, s=sentence: self._on_done(i, s, f)
+            )
+
+    def _on_done(self, index: int, sentence: str, future: Future) -> None:
+        try:
+            audio = future.result()
+        except Exception as e:
+            print(f"[ERROR] TTS pipeline synthesis failed: {str(e)}")
+            audio = None
+
+        with self._lock:
+            self._finished[index] = (sentence, audio)
+            self._in_flight -= 1
+            self._start_waiting()
+
+        self._emit_ready()
+
+    def _emit_ready(self) -> None:
+        # The emit lock keeps chunks ordered when callbacks finish together
+        with self._emit_lock:
+            while True:
+                with self._lock:
+                    if self._next_to_emit not in self._finished:
+                        return
+                    index = self._next_to_emit
+                    sentence, audio = self._finished.pop(index)
+
+                try:
+                    self.sink({
+                        "type": "tts_chunk",
+                        "index": index,
+                        "text": sentence,
+                        "success": audio is not None,
+                        "audio": audio,
+                        "format": self.audio_format,
+                    })
+                except Exception as e:
+                    print(f"[ERROR] TTS pipeline sink failed: {str(e)}")
+
+                with self._lock:
+                    self._next_to_emit += 1
+                    self._all_emitted.notify_all()
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Wait until every submitted sentence has been delivered.
+
+        Returns:
+            True if all chunks were delivered before the timeout
+        """
+        with self._lock:
+            done = self._all_emitted.wait_for(
+                lambda: self._next_to_emit >= self._submitted, timeout=timeout
+            )
+        if done:
+            try:
+                self.sink({"type": "tts_end", "chunks": self._submitted})
+            except Exception as e:
+                print(f"[ERROR] TTS pipeline sink failed: {str(e)}")
+        return done
+
+
+def _new_run(
+    sink: Optional[Callable[[Dict[str, Any]], None]],
+) -> Optional[Tuple[SentenceSplitter, SpeechPipeline]]:
+    """Splitter and pipeline for one reply, or None when nothing can be spoken."""
+    from shared.tts_service import get_tts_service
+
+    tts_service = get_tts_service()
+    sink = sink or _current_event_sink()
+    if sink is None or not tts_service.is_available():
+        return None
+    return (
+        SentenceSplitter(),
+        SpeechPipeline(
+            tts_service.generate_speech,
+            sink,
+            audio_format=tts_service.audio_format,
+        ),
+    )
+
+
+def _current_event_sink() -> Optional[Callable[[Dict[str, Any]], None]]:
+    """
+    Return a sink that dispatches chunks as custom events of the running graph.
+
+    The run config is captured here, in the caller's context: pipeline
+    workers run outside it. LangGraph's stream writer is not used because
+    its output never reaches the event stream the frontend reads.
+    """
+    from langchain_core.callbacks import dispatch_custom_event
+    from langchain_core.runnables.config import ensure_config
+
+    config = ensure_config()
+    if not config.get("callbacks"):
+        return None
+    return lambda chunk: dispatch_custom_event(chunk["type"], chunk, config=config)
+
+
+class StreamingSpeechHandler(BaseCallbackHandler):
+    """
+    Callback handler that speaks assistant text while the model streams it.
+
+    Attach to a streaming chat model. Each model run gets its own splitter
+    and pipeline, so concurrent conversations never share audio state.
+    """
+
+    # Run inline so tokens are seen in stream order under async execution
+    run_inline = True
+
+    def __init__(self, sink: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.sink = sink
+        self._runs: Dict[UUID, Optional[Tuple[SentenceSplitter, SpeechPipeline]]] = {}
+        self._lock = threading.Lock()
+
+    def _get_run(self, run_id: UUID) -> Optional[Tuple[SentenceSplitter, SpeechPipeline]]:
+        with self._lock:
+            if run_id in self._runs:
+                return self._runs[run_id]
+
+            run = _new_run(self.sink)
+            self._runs[run_id] = run
+            return run
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        if not token:
+            return
+        run = self._get_run(run_id)
+        if run is None:
+            return
+        splitter, pipeline = run
+        for sentence in splitter.feed(token):
+            pipeline.submit(sentence)
+
+    # The end hooks are coroutines so LangChain awaits them before the model
+    # call returns (sync runs get them run to completion too) without
+    # blocking the event loop while the last sentences are synthesized.
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        await self._finish(run_id)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        await self._finish(run_id)
+
+    async def _finish(self, run_id: UUID) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        splitter, pipeline = run
+        remainder = splitter.flush()
+        if remainder:
+            pipeline.submit(remainder)
+        if not await asyncio.to_thread(pipeline.close):
+            print("[WARNING] TTS pipeline timed out before every sentence was spoken")
+
+
+def is_streaming_tts_enabled() -> bool:
+    """Check whether streamed-speech output is switched on."""
+    return os.getenv("TTS_STREAMING", "false").lower() in ("1", "true", "yes")
+
+
+def speak_text(text: str, sink: Optional[Callable[[Dict[str, Any]], None]] = None) -> bool:
+    """
+    Speak text that did not stream from a model (scripted lesson lines,
+    cached replies) through the same chunk events as streamed replies.
+
+    Call from inside the graph run. Blocks until every chunk has been sent.
+
+    Returns:
+        True if all chunks were delivered
+    """
+    run = _new_run(sink) if text else None
+    if run is None:
+        return False
+    splitter, pipeline = run
+    for sentence in splitter.feed(text):
+        pipeline.submit(sentence)
+    remainder = splitter.flush()
+    if remainder:
+        pipeline.submit(remainder)
+    return pipeline.close()
+
+
+async def aspeak_text(text: str, sink: Optional[Callable[[Dict[str, Any]], None]] = None) -> bool:
+    """Async speak_text; waits on a worker thread, which keeps the run context."""
+    return await asyncio.to_thread(speak_text, text, sink)
+
+
+_STREAMED_SPEECH_NOTE = """
+
+## Voice Output (overrides the voice instructions above)
+
+Your chat reply is read aloud automatically, sentence by sentence, while you
+write it. `speak_message` is not available: never call it. Wherever these
+instructions say to call `speak_message`, write those words into your reply
+instead, and keep replies short enough to listen to."""
+
+
+class StreamedSpeechMiddleware(AgentMiddleware):
+    """
+    Keeps replies from being spoken twice while TTS_STREAMING is on.
+
+    StreamingSpeechHandler already speaks the streamed reply, so the
+    frontend speak_message tool is taken out of the request and the system
+    prompt tells the model to write its narration into the reply. Response
+    cache hits, which are not streamed, are spoken here instead. Place it
+    before ResponseCacheMiddleware so cache entries are keyed by the
+    trimmed tool set.
+    """
+
+    @property
+    def name(self) -> str:
+        return "StreamedSpeechMiddleware"
+
+    def _prepare(self, request: ModelRequest) -> ModelRequest:
+        tools = [t for t in request.tools if _tool_name(t) != "speak_message"]
+        system = request.system_message
+        if system is not None and isinstance(system.content, str):
+            system = SystemMessage(content=system.content + _STREAMED_SPEECH_NOTE)
+        return request.override(tools=tools, system_message=system)
+
+    @staticmethod
+    def _unstreamed_text(response: ModelResponse) -> Optional[str]:
+        messages = getattr(response, "result", None) or []
+        message = messages[-1] if messages else None
+        if not isinstance(message, AIMessage) or "response_cache" not in message.response_metadata:
+            return None
+        return message.text or None
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        if not is_streaming_tts_enabled():
+            return handler(request)
+        response = handler(self._prepare(request))
+        text = self._unstreamed_text(response)
+        if text:
+            speak_text(text)
+        return response
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        if not is_streaming_tts_enabled():
+            return await handler(request)
+        response = await handler(self._prepare(request))
+        text = self._unstreamed_text(response)
+        if text:
+            await aspeak_text(text)
+        return response
@@ -1,15 +1,22 @@
 """
-Text-to-Speech service using Eleven Labs API
+Text-to-Speech service with pluggable backends.
+Supports Eleven Labs (cloud) and local CPU engines (Piper, espeak-ng).
 """
 
+import io
+import multiprocessing
 import os
+import shutil
+import subprocess
 import sys
-import requests
+import wave
 import base64
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
-from dotenv import load_dotenv
-
-load_dotenv()
+from .env import load_env
+from .metrics import TTS_DURATION, TTS_ERRORS, TTS_TEXT
 
 # Fix Windows console encoding issues
 if sys.platform == "win32":
@@ -19,76 +26,285 @@ if sys.platform == "win32":
     except Exception:
         pass  # Ignore if reconfigure not available
 
-class TTSService:
-    """Service for generating speech from text using Eleven Labs"""
-    
+
+class TTSBackend:
+    """Base class for speech synthesis backends"""
+
+    name = "none"
+    audio_format = "audio/mpeg"
+
+    def is_available(self) -> bool:
+        return False
+
+    def synthesize(self, text: str) -> Optional[bytes]:
+        """Return raw audio bytes for the text, or None on failure."""
+        return None
+
+
+class ElevenLabsBackend(TTSBackend):
+    """Cloud speech synthesis through the Eleven Labs API"""
+
+    name = "elevenlabs"
+    audio_format = "audio/mpeg"
+
     def __init__(self):
         self.api_key = os.getenv("ELEVENLABS_API_KEY")
         self.voice_id = os.getenv("ELEVENLABS_VOICE_ID", "JBFqnCBsd6RMkjVDRZzb")
-        self.base_url = "https://api.elevenlabs.io/v1"
-        
+        self.base_url = os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io/v1")
+
         if not self.api_key:
             print("[WARNING] ELEVENLABS_API_KEY not set. TTS will be disabled.")
-    
+
+    def is_available(self) -> bool:
+        return self.api_key is not None
+
+    def synthesize(self, text: str) -> Optional[bytes]:
+        import requests
+
+        url = f"{self.base_url}/text-to-speech/{self.voice_id}"
+
+        headers = {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json",
+            "xi-api-key": self.api_key
+        }
+
+        payload = {
+            "text": text,
+            "model_id": "eleven_multilingual_v2",
+            "output_format": "mp3_44100_128",
+            "voice_settings": {
+                "stability": 0.5,
+                "similarity_boost": 0.75
+            }
+        }
+
+        response = requests.post(url, json=payload, headers=headers, timeout=30)
+
+        if response.status_code == 200:
+            return response.content
+
+        print(f"[ERROR] Eleven Labs API error: {response.status_code}")
+        try:
+            error_data = response.json()
+            print(f"   Error details: {error_data}")
+        except Exception:
+            print(f"   Response: {response.text[:200]}")
+        return None
+
+
+# Per-process state for local synthesis workers
+_worker_engine: Optional[str] = None
+_worker_voice = None
+
+
+def _init_local_worker(engine: str, model_path: Optional[str]) -> None:
+    """Load the voice model once when a worker process starts."""
+    global _worker_engine, _worker_voice
+    _worker_engine = engine
+
+    if engine == "piper":
+        from piper import PiperVoice
+        _worker_voice = PiperVoice.load(model_path)
+
+
+def _local_synthesize(text: str, espeak_voice: str) -> bytes:
+    """Synthesize WAV audio inside a worker process."""
+    if _worker_engine == "piper":
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            # piper-tts >= 1.3 renamed synthesize() to synthesize_wav()
+            if hasattr(_worker_voice, "synthesize_wav"):
+                _worker_voice.synthesize_wav(text, wav_file)
+            else:
+                _worker_voice.synthesize(text, wav_file)
+        return buffer.getvalue()
+
+    result = subprocess.run(
+        ["espeak-ng", "--stdout", "-v", espeak_voice, text],
+        capture_output=True,
+        timeout=10,
+        check=True,
+    )
+    return result.stdout
+
+
+class LocalTTSBackend(TTSBackend):
+    """
+    CPU-only speech synthesis with no network access.
+
+    Runs a small pool of worker processes; each loads the voice model once
+    at startup so a request only pays for synthesis, not model loading.
+    """
+
+    audio_format = "audio/wav"
+
+    def __init__(self, engine: str):
+        self.name = engine
+        self.model_path = os.getenv("PIPER_MODEL_PATH")
+        self.espeak_voice = os.getenv("ESPEAK_VOICE", "en-us")
+        self.workers = int(os.getenv("TTS_LOCAL_WORKERS", "2"))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._available = self._check_engine()
+
+    def _check_engine(self) -> bool:
+        if self.name == "piper":
+            try:
+                import piper  # noqa: F401
+            except ImportError:
+                print("[WARNING] piper-tts not installed. TTS will be disabled.")
+                return False
+            if not self.model_path or not os.path.exists(self.model_path):
+                print("[WARNING] PIPER_MODEL_PATH not set or missing. TTS will be disabled.")
+                return False
+            return True
+
+        if shutil.which("espeak-ng") is None:
+            print("[WARNING] espeak-ng not found on PATH. TTS will be disabled.")
+            return False
+        return True
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # Spawned, not forked: the server process runs threads
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_local_worker,
+                    initargs=(self.name, self.model_path),
+                )
+            return self._pool
+
+    def warm_up(self) -> None:
+        """Start the workers and load models ahead of the first request."""
+        if not self._available:
+            return
+        pool = self._get_pool()
+        futures = [pool.submit(_local_synthesize, "ready", self.espeak_voice)
+                   for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def is_available(self) -> bool:
+        return self._available
+
+    def synthesize(self, text: str) -> Optional[bytes]:
+        future = self._get_pool().submit(_local_synthesize, text, self.espeak_voice)
+        return future.result(timeout=30)
+
+
+def get_tts_backend() -> TTSBackend:
+    """
+    Get the configured TTS backend based on the TTS_PROVIDER env var.
+    Supports elevenlabs (default), piper, espeak and none.
+    """
+    provider = os.getenv("TTS_PROVIDER", "elevenlabs").lower()
+
+    if provider == "elevenlabs":
+        return ElevenLabsBackend()
+    elif provider in ("piper", "espeak"):
+        return LocalTTSBackend(provider)
+    elif provider == "none":
+        return TTSBackend()
+    else:
+        raise ValueError(f"Unsupported TTS provider: {provider}")
+
+
+class TTSService:
+    """Service for generating speech from text using the configured backend"""
+
+    def __init__(self, backend: Optional[TTSBackend] = None):
+        self.backend = backend or get_tts_backend()
+
+    @property
+    def audio_format(self) -> str:
+        """MIME type of the audio produced by the active backend"""
+        return self.backend.audio_format
+
     def generate_speech(self, text: str) -> Optional[str]:
         """
         Generate speech from text and return base64 encoded audio.
-        
+
         Args:
             text: The text to convert to speech
-            
+
         Returns:
             Base64 encoded audio string, or None if generation failed
         """
-        if not self.api_key:
-            print("[WARNING] TTS disabled: No API key")
+        if not self.backend.is_available():
+            print("[WARNING] TTS disabled: No backend available")
             return None
-        
+
         if not text or len(text.strip()) == 0:
             return None
-        
+
+        start = time.perf_counter()
         try:
-            url = f"{self.base_url}/text-to-speech/{self.voice_id}"
-            
-            headers = {
-                "Accept": "audio/mpeg",
-                "Content-Type": "application/json",
-                "xi-api-key": self.api_key
-            }
-            
-            payload = {
-                "text": text,
-                "model_id": "eleven_multilingual_v2",
-                "output_format": "mp3_44100_128",
-                "voice_settings": {
-                    "stability": 0.5,
-                    "similarity_boost": 0.75
-                }
-            }
-            
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                # Encode audio as base64
-                audio_base64 = base64.b64encode(response.content).decode('utf-8')
-                print(f"[OK] Generated speech for: {text[:50]}...")
-                return audio_base64
-            else:
-                print(f"[ERROR] Eleven Labs API error: {response.status_code}")
-                try:
-                    error_data = response.json()
-                    print(f"   Error details: {error_data}")
-                except Exception:
-                    print(f"   Response: {response.text[:200]}")
+            audio = self.backend.synthesize(text)
+            if not audio:
+                TTS_ERRORS.inc(backend=self.backend.name)
                 return None
-                
+
+            # Encode audio as base64
+            audio_base64 = base64.b64encode(audio).decode('utf-8')
+            print(f"[OK] Generated speech for: {text[:50]}...")
+            return audio_base64
+
         except Exception as e:
+            TTS_ERRORS.inc(backend=self.backend.name)
             print(f"[ERROR] TTS generation error: {str(e)}")
             return None
-    
+
+        finally:
+            TTS_DURATION.observe(time.perf_counter() - start, backend=self.backend.name)
+            TTS_TEXT.observe(len(text), backend=self.backend.name)
+
     def is_available(self) -> bool:
         """Check if TTS service is available"""
-        return self.api_key is not None
+        return self.backend.is_available()
+
+# Global TTS service instance, created on first use
+_tts_service: Optional[TTSService] = None
+_tts_service_lock = threading.Lock()
+
+
+def get_tts_service() -> TTSService:
+    """Get the shared TTS service, creating it on first use."""
+    global _tts_service
+    if _tts_service is None:
+        with _tts_service_lock:
+            if _tts_service is None:
+                load_env()
+                _tts_service = TTSService()
+    return _tts_service
+
+
+def warm_up_tts() -> None:
+    """
+    Start the local TTS workers and load their voice models, so the first
+    speech request doesn't pay for it. Does nothing for cloud backends.
+    """
+    load_env()
+    if os.getenv("TTS_PROVIDER", "elevenlabs").lower() not in ("piper", "espeak"):
+        return
+    backend = get_tts_service().backend
+    if not isinstance(backend, LocalTTSBackend):
+        return
+    start = time.perf_counter()
+    try:
+        backend.warm_up()
+    except Exception as e:
+        print(f"[WARNING] TTS warm-up failed: {e}")
+        return
+    if backend.is_available():
+        print(f"[OK] {backend.name} TTS workers ready in {time.perf_counter() - start:.1f}s")
+
 
-# Global TTS service instance
-tts_service = TTSService()
+def __getattr__(name: str):
+    # Keep `from shared.tts_service import tts_service` working without
+    # building the service at import time
+    if name == "tts_service":
+        return get_tts_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
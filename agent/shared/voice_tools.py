@@ -4,12 +4,12 @@ Voice-enabled tools that generate audio for frontend playback
 
 from typing import Dict, Any
 from langchain.tools import tool
-from .tts_service import tts_service
+from .tts_service import get_tts_service
 
 @tool
 def speak_message(message: str) -> Dict[str, Any]:
     """
-    Generate speech audio for a message using Eleven Labs TTS.
+    Generate speech audio for a message using the configured TTS backend.
     The audio will be played automatically on the frontend.
     
     Args:
@@ -24,6 +24,7 @@ def speak_message(message: str) -> Dict[str, Any]:
             "error": "Empty message"
         }
     
+    tts_service = get_tts_service()
     if not tts_service.is_available():
         return {
             "success": False,
@@ -38,7 +39,7 @@ def speak_message(message: str) -> Dict[str, Any]:
             "success": True,
             "audio": audio_base64,
             "message": message,
-            "format": "audio/mpeg"
+            "format": tts_service.audio_format
         }
     else:
         return {
@@ -0,0 +1,19 @@
+import { NextRequest, NextResponse } from 'next/server';
+
+const deploymentUrl = process.env.LANGGRAPH_DEPLOYMENT_URL || 'http://127.0.0.1:8123';
+
+// Forwards the grid after each move so the agent can compute the next hint
+// before it is asked for. Best effort: failures never reach the player.
+export async function POST(request: NextRequest) {
+  try {
+    const response = await fetch(`${deploymentUrl}/learnplay/sudoku/prefetch`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: await request.text(),
+    });
+    return NextResponse.json(await response.json(), { status: response.status });
+  } catch (error) {
+    console.warn('[WARNING] Hint prefetch unavailable:', error);
+    return NextResponse.json({ queued: false }, { status: 200 });
+  }
+}
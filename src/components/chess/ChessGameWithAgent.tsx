@@ -9,6 +9,7 @@ import { MoveHistory } from './MoveHistory';
 import { GameControls } from './GameControls';
 import { ChessTeachingProgress } from './ChessTeachingProgress';
 import { ChessEngine } from '@/lib/chess/engine';
+import { useStreamedSpeech } from '@/lib/hooks/useStreamedSpeech';
 import type { Square } from '@/lib/chess/types';
 
 export function ChessGameWithAgent() {
@@ -30,6 +31,9 @@ export function ChessGameWithAgent() {
 
   const { appendMessage, isLoading } = useCopilotChat();
 
+  // Plays replies sentence by sentence when the agent runs with TTS_STREAMING
+  useStreamedSpeech();
+
   // Provide readable context
   useCopilotReadable({
     description: 'Current page information for agent routing',
@@ -19,7 +19,7 @@ interface SudokuGameProps {
   initialDifficulty?: Difficulty;
   annotations?: CellAnnotation[];
   annotationMessage?: string;
-  onGridChange?: (grid: (number | null)[][]) => void;
+  onGridChange?: (grid: (number | null)[][], fixedCells: boolean[][]) => void;
   externalCellUpdate?: ExternalCellUpdate | null;
 }
 
@@ -61,7 +61,7 @@ export function SudokuGame({ initialDifficulty = 'medium', annotations = [], ann
   // Notify parent when grid changes
   useEffect(() => {
     if (mounted && onGridChange) {
-      onGridChange(gameState.grid);
+      onGridChange(gameState.grid, gameState.fixedCells);
     }
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [gameState.grid, mounted]);
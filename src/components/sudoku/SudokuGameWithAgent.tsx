@@ -7,8 +7,7 @@ import { MessageRole, TextMessage } from '@copilotkit/runtime-client-gql';
 import { SudokuGame } from '@/components/sudoku/SudokuGame';
 import { TeachingProgress } from '@/components/TeachingProgress';
 import { useVoiceMode } from '@/lib/hooks/useVoiceMode';
-import { analyzeStrategies, findConflicts } from '@/lib/sudoku/solver';
-import type { SudokuGrid } from '@/lib/sudoku/types';
+import { useStreamedSpeech } from '@/lib/hooks/useStreamedSpeech';
 import type { CellAnnotation } from '@/lib/sudoku/annotations';
 
 type GameMode = 'play' | 'teach' | 'practice';
@@ -22,10 +21,14 @@ interface ExternalCellUpdate {
 
 export default function SudokuGameWithAgent() {
   const voice = useVoiceMode();
+  // Plays replies sentence by sentence when the agent runs with TTS_STREAMING
+  useStreamedSpeech();
   const [gameMode, setGameMode] = useState<GameMode>('play');
   const [annotations, setAnnotations] = useState<CellAnnotation[]>([]);
   const [annotationMessage, setAnnotationMessage] = useState<string>('');
   const [currentGrid, setCurrentGrid] = useState<(number | null)[][]>([]);
+  // The puzzle's starting numbers as 81 digits (0 = empty); the agent caches its solve path by it
+  const [puzzle, setPuzzle] = useState<string>('');
   const prevGridRef = useRef<string>('');
   
   // State for AI-controlled cell placement
@@ -66,6 +69,7 @@ export default function SudokuGameWithAgent() {
     description: 'Current state of the Sudoku grid',
     value: currentGrid.length > 0 ? {
       grid: currentGrid,
+      puzzle,
       hasGrid: true,
       gridSize: '9x9'
     } : {
@@ -74,6 +78,12 @@ export default function SudokuGameWithAgent() {
     },
   });
 
+  // Provide the user's last placement so get_next_solving_move can check it for conflicts
+  useCopilotReadable({
+    description: 'Last number the user placed on the Sudoku grid',
+    value: lastUserMove,
+  });
+
   // Log initialization
   useEffect(() => {
     console.log('[Agent] Sudoku page initialized with agent: sudoku_agent');
@@ -99,21 +109,33 @@ export default function SudokuGameWithAgent() {
   }, [currentGrid]);
 
   // Handle grid changes - update agent state and track user moves
-  const handleGridChange = useCallback((newGrid: (number | null)[][]) => {
+  const handleGridChange = useCallback((newGrid: (number | null)[][], fixedCells: boolean[][]) => {
     // Detect what cell changed (for wrong-move analysis)
+    let placed: { row: number, col: number, value: number | null } | null = null;
     if (currentGrid.length > 0) {
       for (let r = 0; r < 9; r++) {
         for (let c = 0; c < 9; c++) {
           if (newGrid[r][c] !== currentGrid[r][c] && newGrid[r][c] !== null) {
             console.log('[User] Placed:', newGrid[r][c], 'at', r, c);
-            setLastUserMove({ row: r, col: c, value: newGrid[r][c] });
+            placed = { row: r, col: c, value: newGrid[r][c] };
+            setLastUserMove(placed);
             break;
           }
         }
       }
     }
     
+    const newPuzzle = newGrid.map((row, r) => row.map((value, c) => (fixedCells[r][c] && value) || 0).join('')).join('');
     setCurrentGrid(newGrid);
+    setPuzzle(newPuzzle);
+
+    // Let the agent work out the next hint while the player thinks
+    fetch('/api/sudoku/prefetch', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ grid: newGrid, puzzle: newPuzzle, last_move: placed }),
+    }).catch(() => {});
+
     // Clear annotations when user makes a move
     if (annotations.length > 0) {
       setAnnotations([]);
@@ -248,63 +270,6 @@ export default function SudokuGameWithAgent() {
     },
   });
 
-  // Frontend tool to get the next solving move (combines grid retrieval + analysis)
-  useFrontendTool({
-    name: 'getNextSolvingMove',
-    description: 'Analyze the current grid and return the next best cell to fill with explanation. Returns row, col, value, and explanation. Use this for step-by-step solving - much simpler than calling getCurrentGrid then suggest_next_move.',
-    parameters: [],
-    handler() {
-      console.log('[Solver] Analyzing grid for next move:', currentGrid);
-      
-      if (currentGrid.length === 0) {
-        return JSON.stringify({
-          has_suggestion: false,
-          message: 'No grid loaded yet. Please start a game first.'
-        });
-      }
-      
-      const strategies = analyzeStrategies(currentGrid as SudokuGrid);
-      
-      if (strategies.length === 0) {
-        return JSON.stringify({
-          has_suggestion: false,
-          message: 'No obvious moves found. The puzzle may need advanced techniques.'
-        });
-      }
-      
-      // Get the best strategy (first one found - naked singles are prioritized)
-      const bestMove = strategies[0];
-      const cell = bestMove.cells[0];
-      
-      // Generate explanation based on strategy type
-      let explanation = bestMove.description;
-      if (bestMove.strategy === 'naked_single') {
-        explanation = `This cell can only be ${bestMove.value} because all other numbers are already in its row, column, or box.`;
-      } else if (bestMove.strategy.includes('hidden_single')) {
-        explanation = `The number ${bestMove.value} can only go in this cell within its ${bestMove.strategy.includes('row') ? 'row' : bestMove.strategy.includes('col') ? 'column' : 'box'}.`;
-      }
-      
-      console.log('[Solver] Found move:', { row: cell.row, col: cell.col, value: bestMove.value, strategy: bestMove.strategy });
-      
-      return JSON.stringify({
-        has_suggestion: true,
-        row: cell.row,
-        col: cell.col,
-        value: bestMove.value,
-        strategy: bestMove.strategy,
-        explanation: explanation,
-        // Pre-formatted cells for highlightCells
-        highlightCells: [{
-          row: cell.row,
-          col: cell.col,
-          type: 'highlight',
-          color: 'green',
-          label: String(bestMove.value)
-        }]
-      });
-    },
-  });
-
   // Frontend tool for AI to place a number in a cell (for step-by-step solving)
   useFrontendTool({
     name: 'fillCell',
@@ -340,67 +305,6 @@ export default function SudokuGameWithAgent() {
       return `Placed ${value} at row ${row}, column ${col}`;
     },
   });
-  // Frontend tool for analyzing if user made a wrong move
-  useFrontendTool({
-    name: 'analyzeWrongMove',
-    description: 'Check if the user recently made a wrong move and explain why it conflicts. Call this BEFORE giving hints to provide better feedback. Returns conflicting cells with yellow (user cell) and red (conflict) highlights.',
-    parameters: [],
-    handler() {
-      console.log('[Analyzer] Analyzing for wrong moves, lastUserMove:', lastUserMove);
-      
-      if (!lastUserMove || lastUserMove.value === null) {
-        return JSON.stringify({
-          hasWrongMove: false,
-          message: 'No recent user move to analyze'
-        });
-      }
-      
-      const conflicts = findConflicts(
-        currentGrid as SudokuGrid,
-        lastUserMove.row,
-        lastUserMove.col,
-        lastUserMove.value
-      );
-      
-      if (conflicts.length > 0) {
-        console.log('[Analyzer] Found conflicts:', conflicts);
-        
-        // Build highlight cells: user's cell in yellow, conflicting cells in red
-        const highlightCells = [
-          {
-            row: lastUserMove.row,
-            col: lastUserMove.col,
-            type: 'highlight',
-            color: 'yellow',
-            label: String(lastUserMove.value)
-          },
-          ...conflicts.map(c => ({
-            row: c.conflictingCell.row,
-            col: c.conflictingCell.col,
-            type: 'highlight',
-            color: 'red',
-            label: String(lastUserMove.value)
-          }))
-        ];
-        
-        return JSON.stringify({
-          hasWrongMove: true,
-          row: lastUserMove.row,
-          col: lastUserMove.col,
-          value: lastUserMove.value,
-          conflicts: conflicts,
-          conflictType: conflicts[0].type,
-          explanation: conflicts[0].message,
-          highlightCells: highlightCells
-        });
-      }
-      
-      return JSON.stringify({
-        hasWrongMove: false,
-        message: 'The last move has no conflicts'
-      });
-    },
-  });
   // Frontend tool for AI to highlight cells (visual only - agent handles voice via speak_message)
   useFrontendTool({
     name: 'highlightCells',
@@ -0,0 +1,81 @@
+'use client';
+
+import { useEffect } from 'react';
+import { useAgent } from '@copilotkit/react-core/v2';
+
+// Payload of the "tts_chunk" custom events sent by the agent (agent/shared/tts_pipeline.py)
+interface SpeechChunk {
+  type: 'tts_chunk';
+  index: number;
+  text: string;
+  success: boolean;
+  audio: string | null;
+  format: string;
+}
+
+function speakWithBrowserTTS(text: string): Promise<void> {
+  return new Promise((resolve) => {
+    if (!('speechSynthesis' in window)) {
+      resolve();
+      return;
+    }
+    const utterance = new SpeechSynthesisUtterance(text);
+    utterance.rate = 0.9;
+    utterance.pitch = 1.0;
+    utterance.onend = () => resolve();
+    utterance.onerror = () => resolve();
+    window.speechSynthesis.speak(utterance);
+  });
+}
+
+function playChunk(chunk: SpeechChunk): Promise<void> {
+  if (!chunk.success || !chunk.audio) {
+    return speakWithBrowserTTS(chunk.text);
+  }
+
+  const bytes = Uint8Array.from(atob(chunk.audio), (c) => c.charCodeAt(0));
+  // The format is audio/mpeg for Eleven Labs and audio/wav for the local engines
+  const audioUrl = URL.createObjectURL(new Blob([bytes], { type: chunk.format }));
+  const audioElement = new Audio(audioUrl);
+
+  return new Promise((resolve) => {
+    const done = () => {
+      URL.revokeObjectURL(audioUrl);
+      resolve();
+    };
+    audioElement.onended = done;
+    audioElement.onerror = done;
+    audioElement.play().catch((error) => {
+      console.error('[Voice] Failed to play streamed speech:', error);
+      done();
+    });
+  });
+}
+
+/**
+ * Plays the speech the agent streams while it writes a reply (TTS_STREAMING=true).
+ *
+ * The agent sends one "tts_chunk" custom event per sentence, already in
+ * sentence order; each clip starts when the previous one ends.
+ */
+export function useStreamedSpeech() {
+  const { agent } = useAgent();
+
+  useEffect(() => {
+    let active = true;
+    let queue: Promise<void> = Promise.resolve();
+
+    const subscription = agent.subscribe({
+      onCustomEvent: ({ event }) => {
+        if (event.name !== 'tts_chunk') return;
+        const chunk = event.value as SpeechChunk;
+        queue = queue.then(() => (active ? playChunk(chunk) : undefined));
+      },
+    });
+
+    return () => {
+      active = false;
+      subscription.unsubscribe();
+    };
+  }, [agent]);
+}
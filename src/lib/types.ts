@@ -2,6 +2,7 @@
 export type AgentState = {
   proverbs: string[];
   sudoku_grid?: number[][] | null;
+  sudoku_size?: number;
   last_move?: {
     row: number;
     col: number;